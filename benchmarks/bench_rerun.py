@@ -0,0 +1,83 @@
+"""End-to-end script reruns through ``streamlit.testing.v1.AppTest``.
+
+Measures the latency of a whole rerun of a one-component app and the size of
+the JSON arguments sent to the browser, for the first run (video sent) and
+later reruns (nothing changed), with and without a large click history.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Iterator, Sequence
+
+from harness import Result
+from streamlit.testing.v1 import AppTest
+
+_SCRIPT = """
+from streamlit_video_coordinates import streamlit_video_coordinates
+
+streamlit_video_coordinates({path!r}, key="video", serving={serving!r}, return_type={return_type!r})
+"""
+
+
+def _click(seq: int) -> dict:
+    return {
+        "seq": seq,
+        "x": seq % 640,
+        "y": seq % 360,
+        "frame_time": seq / 30,
+        "frame_index": seq,
+        "width": 640,
+        "height": 360,
+        "unix_time": 1_700_000_000_000 + seq,
+    }
+
+
+def _payload_bytes(at) -> int:
+    return sum(len(e.proto.json_args) for e in at.get("component_instance"))
+
+
+def run(
+    videos: Sequence[Path], repeat: int, _workdir: Path, clicks: Sequence[int] = (0, 10_000)
+) -> Iterator[Result]:
+    for path in videos:
+        size_mb = path.stat().st_size // 2**20
+        for serving in ("data", "http"):
+            for n_clicks in clicks:
+                params = {"size_mb": size_mb, "serving": serving, "clicks": n_clicks}
+                at = AppTest.from_string(
+                    _SCRIPT.format(path=str(path), serving=serving, return_type="list"),
+                    default_timeout=600,
+                )
+
+                start = time.perf_counter()
+                at.run()
+                first = time.perf_counter() - start
+                if at.exception:
+                    raise RuntimeError(at.exception[0].message)
+                first_payload = _payload_bytes(at)
+
+                if n_clicks:
+                    # One batch holding the whole history, then reruns with
+                    # the same (already acknowledged) value
+                    at.session_state["video"] = {"clicks": [_click(i) for i in range(1, n_clicks + 1)]}
+                    at.run()
+
+                times = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    at.run()
+                    times.append(time.perf_counter() - start)
+                times.sort()
+
+                yield Result(
+                    "rerun",
+                    params,
+                    times[len(times) // 2],
+                    extra={
+                        "first_run_seconds": first,
+                        "first_payload_bytes": first_payload,
+                        "payload_bytes": _payload_bytes(at),
+                    },
+                )
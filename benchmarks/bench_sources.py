@@ -0,0 +1,72 @@
+"""Source resolution: identity tokens, frame tables and ``resolve_source``.
+
+``cold`` runs start from empty caches (first session to open a video),
+``warm`` runs hit the process-wide caches (every later rerun).
+"""
+
+from __future__ import annotations
+
+import io
+from functools import partial
+from pathlib import Path
+from typing import Iterator, Sequence
+
+from harness import Result, measure
+
+from streamlit_video_coordinates import sources, timestamps
+from streamlit_video_coordinates.cache import source_cache
+from streamlit_video_coordinates.spool import Spool
+
+
+def _clear_caches() -> None:
+    source_cache.clear()
+    sources._content_ids.clear()
+    timestamps._tables.clear()
+
+
+def run(videos: Sequence[Path], repeat: int, workdir: Path) -> Iterator[Result]:
+    spool = Spool(workdir / "spool")
+    for path in videos:
+        size_mb = path.stat().st_size // 2**20
+        data = path.read_bytes()
+        upload = io.BytesIO(data)
+
+        for kind, source in (("path", path), ("bytes", data), ("file", upload)):
+            params = {"size_mb": size_mb, "source": kind}
+            yield measure(
+                "source_token", partial(sources.source_token, source), params, repeat
+            )
+            yield measure(
+                "frame_table_cold",
+                partial(timestamps.frame_table_for_source, source),
+                params,
+                repeat,
+                setup=_clear_caches,
+            )
+
+        for serving in ("data", "http"):
+            params = {"size_mb": size_mb, "serving": serving}
+            resolve = partial(sources.resolve_source, path, serving=serving)
+            yield measure("resolve_cold", resolve, params, repeat, setup=_clear_caches)
+            resolve()
+            yield measure("resolve_warm", resolve, params, repeat)
+
+        # A file over the cache budget is read again on every rerun
+        resolve_over_budget = partial(sources.resolve_source, path, serving="data")
+        budget = source_cache.max_bytes
+        source_cache.max_bytes = path.stat().st_size // 2
+        try:
+            params = {"size_mb": size_mb, "serving": "data"}
+            yield measure("resolve_over_budget", resolve_over_budget, params, repeat)
+        finally:
+            source_cache.max_bytes = budget
+
+        params = {"size_mb": size_mb, "source": "file"}
+        yield measure(
+            "spool_cold",
+            partial(spool.add_file_like, upload),
+            params,
+            repeat,
+            setup=spool.clear,
+        )
+        del data, upload
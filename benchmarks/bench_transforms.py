@@ -0,0 +1,57 @@
+"""Coordinate transforms over large click batches.
+
+Independent of the video sizes: every case transforms a synthetic
+``ClickTable`` of one million clicks.
+"""
+
+from __future__ import annotations
+
+from functools import partial
+from pathlib import Path
+from typing import Iterator, Sequence
+
+import numpy as np
+from harness import Result, measure
+
+from streamlit_video_coordinates import transforms
+from streamlit_video_coordinates.table import ClickTable
+
+_CLICKS = 1_000_000
+
+
+def _clicks(sizes: Sequence[tuple]) -> ClickTable:
+    rng = np.random.default_rng(0)
+    size = np.array(sizes)[rng.integers(0, len(sizes), _CLICKS)]
+    return ClickTable.from_columns(
+        {
+            "x": rng.integers(0, size[:, 0]),
+            "y": rng.integers(0, size[:, 1]),
+            "width": size[:, 0],
+            "height": size[:, 1],
+        }
+    )
+
+
+def run(_videos: Sequence[Path], repeat: int, _workdir: Path) -> Iterator[Result]:
+    one_size = _clicks([(1920, 1080)])
+    mixed = _clicks([(1920, 1080), (1280, 720), (3840, 2160)])
+    camera = [[1000.0, 0.0, 960.0], [0.0, 1000.0, 540.0], [0.0, 0.0, 1.0]]
+
+    cases = {
+        "normalize": (one_size, transforms.normalize),
+        "normalize_mixed_sizes": (mixed, transforms.normalize),
+        "crop_resize_rotate": (
+            one_size,
+            transforms.crop(320, 0)
+            .then(transforms.resize((1280, 1080), (224, 224)))
+            .then(transforms.rotate(15, center=(112, 112))),
+        ),
+        "undistort": (one_size, transforms.Undistort(camera, [-0.2, 0.05, 0.001, 0.001, 0.0])),
+    }
+    for name, (clicks, transform) in cases.items():
+        yield measure(
+            "transform",
+            partial(transforms.apply, clicks, transform),
+            {"case": name, "clicks": _CLICKS},
+            repeat,
+        )
@@ -0,0 +1,67 @@
+"""Timing and memory measurement shared by the benchmark modules."""
+
+from __future__ import annotations
+
+import gc
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict
+
+
+@dataclass
+class Result:
+    """Measurements of one benchmark case."""
+
+    name: str
+    params: Dict[str, Any]
+    seconds: float
+    peak_bytes: int | None = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def id(self) -> str:
+        params = ",".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.name}[{params}]"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, **asdict(self)}
+
+
+def measure(
+    name: str,
+    func: Callable[[], Any],
+    params: Dict[str, Any],
+    repeat: int = 5,
+    setup: Callable[[], Any] | None = None,
+    trace_memory: bool = True,
+) -> Result:
+    """Time ``func`` (median of ``repeat`` runs) and trace its peak allocation.
+
+    ``setup`` runs before every call and is not timed, e.g. to clear caches
+    for cold measurements. Memory is traced in one extra run, since
+    tracemalloc slows allocation-heavy code down considerably.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    peak = None
+    if trace_memory:
+        if setup is not None:
+            setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return Result(name, params, statistics.median(times), peak)
@@ -0,0 +1,92 @@
+"""Run the benchmark suite.
+
+Usage (from the repository root)::
+
+    python benchmarks/run.py                      # 1, 16 and 256 MB videos
+    python benchmarks/run.py --sizes 1 64 1024    # sizes in MB
+    python benchmarks/run.py --json results.json  # save the results
+    python benchmarks/run.py --compare results.json --threshold 1.25
+
+``--compare`` exits with status 1 when any case present in both runs got
+slower (or its peak memory or payload grew) by more than ``--threshold``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+import bench_rerun
+import bench_sources
+import bench_transforms
+from harness import Result
+from synthetic import make_video
+
+SUITES = {"sources": bench_sources, "rerun": bench_rerun, "transforms": bench_transforms}
+
+# Noise floor: differences below these are never reported as regressions
+_MIN_SECONDS = 1e-3
+_MIN_BYTES = 64 * 1024
+
+
+def _format(result: Result) -> str:
+    peak = "" if result.peak_bytes is None else f"  peak {result.peak_bytes / 2**20:9.2f} MB"
+    extra = "".join(f"  {k} {v:.4g}" for k, v in result.extra.items())
+    return f"{result.id:<60} {result.seconds * 1e3:10.3f} ms{peak}{extra}"
+
+
+def _regressions(current: List[Dict[str, Any]], baseline: List[Dict[str, Any]], threshold: float) -> List[str]:
+    previous = {r["id"]: r for r in baseline}
+    found = []
+    for result in current:
+        before = previous.get(result["id"])
+        if before is None:
+            continue
+        metrics = [("seconds", result["seconds"], before["seconds"], _MIN_SECONDS)]
+        if result["peak_bytes"] is not None and before["peak_bytes"] is not None:
+            metrics.append(("peak_bytes", result["peak_bytes"], before["peak_bytes"], _MIN_BYTES))
+        for key in ("payload_bytes", "first_payload_bytes"):
+            if key in result["extra"] and key in before["extra"]:
+                metrics.append((key, result["extra"][key], before["extra"][key], _MIN_BYTES))
+        for metric, now, then, floor in metrics:
+            if now > then * threshold and now - then > floor:
+                found.append(f"{result['id']}: {metric} {then:.4g} -> {now:.4g}")
+    return found
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 16, 256], help="video sizes in MB")
+    parser.add_argument("--suites", nargs="+", choices=sorted(SUITES), default=sorted(SUITES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    parser.add_argument("--compare", type=Path, help="baseline results to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        videos = [make_video(workdir / f"video_{size}mb.mp4", size * 2**20) for size in args.sizes]
+        for name in args.suites:
+            for result in SUITES[name].run(videos, args.repeat, workdir):
+                print(_format(result), flush=True)
+                results.append(result.to_dict())
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    if args.compare:
+        regressions = _regressions(results, json.loads(args.compare.read_text()), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
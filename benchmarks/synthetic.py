@@ -0,0 +1,53 @@
+"""Synthetic MP4 files for benchmarks.
+
+The files have a valid ``moov`` index (one 30 fps video track with a sample
+table sized for the file) and a sparse ``mdat`` payload, so even 1 GB inputs
+are created instantly and take no disk space until read.
+"""
+
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+
+FPS = 30
+TIMESCALE = 15360
+# Roughly 4 Mbit/s, which decides how many frames the index describes
+BYTES_PER_FRAME = 4_000_000 // 8 // FPS
+
+
+def _box(kind: bytes, payload: bytes = b"") -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def _full_box(kind: bytes, payload: bytes) -> bytes:
+    return _box(kind, bytes(4) + payload)
+
+
+def _moov(frames: int, width: int = 1920, height: int = 1080) -> bytes:
+    delta = TIMESCALE // FPS
+    tkhd = bytes(72) + struct.pack(">II", width << 16, height << 16)
+    mdhd = struct.pack(">IIII", 0, 0, TIMESCALE, frames * delta) + bytes(4)
+    hdlr = struct.pack(">I4s", 0, b"vide") + bytes(12)
+    stts = struct.pack(">III", 1, frames, delta)
+    keyframes = range(1, frames + 1, 2 * FPS)
+    stss = struct.pack(">I", len(keyframes)) + b"".join(struct.pack(">I", k) for k in keyframes)
+    stbl = _full_box(b"stts", stts) + _full_box(b"stss", stss)
+    mdia = _full_box(b"mdhd", mdhd) + _full_box(b"hdlr", hdlr)
+    mdia += _box(b"minf", _box(b"stbl", stbl))
+    trak = _box(b"trak", _full_box(b"tkhd", tkhd) + _box(b"mdia", mdia))
+    return _box(b"moov", trak)
+
+
+def make_video(path: Path, size: int) -> Path:
+    """Write a synthetic MP4 of about ``size`` bytes to ``path``."""
+    ftyp = _box(b"ftyp", b"isom\x00\x00\x02\x00")
+    moov = _moov(max(size // BYTES_PER_FRAME, 1))
+    mdat_size = max(size - len(ftyp) - len(moov), 8)
+    with open(path, "wb") as f:
+        f.write(ftyp)
+        f.write(struct.pack(">I4s", mdat_size, b"mdat"))
+        # Sparse: extends the file without writing the payload
+        f.seek(mdat_size - 8, 1)
+        f.write(moov)
+    return path
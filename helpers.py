@@ -0,0 +1,90 @@
+"""Helpers shared by the tests: synthetic videos, file-like sources and component arguments"""
+
+import io
+import json
+import struct
+
+
+def _box(kind, payload=b""):
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def _full_box(kind, payload, version=0):
+    return _box(kind, bytes([version, 0, 0, 0]) + payload)
+
+
+def _table(kind, rows, fmt=">II", version=0):
+    body = struct.pack(">I", len(rows)) + b"".join(struct.pack(fmt, *row) for row in rows)
+    return _full_box(kind, body, version)
+
+
+def make_mp4(
+    stts, ctts=None, stss=None, timescale=600, edit_shift=None, empty_edit=None, size=(640, 360)
+):
+    tkhd = bytes(72) + struct.pack(">II", size[0] << 16, size[1] << 16)
+    mdhd = struct.pack(">IIII", 0, 0, timescale, 0) + bytes(4)
+    hdlr = struct.pack(">I4s", 0, b"vide") + bytes(12)
+
+    stbl = _table(b"stts", stts)
+    if ctts:
+        stbl += _table(b"ctts", ctts, ">Ii", version=1)
+    if stss:
+        stbl += _table(b"stss", [(s,) for s in stss], ">I")
+
+    mdia = _full_box(b"mdhd", mdhd) + _full_box(b"hdlr", hdlr)
+    mdia += _box(b"minf", _box(b"stbl", stbl))
+    trak = _full_box(b"tkhd", tkhd) + _box(b"mdia", mdia)
+    edits = []
+    if empty_edit is not None:
+        # Duration in the movie timescale (1000, see mvhd below)
+        edits.append((empty_edit, -1, 1 << 16))
+    if edit_shift is not None or edits:
+        edits.append((0, edit_shift or 0, 1 << 16))
+    if edits:
+        trak += _box(b"edts", _table(b"elst", edits, ">Iii"))
+
+    audio = _box(b"trak", _box(b"mdia", _full_box(b"hdlr", struct.pack(">I4s", 0, b"soun") + bytes(12))))
+    mvhd = _full_box(b"mvhd", struct.pack(">IIII", 0, 0, 1000, 0) + bytes(80))
+    moov = _box(b"moov", mvhd + audio + _box(b"trak", trak))
+    return _box(b"ftyp", b"isom\x00\x00\x02\x00") + _box(b"mdat", bytes(100)) + moov
+
+
+def component_args(at):
+    """Return the arguments of the only component instance an ``AppTest`` rendered."""
+    (component,) = at.get("component_instance")
+    return json.loads(component.proto.json_args)
+
+
+class Upload(io.BytesIO):
+    """Stand-in for streamlit's UploadedFile"""
+
+    def __init__(self, data, file_id):
+        super().__init__(data)
+        self.file_id = file_id
+        self.size = len(data)
+        self.name = "clip.webm"
+
+
+class Stream(io.RawIOBase):
+    """A non-BytesIO stream that counts how much is read per call"""
+
+    def __init__(self, data):
+        self._inner = io.BytesIO(data)
+        self.largest_read = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, *args):
+        return self._inner.seek(*args)
+
+    def tell(self):
+        return self._inner.tell()
+
+    def read(self, size=-1):
+        chunk = self._inner.read(size)
+        self.largest_read = max(self.largest_read, len(chunk))
+        return chunk
@@ -13,5 +13,10 @@ setup(
         "streamlit_video_coordinates": ["frontend/*"],
     },
     include_package_data=True,
+    entry_points={
+        "console_scripts": [
+            "streamlit-video-coordinates-demo=streamlit_video_coordinates.__main__:main",
+        ],
+    },
     python_requires=">=3.8",
 )
@@ -1,21 +1,450 @@
 from __future__ import annotations
 
-import base64
-import tempfile
+import math
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Callable, Any, List, Dict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from typing_extensions import Literal
+
+# Only lightweight, standard-library-backed modules are imported eagerly.
+# Streamlit, NumPy and everything built on them load on first use, so batch
+# scripts and workers using the data utilities start quickly.
+from . import metrics, sources
+from .cache import CacheStats, SourceCache, source_cache
+from .commit import CommitPolicy
+from .media_server import MediaServer, configure_media_server, get_media_server
+from .metrics import CallbackSink, LoggingSink, PrometheusSink, configure_metrics
+from .sources import ServingMode, content_id, register_source_type, source_token
+from .spool import Spool, spool
+
+if TYPE_CHECKING:
+    from .clicks import ClickHistory
+    from .export import download_button, iter_export, write_export
+    from .frames import FFmpegDecoder, FrameDecoder, FrameGrabber, frame_grabber
+    from .navigation import TimeIndex
+    from .proxy import (
+        DEFAULT_PROXY_HEIGHT,
+        ProxyCache,
+        configure_proxies,
+        get_proxy_cache,
+    )
+    from .store import AnnotationStore
+    from .table import ClickTable
+    from .timestamps import FrameTable, frame_table_for_source
+    from .tracks import Tracks
+
+# Public names that are imported from their submodule on first access
+_LAZY_ATTRIBUTES = {
+    "ClickHistory": "clicks",
+    "ClickTable": "table",
+    "FrameTable": "timestamps",
+    "frame_table_for_source": "timestamps",
+    "AnnotationStore": "store",
+    "download_button": "export",
+    "iter_export": "export",
+    "write_export": "export",
+    "FFmpegDecoder": "frames",
+    "FrameDecoder": "frames",
+    "FrameGrabber": "frames",
+    "frame_grabber": "frames",
+    "Tracks": "tracks",
+    "TimeIndex": "navigation",
+    "DEFAULT_PROXY_HEIGHT": "proxy",
+    "ProxyCache": "proxy",
+    "configure_proxies": "proxy",
+    "get_proxy_cache": "proxy",
+}
+
+# Eagerly imported names and the lazy ones above
+__all__ = [
+    "DEFAULT_PROXY_HEIGHT",
+    "AnnotationStore",
+    "CacheStats",
+    "CallbackSink",
+    "ClickHistory",
+    "ClickTable",
+    "CommitPolicy",
+    "FFmpegDecoder",
+    "FrameDecoder",
+    "FrameGrabber",
+    "FrameTable",
+    "LoggingSink",
+    "MediaServer",
+    "PrometheusSink",
+    "ProxyCache",
+    "ServingMode",
+    "SourceCache",
+    "Spool",
+    "TimeIndex",
+    "Tracks",
+    "configure_media_server",
+    "configure_metrics",
+    "configure_proxies",
+    "content_id",
+    "download_button",
+    "frame_grabber",
+    "frame_table_for_source",
+    "get_annotation_index",
+    "get_click_history",
+    "get_media_server",
+    "get_proxy_cache",
+    "iter_export",
+    "metrics",
+    "register_source_type",
+    "seek",
+    "source_cache",
+    "source_token",
+    "sources",
+    "spool",
+    "streamlit_video_coordinates",
+    "streamlit_video_grid",
+    "write_export",
+]
+
 
-import streamlit as st
-import streamlit.components.v1 as components
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
 
-from . import url_util
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
 
-# Tell streamlit that there is a component called streamlit_video_coordinates,
-# and that the code to display that component is in the "frontend" folder
+
+# The component's code is in the "frontend" folder. It is declared with
+# streamlit on first use rather than at import.
 frontend_dir = (Path(__file__).parent / "frontend").absolute()
-_component_func = components.declare_component(
-    "streamlit_video_coordinates", path=str(frontend_dir)
-)
+_component_func: Callable[..., Any] | None = None
+_component_func_lock = threading.Lock()
+
+
+def _get_component_func() -> Callable[..., Any]:
+    global _component_func
+    with _component_func_lock:
+        if _component_func is None:
+            import streamlit.components.v1 as components
+
+            _component_func = components.declare_component(
+                "streamlit_video_coordinates", path=str(frontend_dir)
+            )
+        return _component_func
+
+
+_STATE_PREFIX = "_streamlit_video_coordinates."
+
+
+def _new_click_history() -> ClickHistory:
+    from .clicks import ClickHistory
+
+    return ClickHistory()
+
+
+@dataclass
+class _InstanceState:
+    """Per-session bookkeeping for one component instance."""
+
+    history: ClickHistory = field(default_factory=_new_click_history)
+    # Token of the source whose payload was last sent to the frontend
+    sent_token: str | None = None
+    # Grid mode: token of the source last sent to each view
+    sent_view_tokens: Dict[int, str] = field(default_factory=dict)
+    # Last "please resend the source" request from the frontend that was served
+    src_request: str | None = None
+    # URL each view's video is registered under with the media file manager
+    # (view 0 for a single video), renewed on runs that don't resend it
+    media_urls: Dict[int, str] = field(default_factory=dict)
+    # (src_id, mark) of the browser timings already recorded
+    reported_timings: Set[Tuple[str, str]] = field(default_factory=set)
+    # Frame table of each view's video (None: no exact timestamps), and the
+    # ids of a grid's views, for annotation indexes and seeks
+    frame_tables: List[FrameTable | None] = field(default_factory=list)
+    view_ids: List[Hashable] = field(default_factory=list)
+    # Seek requested with seek(), sent with the next run
+    seek: Dict[str, Any] | None = None
+    seek_count: int = 0
+
+
+def _instance_state(key: str) -> _InstanceState:
+    import streamlit as st
+
+    state_key = f"{_STATE_PREFIX}{key}"
+    if state_key not in st.session_state:
+        st.session_state[state_key] = _InstanceState()
+    return st.session_state[state_key]
+
+
+def get_click_history(key: str) -> ClickHistory | None:
+    """Return the click history of the component instance with ``key``.
+
+    Besides the in-memory clicks returned by ``streamlit_video_coordinates``,
+    the history can iterate lazily over clicks spilled to disk when
+    ``max_clicks`` is set. Returns ``None`` if no instance with this key has
+    been drawn in the current session.
+    """
+    import streamlit as st
+
+    state = st.session_state.get(f"{_STATE_PREFIX}{key}")
+    return state.history if state is not None else None
+
+
+def get_annotation_index(key: str, view: Hashable | None = None) -> TimeIndex | None:
+    """Return an index of the annotated frames of the component instance with ``key``.
+
+    The index holds the time of every clicked frame (including clicks
+    spilled to disk) and finds the next or previous one with a binary
+    search. For a grid, ``view`` restricts it to one view's clicks. Returns
+    ``None`` if no instance with this key has been drawn in the current
+    session.
+    """
+    import streamlit as st
+
+    from .navigation import TimeIndex
+
+    state = st.session_state.get(f"{_STATE_PREFIX}{key}")
+    if state is None:
+        return None
+    if not state.view_ids:
+        table = state.frame_tables[0] if state.frame_tables else None
+        return TimeIndex.from_clicks(state.history, table)
+    positions = range(len(state.view_ids)) if view is None else [_view_position(state, view)]
+    clicks = list(state.history)
+    index = TimeIndex()
+    for position in positions:
+        view_id = state.view_ids[position]
+        view_clicks = [click for click in clicks if click.get("view") == view_id]
+        index = index.union(TimeIndex.from_clicks(view_clicks, state.frame_tables[position]))
+    return index
+
+
+def seek(
+    key: str,
+    frame_time: float | None = None,
+    *,
+    frame_index: int | None = None,
+    view: Hashable | None = None,
+) -> None:
+    """Pause the player of the component instance with ``key`` on a time or frame.
+
+    The seek is sent the next time the component is drawn, so call this
+    from a callback (e.g. a button's ``on_click``) or before drawing it.
+    ``frame_index`` is mapped to the frame's exact timestamp for local
+    sources. For a grid, ``view`` names the view to seek; by default all of
+    them are.
+    """
+    if (frame_time is None) == (frame_index is None):
+        raise ValueError("Pass exactly one of frame_time and frame_index")
+    state = _instance_state(key)
+    state.seek_count += 1
+    state.seek = {
+        "id": state.seek_count,
+        "time": frame_time,
+        "frame_index": frame_index,
+        "view": view,
+    }
+
+
+def _view_position(state: _InstanceState, view: Hashable) -> int:
+    try:
+        return state.view_ids.index(view)
+    except ValueError:
+        raise ValueError(f"No view {view!r} in this grid") from None
+
+
+def _frame_index_time(state: _InstanceState, position: int, index: int) -> float:
+    table = state.frame_tables[position] if state.frame_tables else None
+    if table is not None and len(table):
+        if not 0 <= index < len(table):
+            raise ValueError(f"Frame index {index} out of range (0-{len(table) - 1})")
+        return float(table.frame_time(index))
+    # The frontend's 30 fps estimate, without a frame table
+    return index / 30
+
+
+def _take_seek(state: _InstanceState) -> Dict[str, Any] | None:
+    # A requested seek is sent once, as the frontend's "seek" arg
+    request, state.seek = state.seek, None
+    if request is None:
+        return None
+    position = None
+    if request["view"] is not None:
+        if not state.view_ids:
+            raise ValueError("view can only be given for a grid")
+        position = _view_position(state, request["view"])
+    seek_time = request["time"]
+    if seek_time is None:
+        index = request["frame_index"]
+        if state.view_ids and position is None:
+            # Every view seeks to that frame of its own video
+            seek_time = [
+                _frame_index_time(state, p, index) for p in range(len(state.view_ids))
+            ]
+        else:
+            seek_time = _frame_index_time(state, position or 0, index)
+    return {"id": request["id"], "time": seek_time, "view": position}
+
+
+def _navigation_args(
+    state: _InstanceState, position: int, clicks: Iterable[Dict[str, Any]]
+) -> Dict[str, Any]:
+    # Sent along with a view's video: the frontend keeps both indexes for its
+    # keyboard shortcuts and adds its own new clicks to the annotated one.
+    from .navigation import TimeIndex
+
+    table = state.frame_tables[position]
+    keyframes = table.keyframes if table is not None else ()
+    return {
+        "annotated": TimeIndex.from_clicks(clicks, table).tolist(),
+        "keyframes": TimeIndex(keyframes).tolist(),
+    }
+
+
+def _frame_table(source: Any, exact_frame_index: bool) -> FrameTable | None:
+    from .timestamps import frame_table_for_source
+
+    if not exact_frame_index:
+        return None
+    with metrics.span("frame_table"):
+        return frame_table_for_source(source)
+
+
+def _default_key(token: str, *args: Any) -> str:
+    # Streamlit derives the identity of keyless components from their args,
+    # and ours change on every click (ack). A key derived from what the
+    # identity used to depend on keeps keyless instances stable.
+    return f"streamlit_video_coordinates.{token}.{args!r}"
+
+
+def _report_browser_timings(state: _InstanceState, value: Any) -> None:
+    # The frontend piggybacks its timing marks (milliseconds) on the values it
+    # sends anyway, one dict per view; each mark is recorded once per video.
+    timings = value.get("timings") if isinstance(value, dict) else None
+    if not timings or not metrics.enabled():
+        return
+    for view_timings in [timings] if isinstance(timings, dict) else timings:
+        src_id = view_timings.get("src_id")
+        for mark, ms in view_timings.items():
+            if mark == "src_id" or (src_id, mark) in state.reported_timings:
+                continue
+            state.reported_timings.add((src_id, mark))
+            metrics.record(f"browser.{mark}", "span", ms / 1000)
+
+
+def _assign_frame_indices(clicks: List[Dict[str, Any]], source: Any) -> None:
+    from .timestamps import frame_table_for_source
+
+    frames = frame_table_for_source(source)
+    if frames is None or not len(frames):
+        return
+    # Prefer the timestamp of the frame actually on screen when the browser
+    # reported it; one vectorised lookup for the whole batch.
+    times = [
+        click["frame_time"] if click.get("media_time") is None else click["media_time"]
+        for click in clicks
+    ]
+    indices = frames.frame_index(times)
+    for click, index in zip(clicks, indices.tolist()):
+        click["frame_index"] = index
+
+
+@dataclass
+class _View:
+    """A video as shown in the player: the source itself or its proxy."""
+
+    source: Any
+    token: str
+    played: Any
+    played_token: str
+    # Size of the original when a proxy is played, for the frontend to
+    # report clicks in
+    report_size: List[int] | None = None
+
+
+def _prepare_view(source: Any, proxy: bool | int) -> _View:
+    # Registered custom types are converted once, up front
+    source = sources.as_source(source)
+
+    # A cheap identity for the video. The payload itself (URL or data URL)
+    # is only sent to the frontend when the identity changes, or when the
+    # frontend asks for it again after being remounted.
+    with metrics.span("source_token"):
+        token = sources.source_token(source)
+
+    # What the browser plays: the video itself or its downscaled proxy
+    view = _View(source, token, source, token)
+    if proxy and sources.source_kind(source) != "url":
+        from .proxy import DEFAULT_PROXY_HEIGHT, get_proxy_cache
+
+        max_height = DEFAULT_PROXY_HEIGHT if proxy is True else int(proxy)
+        proxy_video = get_proxy_cache().get(source, max_height)
+        if proxy_video is not None:
+            view.played = proxy_video.path
+            view.played_token = f"{token}.proxy{proxy_video.height}"
+            view.report_size = [proxy_video.original_width, proxy_video.original_height]
+    return view
+
+
+def _resolve_view(view: _View, serving: ServingMode, coordinates: str) -> str:
+    # Local content is handed to the browser by URL (or inlined as a data URL
+    # when serving="data"); URLs are passed through untouched.
+    with metrics.span("resolve", serving=serving):
+        return sources.resolve_source(view.played, serving=serving, coordinates=coordinates)
+
+
+def _view_src(
+    state: _InstanceState,
+    index: int,
+    view: _View,
+    serving: ServingMode,
+    coordinates: str,
+    send_src: bool,
+) -> str | None:
+    # The payload of a view whose video is sent, else None
+    if send_src:
+        video_src = _resolve_view(view, serving, coordinates)
+        if serving == "media":
+            state.media_urls[index] = video_src
+        return video_src
+    # Media file manager registrations only last one script run. The last
+    # one is renewed without reading the video; if the file was freed, the
+    # video is registered again under the same (content-derived) URL.
+    if (
+        serving == "media"
+        and sources.media_manager_available()
+        and not sources.renew_media(state.media_urls.get(index), coordinates)
+    ):
+        state.media_urls[index] = _resolve_view(view, serving, coordinates)
+    return None
+
+
+def _record_new_clicks(
+    new_clicks: List[Dict[str, Any]],
+    source: Any,
+    exact_frame_index: bool,
+    store: AnnotationStore | None,
+    annotator: str,
+) -> None:
+    if new_clicks and exact_frame_index:
+        with metrics.span("frame_index"):
+            _assign_frame_indices(new_clicks, source)
+    if new_clicks and store is not None:
+        store.append(content_id(source), new_clicks, annotator)
 
 
 def streamlit_video_coordinates(
@@ -25,10 +454,19 @@ def streamlit_video_coordinates(
     key: str | None = None,
     on_click: Callable[[], None] | None = None,
     start_time: float = 0.0,
-) -> List[Dict[str, Any]]:
+    serving: ServingMode = "media",
+    return_type: Literal["list", "table"] = "list",
+    exact_frame_index: bool = True,
+    store: AnnotationStore | None = None,
+    annotator: str = "",
+    max_clicks: int | None = None,
+    proxy: bool | int = False,
+    commit: CommitPolicy | None = None,
+    tracks: bool = False,
+) -> List[Dict[str, Any]] | ClickTable:
     """
     Display a video and capture coordinates when clicked on paused frames.
-    
+
     Parameters
     ----------
     source : str | Path | bytes | Any
@@ -37,6 +475,7 @@ def streamlit_video_coordinates(
         - Local file path
         - Video file bytes (from file uploader)
         - File-like object with .read() method
+        - Any object of a type registered with register_source_type()
     height : int | None
         The height of the video player. If None, uses default height
     width : int | None
@@ -47,173 +486,321 @@ def streamlit_video_coordinates(
         Callback function to call when video is clicked
     start_time : float
         Start time of the video in seconds
-        
+    serving : "media" | "http" | "data"
+        How local files, bytes and uploads reach the browser. "media" (the
+        default) registers them with Streamlit's media file manager and
+        passes only a short URL to the frontend; "http" streams from a
+        built-in server that honours Range requests, so seeking in long
+        recordings only fetches the needed bytes. Bytes and uploads are
+        first copied to a spool file in small chunks, once per content.
+        "data" inlines the whole video as a base64 data URL on every rerun.
+        URL sources are unaffected.
+    return_type : "list" | "table"
+        "list" (the default) returns a list of dicts. "table" returns a
+        ClickTable holding each field as a typed NumPy array, with zero-copy
+        to_numpy(), to_pandas() and to_arrow(); it still indexes, iterates
+        and compares like the list.
+    exact_frame_index : bool
+        For local MP4/MOV/WebM/MKV sources, replace the frontend's 30 fps
+        frame estimate with the exact frame index, looked up in the
+        container's per-frame timestamp table (parsed once per video).
+        Other sources keep the estimate.
+    store : AnnotationStore | None
+        If given, every new click is also appended to this persistent store,
+        once per rerun in one batch, keyed by the video's content_id() and
+        ``annotator``. Query it to resume or analyse long sessions without
+        keeping their clicks in session state.
+    annotator : str
+        Name recorded with the clicks written to ``store``.
+    max_clicks : int | None
+        Keep only the most recent ``max_clicks`` clicks in memory (and only
+        that many markers in the browser). Older clicks are spilled to a
+        local file and can be iterated with ``get_click_history(key)``.
+        ``None`` (the default) keeps every click.
+    proxy : bool | int
+        Play a downscaled copy of a local video, made once with ffmpeg and
+        cached on disk (see configure_proxies()). ``True`` limits the copy
+        to 540 pixels high, an int to that many. Clicks are still reported
+        in the original's pixels, and frame times and indices are
+        unchanged. Videos that are small enough, and URLs, play as they are.
+    commit : CommitPolicy | None
+        When clicks are sent to Python, each send rerunning the script.
+        ``None`` (the default) sends every click immediately; a policy can
+        buffer clicks in the browser and send a burst at once, after a pause
+        in clicking, on play or seek, on a key press or once enough are
+        buffered. Buffered clicks are shown as unsaved.
+    tracks : bool
+        Let annotators assign each click to a track (one object followed
+        through the video): keys 1-9 pick the track, "n" starts a new one.
+        Clicks then carry a ``track_id``; see Tracks for interpolating
+        positions between them.
+
     Returns
     -------
-    List[Dict[str, Any]]
-        List of click events, each containing:
+    List[Dict[str, Any]] | ClickTable
+        Click events, each containing:
         - x: X coordinate of click
         - y: Y coordinate of click
         - frame_time: Current video time in seconds
-        - frame_index: Estimated frame index
+        - frame_index: Frame index (exact for local sources, see
+          exact_frame_index; estimated at 30 fps otherwise)
         - width: Video width at time of click
         - height: Video height at time of click
         - unix_time: Unix timestamp of click
+        - media_time: Presentation time of the frame on screen, reported by
+          requestVideoFrameCallback (None where the browser lacks it)
+        - presented_frames: Browser's count of frames presented so far
+          (None where requestVideoFrameCallback is unavailable)
+        - track_id: Track the click was assigned to (None unless tracks)
     """
-    
-    # Handle different source types
-    if isinstance(source, (str, Path)):
-        if isinstance(source, Path):
-            # Convert Path to string for processing
-            source = str(source)
-            
-        if url_util.is_url(source, allowed_schemas=("http", "https", "data")):
-            # URL source (including data URLs)
-            video_src = str(source)
-        else:
-            # Local file path
-            if isinstance(source, str):
-                source = Path(source)
-            if not source.exists():
-                raise FileNotFoundError(f"Video file not found: {source}")
-            
-            # Read file and encode as base64 data URL
-            content = source.read_bytes()
-            encoded = base64.b64encode(content).decode("utf-8")
-            
-            # Determine MIME type based on file extension
-            extension = source.suffix.lower()
-            if extension in [".mp4"]:
-                mime_type = "video/mp4"
-            elif extension in [".webm"]:
-                mime_type = "video/webm"
-            elif extension in [".ogg", ".ogv"]:
-                mime_type = "video/ogg"
-            elif extension in [".avi"]:
-                mime_type = "video/x-msvideo"
-            elif extension in [".mov"]:
-                mime_type = "video/quicktime"
-            else:
-                mime_type = "video/mp4"  # Default fallback
-                
-            video_src = f"data:{mime_type};base64,{encoded}"
-    elif isinstance(source, bytes):
-        # Raw bytes - assume MP4
-        encoded = base64.b64encode(source).decode("utf-8")
-        video_src = f"data:video/mp4;base64,{encoded}"
-    elif hasattr(source, 'read'):
-        # File-like object (e.g., from st.file_uploader)
-        if hasattr(source, 'getvalue'):
-            # BytesIO or similar
-            content = source.getvalue()
-        else:
-            # Read from file-like object
-            content = source.read()
-            
-        if hasattr(source, 'name'):
-            # Try to determine type from filename
-            name = getattr(source, 'name', '')
-            if name.lower().endswith('.webm'):
-                mime_type = "video/webm"
-            elif name.lower().endswith('.ogg') or name.lower().endswith('.ogv'):
-                mime_type = "video/ogg"
-            elif name.lower().endswith('.avi'):
-                mime_type = "video/x-msvideo"
-            elif name.lower().endswith('.mov'):
-                mime_type = "video/quicktime"
-            else:
-                mime_type = "video/mp4"
-        else:
-            mime_type = "video/mp4"
-            
-        encoded = base64.b64encode(content).decode("utf-8")
-        video_src = f"data:{mime_type};base64,{encoded}"
-    else:
-        raise ValueError(
-            "Source must be a URL string, file path, bytes, or file-like object"
-        )
 
-    # Call the frontend component
-    result = _component_func(
-        src=video_src,
-        height=height,
-        width=width,
-        start_time=start_time,
-        key=key,
-        on_change=on_click,
-    )
-    
-    # Return the clicks data (will be None initially, then a list of click events)
-    return result if result is not None else []
+    import streamlit as st
 
+    if return_type not in ("list", "table"):
+        raise ValueError(f"Unknown return_type: {return_type!r}")
 
-def main():
-    st.set_page_config(
-        page_title="Streamlit Video Coordinates",
-        page_icon="🎯",
-        layout="wide",
+    view = _prepare_view(source, proxy)
+    source, token, played_token = view.source, view.token, view.played_token
+    if key is None:
+        key = _default_key(token, height, width, start_time)
+    state = _instance_state(key)
+    history = state.history
+    history.max_clicks = max_clicks
+
+    # The latest batch is already in session state, so it can be applied
+    # (and acknowledged below) before the component is drawn.
+    value = st.session_state.get(key)
+    new_clicks = history.apply(value)
+    _report_browser_timings(state, value)
+
+    # Clicks on a previously shown video no longer apply.
+    history.bind(token)
+
+    src_request = value.get("src_request") if isinstance(value, dict) else None
+    send_src = state.sent_token != played_token or (
+        src_request is not None and src_request != state.src_request
     )
-    
-    st.title("🎯 Streamlit Video Coordinates")
-    
-    st.markdown("""
-    This component allows you to display a video and capture coordinates when you click on paused frames.
-    
-    **Instructions:**
-    1. Upload a video file or provide a URL
-    2. Play the video and pause at the frame you want to annotate
-    3. Click on the video to capture coordinates and frame information
-    """)
-    
-    # Example with file upload
-    st.header("Upload Video File")
-    uploaded_file = st.file_uploader(
-        "Choose a video file", 
-        type=['mp4', 'webm', 'ogg', 'avi', 'mov']
+    state.sent_token = played_token
+    state.src_request = src_request
+
+    navigation: Dict[str, Any] = {"annotated": None, "keyframes": None}
+    if send_src:
+        state.frame_tables = [_frame_table(source, exact_frame_index)]
+        state.view_ids = []
+        navigation = _navigation_args(state, 0, history)
+
+    video_src = _view_src(
+        state, 0, view, serving, f"streamlit_video_coordinates.{key}", send_src
     )
-    
-    if uploaded_file is not None:
-        st.write("### Uploaded Video Example")
-        clicks = streamlit_video_coordinates(
-            uploaded_file,
-            key="uploaded_video",
-            width=640,
-            height=360
+    if send_src:
+        metrics.count("payload_bytes", len(video_src))
+
+    # Call the frontend component
+    with metrics.span("component"):
+        result = _get_component_func()(
+            src=video_src,
+            src_id=played_token,
+            # Lets the browser report how long the payload took to arrive
+            sent_at=time.time() * 1000 if send_src and metrics.enabled() else None,
+            height=height,
+            width=width,
+            start_time=start_time,
+            ack=history.last_seq,
+            max_markers=max_clicks,
+            report_size=view.report_size,
+            commit=commit.to_args() if commit is not None else None,
+            tracks=tracks,
+            seek=_take_seek(state),
+            **navigation,
+            key=key,
+            on_change=on_click,
         )
-        
-        if clicks:
-            st.write("**Click Data:**")
-            for i, click in enumerate(clicks):
-                st.write(f"Click {i+1}: x={click['x']}, y={click['y']}, "
-                        f"frame_time={click['frame_time']:.2f}s, "
-                        f"frame_index={click.get('frame_index', 'N/A')}")
-    
-    # Example with URL
-    st.header("Video URL")
-    video_url = st.text_input(
-        "Enter video URL", 
-        placeholder="https://example.com/video.mp4"
-    )
-    
-    if video_url:
-        st.write("### URL Video Example")
-        try:
-            clicks = streamlit_video_coordinates(
-                video_url,
-                key="url_video",
-                width=640,
-                height=360
+
+    # The value is a batch of clicks Python hasn't acknowledged yet (None
+    # before the first click); re-applying an already applied batch is a no-op.
+    new_clicks += history.apply(result)
+    _report_browser_timings(state, result)
+
+    if new_clicks:
+        metrics.count("clicks", len(new_clicks))
+    _record_new_clicks(new_clicks, source, exact_frame_index, store, annotator)
+    # Only now are the new clicks final and may be spilled
+    history.commit()
+
+    if return_type == "table":
+        return history.table()
+    return list(history.clicks)
+
+
+def streamlit_video_grid(
+    videos: Sequence[Any] | Mapping[Hashable, Any],
+    columns: int | None = None,
+    height: int | None = None,
+    key: str | None = None,
+    on_click: Callable[[], None] | None = None,
+    start_time: float = 0.0,
+    sync: bool = True,
+    serving: ServingMode = "media",
+    return_type: Literal["list", "table"] = "list",
+    exact_frame_index: bool = True,
+    store: AnnotationStore | None = None,
+    annotator: str = "",
+    max_clicks: int | None = None,
+    proxy: bool | int = False,
+    commit: CommitPolicy | None = None,
+    tracks: bool = False,
+) -> List[Dict[str, Any]] | Dict[Hashable, ClickTable]:
+    """
+    Display several videos in one player grid and capture clicks on any of them.
+
+    All views live in a single component, so the grid costs one iframe and
+    one rerun per click however many videos it shows, and playing, pausing,
+    seeking or changing the speed of one view applies to all of them.
+
+    Parameters
+    ----------
+    videos : Sequence | Mapping
+        The video sources (see streamlit_video_coordinates). With a mapping,
+        its keys are the view ids clicks are tagged with; with a sequence,
+        their positions are.
+    columns : int | None
+        Number of grid columns. Defaults to a roughly square grid.
+    height : int | None
+        Height of each view. If None, views are as tall as their videos at
+        the column width.
+    sync : bool
+        Keep the views on a shared playback clock (the default). With False
+        each view plays on its own.
+    return_type : "list" | "table"
+        "list" (the default) returns every click, in the order they were
+        made, with a "view" field holding its view id. "table" returns a
+        dict mapping each view id to a ClickTable of its clicks.
+    key, on_click, start_time, serving, exact_frame_index, store, annotator,
+    max_clicks, proxy, commit, tracks
+        As for streamlit_video_coordinates, applied to every view.
+        ``max_clicks`` limits the clicks kept in memory across all views.
+        Clicks are written to ``store`` under their own video's content_id().
+        Changing any of the videos forgets the clicks on all of them.
+
+    Returns
+    -------
+    List[Dict[str, Any]] | Dict[Hashable, ClickTable]
+        Click events as returned by streamlit_video_coordinates, plus:
+        - view: Id of the view that was clicked
+    """
+
+    import streamlit as st
+
+    if return_type not in ("list", "table"):
+        raise ValueError(f"Unknown return_type: {return_type!r}")
+    if isinstance(videos, Mapping):
+        view_ids, videos = list(videos.keys()), list(videos.values())
+    else:
+        videos = list(videos)
+        view_ids = list(range(len(videos)))
+    if not videos:
+        raise ValueError("streamlit_video_grid needs at least one video")
+
+    views = [_prepare_view(video, proxy) for video in videos]
+    token = ",".join(view.token for view in views)
+    if columns is None:
+        columns = math.ceil(math.sqrt(len(views)))
+    if key is None:
+        key = _default_key(token, "grid", columns, height, start_time)
+    state = _instance_state(key)
+    history = state.history
+    history.max_clicks = max_clicks
+
+    def apply(value: Any) -> List[Dict[str, Any]]:
+        # The frontend tags clicks with the position of their view
+        new = history.apply(value)
+        for click in new:
+            index = click.get("view")
+            if isinstance(index, int) and 0 <= index < len(view_ids):
+                click["view"] = view_ids[index]
+        _report_browser_timings(state, value)
+        return new
+
+    value = st.session_state.get(key)
+    new_clicks = apply(value)
+    history.bind(token)
+
+    # A new request from the frontend names the views whose payload it lacks
+    src_request = value.get("src_request") if isinstance(value, dict) else None
+    requested: Set[str] = set()
+    if src_request is not None and src_request != state.src_request:
+        requested = set(src_request.rsplit(":", 1)[0].split(","))
+    state.src_request = src_request
+
+    state.view_ids = view_ids
+    del state.frame_tables[len(views) :]
+    state.frame_tables += [None] * (len(views) - len(state.frame_tables))
+    clicks = None
+    view_args = []
+    any_sent = False
+    for index, view in enumerate(views):
+        send_src = (
+            state.sent_view_tokens.get(index) != view.played_token
+            or view.played_token in requested
+        )
+        state.sent_view_tokens[index] = view.played_token
+        video_src = _view_src(
+            state, index, view, serving, f"streamlit_video_coordinates.{key}.{index}", send_src
+        )
+        navigation = {"annotated": None, "keyframes": None}
+        if send_src:
+            metrics.count("payload_bytes", len(video_src))
+            any_sent = True
+            state.frame_tables[index] = _frame_table(view.source, exact_frame_index)
+            if clicks is None:
+                clicks = list(history)
+            view_id = view_ids[index]
+            navigation = _navigation_args(
+                state, index, (click for click in clicks if click.get("view") == view_id)
             )
-            
-            if clicks:
-                st.write("**Click Data:**")
-                for i, click in enumerate(clicks):
-                    st.write(f"Click {i+1}: x={click['x']}, y={click['y']}, "
-                            f"frame_time={click['frame_time']:.2f}s, "
-                            f"frame_index={click.get('frame_index', 'N/A')}")
-        except Exception as e:
-            st.error(f"Error loading video: {e}")
-
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+        view_args.append(
+            {
+                "src": video_src,
+                "src_id": view.played_token,
+                "report_size": view.report_size,
+                **navigation,
+            }
+        )
+    for index in list(state.sent_view_tokens):
+        if index >= len(views):
+            del state.sent_view_tokens[index]
+
+    with metrics.span("component"):
+        result = _get_component_func()(
+            views=view_args,
+            columns=columns,
+            sync=sync,
+            sent_at=time.time() * 1000 if any_sent and metrics.enabled() else None,
+            height=height,
+            start_time=start_time,
+            ack=history.last_seq,
+            max_markers=max_clicks,
+            commit=commit.to_args() if commit is not None else None,
+            tracks=tracks,
+            seek=_take_seek(state),
+            key=key,
+            on_change=on_click,
+        )
+
+    new_clicks += apply(result)
+    if new_clicks:
+        metrics.count("clicks", len(new_clicks))
+    for view_id, view in zip(view_ids, views):
+        clicks = [click for click in new_clicks if click.get("view") == view_id]
+        _record_new_clicks(clicks, view.source, exact_frame_index, store, annotator)
+    # Only now are the new clicks final (frame indices, view ids) and may be spilled
+    history.commit()
+
+    if return_type == "table":
+        from .table import ClickTable
+
+        return {
+            view_id: ClickTable(click for click in history.clicks if click.get("view") == view_id)
+            for view_id in view_ids
+        }
+    return list(history.clicks)
@@ -0,0 +1,16 @@
+"""``python -m streamlit_video_coordinates`` runs the demo app."""
+
+import sys
+from pathlib import Path
+
+
+def main() -> None:
+    from streamlit.web import cli  # noqa: PLC0415
+
+    demo = Path(__file__).with_name("demo.py")
+    sys.argv = ["streamlit", "run", str(demo), *sys.argv[1:]]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Process-wide, content-addressed cache for resolved video sources.
+
+Every rerun of every session resolves its ``source`` argument again. When many
+sessions show the same video, the file read (and, in ``"data"`` serving mode,
+the base64 encode) only needs to happen once per process; the result is kept
+here under a key derived from the file's identity or the content itself.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Hashable, Tuple, TypeVar, Union
+
+Payload = Union[bytes, str]
+P = TypeVar("P", bytes, str)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Content above this size is fingerprinted from a few samples instead of being
+# hashed in full. Same trade-off as Streamlit's own media file IDs.
+_PARTIAL_HASH_THRESHOLD = 1024 * 1024
+_PARTIAL_HASH_SAMPLE_SIZE = 64 * 1024
+
+
+def content_fingerprint(data: bytes | memoryview) -> str:
+    """Return a stable hex digest identifying ``data``.
+
+    Content larger than 1 MiB is fingerprinted from its length plus its head,
+    middle and tail (64 KiB each), which keeps the cost constant for large
+    videos. Two inputs that only differ outside those samples collide; for
+    video payloads this is vanishingly unlikely.
+    """
+    view = memoryview(data)
+    size = view.nbytes
+    digest = hashlib.blake2b(f"{size}:".encode(), digest_size=16)
+    if size > _PARTIAL_HASH_THRESHOLD:
+        mid = (size - _PARTIAL_HASH_SAMPLE_SIZE) // 2
+        digest.update(view[:_PARTIAL_HASH_SAMPLE_SIZE])
+        digest.update(view[mid : mid + _PARTIAL_HASH_SAMPLE_SIZE])
+        digest.update(view[-_PARTIAL_HASH_SAMPLE_SIZE:])
+    else:
+        digest.update(view)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: str | Path) -> str:
+    """Return :func:`content_fingerprint` of a file's content.
+
+    Only the sampled ranges are read, so this costs three small reads for a
+    large video rather than loading it.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= _PARTIAL_HASH_THRESHOLD:
+            return content_fingerprint(f.read())
+        digest = hashlib.blake2b(f"{size}:".encode(), digest_size=16)
+        mid = (size - _PARTIAL_HASH_SAMPLE_SIZE) // 2
+        for start in (0, mid, size - _PARTIAL_HASH_SAMPLE_SIZE):
+            f.seek(start)
+            digest.update(f.read(_PARTIAL_HASH_SAMPLE_SIZE))
+        return digest.hexdigest()
+
+
+def path_identity(path: Path) -> Tuple[str, int, int]:
+    """Return ``(absolute path, mtime_ns, size)`` for a local file.
+
+    Cheap to compute (a single ``stat``) and changes whenever the file is
+    rewritten, so it is a safe cache key for path sources.
+    """
+    resolved = path.resolve()
+    st = os.stat(resolved)
+    return str(resolved), st.st_mtime_ns, st.st_size
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Snapshot of a :class:`SourceCache`'s counters."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    current_bytes: int
+    max_bytes: int
+
+
+class SourceCache:
+    """Thread-safe LRU cache of resolved payloads with a byte budget.
+
+    Values are ``bytes`` (raw video content) or ``str`` (data URLs) and are
+    weighted by their length. Least recently used entries are evicted once
+    the total exceeds ``max_bytes``; a single value larger than the whole
+    budget is returned to the caller but never stored (so it is recomputed
+    on every :meth:`get_or_create`).
+
+    Parameters
+    ----------
+    max_bytes : int
+        Total size budget for cached payloads. ``0`` disables caching.
+    weigh : Callable[[Any], int]
+        Size of a value in bytes, for caches holding other kinds of values
+        (e.g. ``lambda a: a.nbytes`` for NumPy arrays).
+    """
+
+    def __init__(
+        self, max_bytes: int = DEFAULT_MAX_BYTES, weigh: Callable[[Any], int] = len
+    ) -> None:
+        self._lock = threading.RLock()
+        self._entries: OrderedDict[Hashable, Payload] = OrderedDict()
+        self._weigh = weigh
+        self._max_bytes = max_bytes
+        self._current_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int) -> None:
+        if value < 0:
+            raise ValueError("max_bytes must be non-negative")
+        with self._lock:
+            self._max_bytes = value
+            self._evict()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                current_bytes=self._current_bytes,
+                max_bytes=self._max_bytes,
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Payload | None:
+        """Return the cached value for ``key`` (marking it recently used)."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Payload) -> None:
+        """Store ``value`` under ``key``, evicting old entries if needed."""
+        size = self._weigh(value)
+        with self._lock:
+            if key in self._entries:
+                self._current_bytes -= self._weigh(self._entries.pop(key))
+            if size > self._max_bytes:
+                return
+            self._entries[key] = value
+            self._current_bytes += size
+            self._evict()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], P]) -> P:
+        """Return the cached value for ``key``, computing it on a miss.
+
+        ``factory`` runs outside the lock so that a slow read of one video
+        does not block sessions resolving other videos.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value  # type: ignore[return-value]
+        value = factory()
+        self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+            self._hits = self._misses = self._evictions = 0
+
+    def _evict(self) -> None:
+        while self._current_bytes > self._max_bytes and self._entries:
+            _, value = self._entries.popitem(last=False)
+            self._current_bytes -= self._weigh(value)
+            self._evictions += 1
+
+
+# Shared by every session in the process. Adjust the budget with e.g.
+# ``source_cache.max_bytes = 2 * 1024**3``.
+source_cache = SourceCache()
@@ -0,0 +1,183 @@
+"""Python-side reassembly of the incremental click protocol.
+
+Instead of resending every click recorded so far, the frontend numbers each
+click with a sequence number and only sends the clicks Python has not
+acknowledged yet::
+
+    {"clicks": [{"seq": 41, "x": ..., ...}, {"seq": 42, ...}]}
+
+Python appends clicks whose ``seq`` is newer than the last one applied and
+passes that number back to the frontend as the ``ack`` argument, which lets
+the frontend drop them from its pending buffer. A batch may be delivered more
+than once (Streamlit reports the last component value on every rerun), so
+applying it is idempotent.
+
+With ``max_clicks`` set, only the most recent clicks are kept in memory; older
+ones are appended to a JSON Lines spill file and can be read back lazily, so
+memory per session stays flat however long the session runs. Clicks are only
+spilled by :meth:`ClickHistory.commit`, once the caller has finished filling
+them in (exact frame indices, view ids); the spill file is deleted with the
+history.
+"""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import uuid
+import weakref
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from .table import ClickTable
+
+Click = Dict[str, Any]
+
+
+def _remove_file(path: Path) -> None:
+    path.unlink(missing_ok=True)
+
+
+def _default_spill_directory() -> Path:
+    return Path(tempfile.gettempdir()) / "streamlit_video_coordinates" / "history"
+
+
+class ClickHistory:
+    """The ordered clicks of one component instance.
+
+    Parameters
+    ----------
+    max_clicks : int | None
+        Keep at most this many of the most recent clicks in memory and spill
+        older ones to disk. ``None`` (the default) keeps everything in memory.
+    spill_directory : str | Path | None
+        Where spill files are written. Defaults to a folder in the system
+        temporary directory.
+    """
+
+    def __init__(
+        self,
+        max_clicks: int | None = None,
+        spill_directory: str | Path | None = None,
+    ) -> None:
+        self.clicks: List[Click] = []
+        self.last_seq = 0
+        self.source_id: Any = None
+        self.spilled_count = 0
+        self._spill_directory = (
+            Path(spill_directory) if spill_directory else _default_spill_directory()
+        )
+        self._spill_path: Path | None = None
+        self._spill_finalizer: weakref.finalize | None = None
+        self._table: ClickTable | None = None
+        self.max_clicks = max_clicks
+
+    @property
+    def max_clicks(self) -> int | None:
+        return self._max_clicks
+
+    @max_clicks.setter
+    def max_clicks(self, value: int | None) -> None:
+        if value is not None and value < 1:
+            raise ValueError("max_clicks must be at least 1")
+        self._max_clicks = value
+        self.commit()
+
+    def __len__(self) -> int:
+        """Number of clicks, including those spilled to disk."""
+        return self.spilled_count + len(self.clicks)
+
+    def __iter__(self) -> Iterator[Click]:
+        """Iterate over every click, oldest first, reading spilled ones lazily."""
+        return chain(self.spilled(), list(self.clicks))
+
+    def spilled(self) -> Iterator[Click]:
+        """Iterate over the clicks spilled to disk, oldest first."""
+        if self._spill_path is None or not self.spilled_count:
+            return
+        with open(self._spill_path, encoding="utf-8") as f:
+            for _, line in zip(range(self.spilled_count), f):
+                yield json.loads(line)
+
+    def clear(self) -> None:
+        """Forget every click, deleting the spill file."""
+        self.clicks = []
+        self._table = None
+        self.spilled_count = 0
+        if self._spill_finalizer is not None:
+            self._spill_finalizer()
+            self._spill_finalizer = None
+            self._spill_path = None
+
+    def commit(self) -> None:
+        """Spill the oldest clicks beyond ``max_clicks`` to disk.
+
+        Call this once the clicks returned by :meth:`apply` are final:
+        spilled clicks are not updated anymore.
+        """
+        if self.max_clicks is None or len(self.clicks) <= self.max_clicks:
+            return
+        overflow = len(self.clicks) - self.max_clicks
+        if self._spill_path is None:
+            self._spill_directory.mkdir(parents=True, exist_ok=True)
+            self._spill_path = self._spill_directory / f"{uuid.uuid4().hex}.jsonl"
+            # Removed when the history is garbage collected (e.g. with its
+            # session) or at exit, so spill files don't pile up
+            self._spill_finalizer = weakref.finalize(self, _remove_file, self._spill_path)
+        with open(self._spill_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(click) + "\n" for click in self.clicks[:overflow])
+        self.spilled_count += overflow
+        del self.clicks[:overflow]
+        # The table mirrors the in-memory clicks only
+        self._table = None
+
+    def bind(self, source_id: Any) -> None:
+        """Associate the history with a video, forgetting clicks on another.
+
+        ``last_seq`` is kept: the frontend keeps counting, and any batch
+        still in flight for the previous video must not be applied again.
+        """
+        if self.source_id is not None and self.source_id != source_id:
+            self.clear()
+        self.source_id = source_id
+
+    def table(self) -> ClickTable:
+        """Return the in-memory clicks as a :class:`ClickTable`.
+
+        The table is kept alongside the list and only the clicks added since
+        the previous call are converted (it is rebuilt after clicks have been
+        spilled).
+        """
+        if self._table is None:
+            self._table = ClickTable()
+        self._table.extend(self.clicks[len(self._table) :])
+        return self._table
+
+    def apply(self, value: Any) -> List[Click]:
+        """Apply a component value and return the clicks that were new.
+
+        ``value`` is either a delta batch as described in the module
+        docstring or, from frontends predating the protocol, the full list
+        of clicks (which replaces the history). The new clicks may be
+        modified in place until :meth:`commit` is called.
+        """
+        if value is None:
+            return []
+
+        if isinstance(value, list):
+            self.clear()
+            self.clicks = list(value)
+            return []
+
+        new = []
+        for click in value.get("clicks", ()):
+            seq = click.get("seq", 0)
+            if seq <= self.last_seq:
+                continue
+            self.last_seq = seq
+            click = {k: v for k, v in click.items() if k != "seq"}
+            new.append(click)
+
+        self.clicks.extend(new)
+        return new
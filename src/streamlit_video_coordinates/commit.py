@@ -0,0 +1,63 @@
+"""When the browser hands clicks to Python.
+
+Every value the component sends reruns the whole Streamlit script. By default
+each click is sent (committed) right away; on expensive pages a
+:class:`CommitPolicy` lets the player buffer clicks instead and commit a whole
+burst at once::
+
+    policy = CommitPolicy(debounce_ms=800, on_play=True, key="Enter", max_batch=25)
+    clicks = streamlit_video_coordinates(video, key="video", commit=policy)
+
+Buffered clicks are drawn as hollow markers and counted in an "unsaved"
+badge, which can be clicked to commit them. A policy without any trigger
+commits every click immediately.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict
+
+
+@dataclass(frozen=True)
+class CommitPolicy:
+    """Triggers for committing buffered clicks; any one of them commits.
+
+    Attributes
+    ----------
+    debounce_ms : int | None
+        Commit once no click has been made for this many milliseconds.
+    on_play : bool
+        Commit when playback starts or the user seeks, i.e. when they move
+        on from the annotated frame.
+    key : str | None
+        Commit when this key is pressed in the player, as named by
+        ``KeyboardEvent.key`` (e.g. ``"Enter"`` or ``"s"``).
+    max_batch : int | None
+        Commit as soon as this many clicks are buffered.
+    """
+
+    debounce_ms: int | None = None
+    on_play: bool = False
+    key: str | None = None
+    max_batch: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.debounce_ms is not None and self.debounce_ms < 0:
+            raise ValueError("debounce_ms must not be negative")
+        if self.max_batch is not None and self.max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+
+    @property
+    def immediate(self) -> bool:
+        """Whether every click is committed as soon as it is made."""
+        return (
+            self.debounce_ms is None
+            and not self.on_play
+            and self.key is None
+            and self.max_batch in (None, 1)
+        )
+
+    def to_args(self) -> Dict[str, Any] | None:
+        """Return the policy as sent to the frontend (``None``: immediate)."""
+        return None if self.immediate else asdict(self)
@@ -0,0 +1,81 @@
+"""Demo app for the component.
+
+Run it with ``python -m streamlit_video_coordinates`` (or
+``streamlit run`` on this file).
+"""
+
+import streamlit as st
+
+from streamlit_video_coordinates import streamlit_video_coordinates
+
+
+def main():
+    st.set_page_config(
+        page_title="Streamlit Video Coordinates",
+        page_icon="🎯",
+        layout="wide",
+    )
+
+    st.title("🎯 Streamlit Video Coordinates")
+
+    st.markdown("""
+    This component allows you to display a video and capture coordinates when you click on paused frames.
+
+    **Instructions:**
+    1. Upload a video file or provide a URL
+    2. Play the video and pause at the frame you want to annotate
+    3. Click on the video to capture coordinates and frame information
+    """)
+
+    # Example with file upload
+    st.header("Upload Video File")
+    uploaded_file = st.file_uploader(
+        "Choose a video file",
+        type=['mp4', 'webm', 'ogg', 'avi', 'mov']
+    )
+
+    if uploaded_file is not None:
+        st.write("### Uploaded Video Example")
+        clicks = streamlit_video_coordinates(
+            uploaded_file,
+            key="uploaded_video",
+            width=640,
+            height=360
+        )
+
+        if clicks:
+            st.write("**Click Data:**")
+            for i, click in enumerate(clicks):
+                st.write(f"Click {i+1}: x={click['x']}, y={click['y']}, "
+                        f"frame_time={click['frame_time']:.2f}s, "
+                        f"frame_index={click.get('frame_index', 'N/A')}")
+
+    # Example with URL
+    st.header("Video URL")
+    video_url = st.text_input(
+        "Enter video URL",
+        placeholder="https://example.com/video.mp4"
+    )
+
+    if video_url:
+        st.write("### URL Video Example")
+        try:
+            clicks = streamlit_video_coordinates(
+                video_url,
+                key="url_video",
+                width=640,
+                height=360
+            )
+
+            if clicks:
+                st.write("**Click Data:**")
+                for i, click in enumerate(clicks):
+                    st.write(f"Click {i+1}: x={click['x']}, y={click['y']}, "
+                            f"frame_time={click['frame_time']:.2f}s, "
+                            f"frame_index={click.get('frame_index', 'N/A')}")
+        except Exception as e:
+            st.error(f"Error loading video: {e}")
+
+
+if __name__ == "__main__":
+    main()
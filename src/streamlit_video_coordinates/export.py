@@ -0,0 +1,295 @@
+"""Stream click data to CSV, JSON Lines, COCO keypoints and Parquet.
+
+Every exporter is a generator of chunks (``str`` for the text formats,
+``bytes`` for Parquet) that serialises ``chunk_size`` clicks at a time, so a
+session with hundreds of thousands of clicks is never held in memory as one
+serialised document. Anything iterable over click dicts can be exported: the
+list returned by the component, a :class:`.ClickTable`, a
+:class:`.ClickHistory` (including clicks spilled to disk) or the result of an
+:class:`.AnnotationStore` query.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Mapping, Sequence
+
+import numpy as np
+from typing_extensions import Literal, TypeAlias
+
+from .table import CLICK_COLUMNS, ClickTable
+
+ExportFormat: TypeAlias = Literal["csv", "jsonl", "coco", "parquet"]
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+_MIMETYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/jsonl",
+    "coco": "application/json",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+_EXTENSIONS = {"csv": ".csv", "jsonl": ".jsonl", "coco": ".json", "parquet": ".parquet"}
+
+
+def _batches(clicks: Iterable[Mapping[str, Any]], size: int) -> Iterator[List[Mapping[str, Any]]]:
+    it = iter(clicks)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_csv(
+    clicks: Iterable[Mapping[str, Any]],
+    columns: Sequence[str] = tuple(CLICK_COLUMNS),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """Yield CSV text: a header line, then ``chunk_size`` rows per chunk.
+
+    Missing fields are written as empty cells; fields not in ``columns`` are
+    left out.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(columns), extrasaction="ignore")
+    writer.writeheader()
+    yield buffer.getvalue()
+    for batch in _batches(clicks, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue()
+
+
+def iter_jsonl(
+    clicks: Iterable[Mapping[str, Any]], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[str]:
+    """Yield JSON Lines text, one click object per line."""
+    for batch in _batches(clicks, chunk_size):
+        yield "".join(json.dumps(dict(click)) + "\n" for click in batch)
+
+
+def iter_coco(
+    clicks: Iterable[Mapping[str, Any]],
+    video_name: str = "video",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """Yield a COCO keypoints document with one single-point annotation per click.
+
+    Every annotated frame becomes an image named ``<video_name>_<frame>``
+    (with ``frame_index`` as its ID) and every click an annotation of the
+    ``"point"`` category with keypoints ``[x, y, 2]``. Annotations are
+    streamed first; the ``images`` list, which only holds one small entry per
+    distinct frame, is written at the end.
+    """
+    category = {
+        "id": 1,
+        "name": "point",
+        "supercategory": "point",
+        "keypoints": ["point"],
+        "skeleton": [],
+    }
+    yield (
+        '{"info": '
+        + json.dumps({"description": f"Clicks on {video_name}"})
+        + ', "categories": '
+        + json.dumps([category])
+        + ', "annotations": ['
+    )
+
+    images: Dict[int, Dict[str, Any]] = {}
+    annotation_id = 0
+    separator = ""
+    for batch in _batches(clicks, chunk_size):
+        parts = []
+        for click in batch:
+            frame = click.get("frame_index")
+            frame = -1 if frame is None else int(frame)
+            if frame not in images:
+                images[frame] = {
+                    "id": frame,
+                    "file_name": f"{video_name}_{frame:06d}",
+                    "width": click.get("width"),
+                    "height": click.get("height"),
+                    "frame_time": click.get("frame_time"),
+                }
+            annotation_id += 1
+            x, y = click["x"], click["y"]
+            parts.append(
+                json.dumps(
+                    {
+                        "id": annotation_id,
+                        "image_id": frame,
+                        "category_id": 1,
+                        "keypoints": [x, y, 2],
+                        "num_keypoints": 1,
+                        "bbox": [x, y, 0, 0],
+                        "area": 0,
+                        "iscrowd": 0,
+                    }
+                )
+            )
+        yield separator + ", ".join(parts)
+        separator = ", "
+
+    yield '], "images": ' + json.dumps(list(images.values())) + "}"
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only stream that hands written bytes back in chunks."""
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _arrow_batches(clicks: Iterable[Mapping[str, Any]], chunk_size: int, schema):
+    import pyarrow as pa  # noqa: PLC0415
+
+    if isinstance(clicks, ClickTable):
+        # Straight from the column arrays; -1 / NaN mark missing values
+        columns = clicks.to_numpy()
+        for start in range(0, len(clicks), chunk_size):
+            arrays = []
+            for name, dtype in CLICK_COLUMNS.items():
+                values = columns[name][start : start + chunk_size]
+                missing = np.isnan(values) if dtype.kind == "f" else values == -1
+                arrays.append(pa.array(values, mask=missing))
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+        return
+
+    for batch in _batches(clicks, chunk_size):
+        yield pa.RecordBatch.from_pylist(
+            [{name: click.get(name) for name in CLICK_COLUMNS} for click in batch],
+            schema=schema,
+        )
+
+
+def iter_parquet(
+    clicks: Iterable[Mapping[str, Any]], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Yield a Parquet file in pieces, one row group per ``chunk_size`` clicks.
+
+    Requires ``pyarrow``. Missing fields are stored as nulls.
+    """
+    try:
+        import pyarrow as pa  # noqa: PLC0415
+        import pyarrow.parquet as pq  # noqa: PLC0415
+    except ImportError as e:  # pragma: no cover - depends on the environment
+        raise ImportError("Parquet export requires pyarrow: pip install pyarrow") from e
+
+    schema = pa.schema([(name, pa.from_numpy_dtype(dtype)) for name, dtype in CLICK_COLUMNS.items()])
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for batch in _arrow_batches(clicks, chunk_size, schema):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_export(
+    clicks: Iterable[Mapping[str, Any]],
+    format: ExportFormat,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    **options: Any,
+) -> Iterator[bytes]:
+    """Yield the export of ``clicks`` in ``format`` as encoded chunks.
+
+    ``options`` are passed to the format's exporter (e.g. ``video_name`` for
+    ``"coco"``).
+    """
+    exporters: Dict[str, Callable[..., Iterator[Any]]] = {
+        "csv": iter_csv,
+        "jsonl": iter_jsonl,
+        "coco": iter_coco,
+        "parquet": iter_parquet,
+    }
+    if format not in exporters:
+        raise ValueError(f"Unknown export format: {format!r}")
+    for chunk in exporters[format](clicks, chunk_size=chunk_size, **options):
+        yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+def write_export(
+    clicks: Iterable[Mapping[str, Any]],
+    destination: str | Path | IO[bytes],
+    format: ExportFormat,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    **options: Any,
+) -> None:
+    """Write the export of ``clicks`` to a path or binary file, chunk by chunk."""
+    if isinstance(destination, (str, Path)):
+        with open(destination, "wb") as f:
+            write_export(clicks, f, format, chunk_size, **options)
+        return
+    for chunk in iter_export(clicks, format, chunk_size, **options):
+        destination.write(chunk)
+
+
+def _deferred_downloads_supported() -> bool:
+    from streamlit.runtime.media_file_manager import MediaFileManager  # noqa: PLC0415
+
+    return hasattr(MediaFileManager, "add_deferred")
+
+
+def download_button(
+    clicks: Iterable[Mapping[str, Any]],
+    format: ExportFormat = "csv",
+    label: str | None = None,
+    file_name: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    options: Mapping[str, Any] | None = None,
+    **kwargs: Any,
+) -> bool:
+    """Show an ``st.download_button`` serving the export of ``clicks``.
+
+    ``st.download_button`` needs the whole payload in memory, so unlike
+    :func:`write_export` this holds the complete document while the
+    download is served; use :func:`write_export` for large sessions. On
+    Streamlit versions that support deferred downloads the export is only
+    built once the button is clicked. Older versions build it eagerly, on
+    every rerun that shows the button.
+
+    ``options`` are passed to :func:`write_export` (e.g.
+    ``{"video_name": "clip"}`` for COCO); other keyword arguments are passed
+    to ``st.download_button``.
+    """
+    import streamlit as st  # noqa: PLC0415
+
+    if format not in _MIMETYPES:
+        raise ValueError(f"Unknown export format: {format!r}")
+
+    def data() -> bytes:
+        # st.download_button only accepts a few stream types; bytes always work
+        return b"".join(iter_export(clicks, format, chunk_size, **(options or {})))
+
+    return st.download_button(
+        label or f"Download {format.upper()}",
+        data=data if _deferred_downloads_supported() else data(),
+        file_name=file_name or f"clicks{_EXTENSIONS[format]}",
+        mime=_MIMETYPES[format],
+        **kwargs,
+    )
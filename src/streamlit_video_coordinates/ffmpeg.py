@@ -0,0 +1,42 @@
+"""Run the locally installed ``ffmpeg`` across its versions.
+
+ffmpeg 5.1 renamed ``-vsync`` to ``-fps_mode``, and later releases warn about
+(and eventually drop) the old name. Commands in this package are written with
+``-fps_mode``; an executable that rejects it is remembered and run with
+``-vsync`` instead.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import threading
+from typing import Any, List, Set
+
+_legacy_executables: Set[str] = set()
+_lock = threading.Lock()
+
+
+def _with_vsync(command: List[str]) -> List[str]:
+    return ["-vsync" if arg == "-fps_mode" else arg for arg in command]
+
+
+def run_ffmpeg(command: List[str], **kwargs: Any) -> subprocess.CompletedProcess:
+    """Run ``command`` (whose first item is the executable) and capture its output.
+
+    Keyword arguments are passed to :func:`subprocess.run`.
+    """
+    executable = command[0]
+    with _lock:
+        legacy = executable in _legacy_executables
+    if legacy:
+        return subprocess.run(_with_vsync(command), capture_output=True, **kwargs)
+
+    result = subprocess.run(command, capture_output=True, **kwargs)
+    stderr = result.stderr
+    if isinstance(stderr, bytes):
+        stderr = stderr.decode(errors="replace")
+    if result.returncode != 0 and "-fps_mode" in command and "fps_mode" in stderr:
+        with _lock:
+            _legacy_executables.add(executable)
+        result = subprocess.run(_with_vsync(command), capture_output=True, **kwargs)
+    return result
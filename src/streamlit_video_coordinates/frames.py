@@ -0,0 +1,268 @@
+"""Decode the pixels of clicked frames.
+
+Clicks usually end up next to the image they were made on, e.g. to train a
+keypoint model. Rather than decoding the whole video, a :class:`FrameGrabber`
+decodes only the annotated frames: requested frames are grouped by the
+keyframe they follow, and the decoder seeks to each of those keyframes once
+and decodes forward to the frames of its group. Decoded frames are kept in a
+bounded LRU keyed by the video's content ID and frame index, so grabbing the
+same frames again (on the next rerun, or from another session) is free::
+
+    clicks = streamlit_video_coordinates("video.mp4", key="video")
+    images = frame_grabber.grab("video.mp4", clicks)     # one per click
+    crops = frame_grabber.patches("video.mp4", clicks, size=64)
+
+Frames are located through the container's frame table (see
+:mod:`.timestamps`), so the video must be a local MP4, MOV, WebM or MKV file
+or bytes. Decoding is done by a pluggable :class:`FrameDecoder`; the default
+one runs a locally installed ``ffmpeg``.
+"""
+
+from __future__ import annotations
+
+import shutil
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+from typing_extensions import Protocol
+
+from . import metrics
+from .cache import SourceCache
+from .ffmpeg import run_ffmpeg
+from .sources import content_id, local_path
+from .timestamps import FrameTable, frame_table_for_source
+
+DEFAULT_MAX_FRAME_BYTES = 512 * 1024 * 1024
+
+
+class FrameDecoder(Protocol):
+    """Decodes frames of a local video file."""
+
+    def decode(
+        self, path: Path, start: float, times: Sequence[float], size: Tuple[int, int]
+    ) -> List[np.ndarray]:
+        """Return the frames presented at ``times`` as RGB arrays.
+
+        ``times`` are ascending presentation timestamps (seconds) taken from
+        the video's frame table, and ``start`` is the time of a keyframe at or
+        before the first of them, from which decoding can begin. ``size`` is
+        the ``(width, height)`` recorded in the container. Each returned
+        array has shape ``(height, width, 3)`` and dtype ``uint8``.
+        """
+        ...
+
+
+class FFmpegDecoder:
+    """Decode frames by running ``ffmpeg``, one process per keyframe group.
+
+    Parameters
+    ----------
+    ffmpeg : str
+        Executable to use.
+    tolerance : float
+        How far (seconds) a decoded frame's timestamp may be from the
+        requested one. Must be less than half the frame interval.
+    """
+
+    def __init__(self, ffmpeg: str = "ffmpeg", tolerance: float = 5e-4) -> None:
+        self.ffmpeg = ffmpeg
+        self.tolerance = tolerance
+
+    def decode(
+        self, path: Path, start: float, times: Sequence[float], size: Tuple[int, int]
+    ) -> List[np.ndarray]:
+        executable = shutil.which(self.ffmpeg)
+        if executable is None:
+            raise RuntimeError(
+                f"Grabbing frames requires {self.ffmpeg!r}; install ffmpeg or pass "
+                "another decoder to FrameGrabber()"
+            )
+        width, height = size
+        select = "+".join(
+            f"between(t,{t - self.tolerance:.6f},{t + self.tolerance:.6f})" for t in times
+        )
+        command = [
+            executable, "-v", "error",
+            # Input seeking lands on the keyframe; -copyts keeps the
+            # container's timestamps so they can be matched exactly
+            "-ss", f"{start:.6f}", "-copyts", "-i", str(path),
+            "-map", "0:v:0",
+            "-vf", f"select='{select}',scale={width}:{height}",
+            "-fps_mode", "passthrough",
+            "-frames:v", str(len(times)),
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-",
+        ]
+        result = run_ffmpeg(command)
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"ffmpeg failed to decode frames of {path}: "
+                f"{result.stderr.decode(errors='replace').strip()}"
+            )
+        frame_bytes = width * height * 3
+        if len(result.stdout) != frame_bytes * len(times):
+            raise RuntimeError(
+                f"ffmpeg decoded {len(result.stdout) // frame_bytes} of "
+                f"{len(times)} requested frames of {path}"
+            )
+        frames = np.frombuffer(result.stdout, dtype=np.uint8).reshape(len(times), height, width, 3)
+        return list(frames)
+
+
+class FrameGrabber:
+    """Decodes clicked frames on demand and caches them.
+
+    Safe to share between sessions.
+
+    Parameters
+    ----------
+    decoder : FrameDecoder | None
+        Decoder to use; defaults to :class:`FFmpegDecoder`.
+    max_bytes : int
+        Memory budget of the frame cache. ``0`` disables caching.
+    """
+
+    def __init__(
+        self, decoder: FrameDecoder | None = None, max_bytes: int = DEFAULT_MAX_FRAME_BYTES
+    ) -> None:
+        self.decoder = decoder if decoder is not None else FFmpegDecoder()
+        self.cache = SourceCache(max_bytes, weigh=lambda frame: frame.nbytes)
+
+    def _frame_table(self, source: Any) -> FrameTable:
+        frames = frame_table_for_source(source)
+        if frames is None or len(frames) == 0:
+            raise ValueError(
+                "Grabbing frames requires a local MP4, MOV, WebM or MKV video "
+                "whose frame timestamps can be read"
+            )
+        if not (frames.width and frames.height):
+            raise ValueError("The container does not record the video's frame size")
+        return frames
+
+    def frames(self, source: Any, frame_indices: Iterable[int]) -> List[np.ndarray]:
+        """Return the given frames of ``source`` as read-only RGB arrays.
+
+        Only frames missing from the cache are decoded, grouped by the
+        keyframe they follow.
+
+        Raises
+        ------
+        ValueError
+            If ``source`` is a URL, its container is not supported, or an
+            index is out of range.
+        RuntimeError
+            If decoding fails.
+        """
+        indices = [int(i) for i in frame_indices]
+        if not indices:
+            return []
+        table = self._frame_table(source)
+        if min(indices) < 0 or max(indices) >= len(table):
+            raise ValueError(f"Frame indices must be within [0, {len(table)})")
+
+        video_id = content_id(source)
+        found: Dict[int, np.ndarray] = {}
+        missing = []
+        for index in dict.fromkeys(indices):
+            frame = self.cache.get((video_id, index))
+            if frame is None:
+                missing.append(index)
+            else:
+                found[index] = frame
+        if missing:
+            found.update(self._decode(source, video_id, table, missing))
+        return [found[i] for i in indices]
+
+    def _decode(
+        self, source: Any, video_id: str, table: FrameTable, indices: List[int]
+    ) -> Dict[int, np.ndarray]:
+        times = table.frame_time(indices)
+        # Index of the keyframe each frame follows (frames before the first
+        # keyframe can only be reached from the start of the stream)
+        groups_of = np.searchsorted(table.keyframes, times, side="right") - 1
+        groups: Dict[int, List[Tuple[float, int]]] = defaultdict(list)
+        for group, time, index in zip(groups_of.tolist(), times.tolist(), indices):
+            groups[group].append((time, index))
+
+        path = local_path(source)
+        size = (table.width, table.height)
+        decoded: Dict[int, np.ndarray] = {}
+        with metrics.span("frame_decode", frames=len(indices), groups=len(groups)):
+            for group, members in sorted(groups.items()):
+                members.sort()
+                start = float(table.keyframes[group]) if group >= 0 else 0.0
+                frames = self.decoder.decode(path, start, [t for t, _ in members], size)
+                if len(frames) != len(members):
+                    raise RuntimeError(
+                        f"The decoder returned {len(frames)} frames for {len(members)} requested"
+                    )
+                for (_, index), frame in zip(members, frames):
+                    frame = np.asarray(frame, dtype=np.uint8)
+                    # Frames are shared through the cache
+                    frame.flags.writeable = False
+                    self.cache.put((video_id, index), frame)
+                    decoded[index] = frame
+        return decoded
+
+    def _click_frames(
+        self, source: Any, clicks: Iterable[Mapping[str, Any]]
+    ) -> Tuple[List[Mapping[str, Any]], List[int]]:
+        clicks = list(clicks)
+        indices: List[Any] = [click.get("frame_index") for click in clicks]
+        unknown = [i for i, index in enumerate(indices) if index is None or index < 0]
+        if unknown:
+            # Clicks made without exact frame indices: look them up by time
+            table = self._frame_table(source)
+            times = [
+                clicks[i]["frame_time"]
+                if clicks[i].get("media_time") is None
+                else clicks[i]["media_time"]
+                for i in unknown
+            ]
+            for i, index in zip(unknown, table.frame_index(times).tolist()):
+                indices[i] = index
+        return clicks, [int(index) for index in indices]
+
+    def grab(self, source: Any, clicks: Iterable[Mapping[str, Any]]) -> List[np.ndarray]:
+        """Return the frame each click was made on, one array per click.
+
+        ``clicks`` is what the component returned (a list of dicts or a
+        :class:`.ClickTable`). Clicks on the same frame share one array.
+        """
+        _, indices = self._click_frames(source, clicks)
+        return self.frames(source, indices)
+
+    def patches(
+        self, source: Any, clicks: Iterable[Mapping[str, Any]], size: int = 64
+    ) -> np.ndarray:
+        """Return a ``size`` x ``size`` crop of the frame around each click.
+
+        Returns an array of shape ``(len(clicks), size, size, 3)``. Click
+        coordinates are scaled from the click's ``width``/``height`` to the
+        decoded frame, and crops reaching past the frame's edges are padded
+        with black.
+        """
+        clicks, indices = self._click_frames(source, clicks)
+        frames = self.frames(source, indices)
+        patches = np.zeros((len(clicks), size, size, 3), dtype=np.uint8)
+        half = size // 2
+        for patch, click, frame in zip(patches, clicks, frames):
+            frame_height, frame_width = frame.shape[:2]
+            x, y = click["x"], click["y"]
+            if click.get("width") and click.get("height"):
+                x = x * frame_width / click["width"]
+                y = y * frame_height / click["height"]
+            left, top = round(x) - half, round(y) - half
+            x0, y0 = max(left, 0), max(top, 0)
+            x1, y1 = min(left + size, frame_width), min(top + size, frame_height)
+            if x0 < x1 and y0 < y1:
+                patch[y0 - top : y1 - top, x0 - left : x1 - left] = frame[y0:y1, x0:x1]
+        return patches
+
+    def clear(self) -> None:
+        """Drop every cached frame."""
+        self.cache.clear()
+
+
+frame_grabber = FrameGrabber()
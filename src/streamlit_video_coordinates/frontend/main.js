@@ -1,49 +1,552 @@
 // The `Streamlit` object exists because our html file includes
 // `streamlit-component-lib.js`.
 
-// Store all click events
-let clickEvents = [];
+// Clicks are sent incrementally: each click gets a sequence number, and only
+// clicks Python has not acknowledged yet (via the `ack` arg) are sent. Python
+// reassembles them into the full history.
+let pendingClicks = [];
+let lastSeq = 0;
+
+// One player ("view") per video. A single video is drawn as a grid of one
+// view; in grid mode (the `views` arg) clicks are tagged with the index of
+// the view they were made on.
+let views = [];
+let gridMode = false;
+
+// Grid mode: play, pause, seeks and playback rate of any view are applied to
+// all of them, so the views share one playback clock.
+let syncViews = false;
+
+// Each video payload is identified by its `src_id`; Python only sends `src`
+// when the id changes. An iframe that missed some (e.g. after being
+// remounted) asks for them again with a fresh `src_request` nonce.
+let srcRequest = null;
+let requestedSrcIds = null;
+
+function markTiming(view, name) {
+  if (view.srcAssignedAt !== null && !(name in view.timings)) {
+    view.timings[name] = performance.now() - view.srcAssignedAt;
+  }
+}
+
+// Clicks are buffered here until the commit policy (the `commit` arg) says
+// to send them; every send reruns the Python script. null: send each click
+// immediately. Clicks up to `committedSeq` have been sent.
+let commitPolicy = null;
+let committedSeq = 0;
+let commitTimer = null;
 
 function sendValue() {
-  Streamlit.setComponentValue(clickEvents)
+  Streamlit.setComponentValue({
+    clicks: pendingClicks,
+    src_request: srcRequest,
+    timings: views.map((view) => view.timings),
+  });
+  // Whatever the reason for sending, buffered clicks went along
+  if (committedSeq !== lastSeq) {
+    committedSeq = lastSeq;
+    views.forEach(requestRedraw);
+  }
+  cancelCommitTimer();
+  updateCommitStatus();
+}
+
+function uncommittedCount() {
+  return pendingClicks.filter((click) => click.seq > committedSeq).length;
+}
+
+function cancelCommitTimer() {
+  if (commitTimer !== null) {
+    window.clearTimeout(commitTimer);
+    commitTimer = null;
+  }
+}
+
+/**
+ * Send the buffered clicks, if there are any
+ */
+function commitPending() {
+  if (uncommittedCount() > 0) {
+    sendValue();
+  }
+}
+
+/**
+ * Apply the commit policy after a click was buffered
+ */
+function scheduleCommit() {
+  const policy = commitPolicy;
+  if (policy === null || (policy.max_batch != null && uncommittedCount() >= policy.max_batch)) {
+    sendValue();
+    return;
+  }
+  if (policy.debounce_ms != null) {
+    cancelCommitTimer();
+    commitTimer = window.setTimeout(() => {
+      commitTimer = null;
+      commitPending();
+    }, policy.debounce_ms);
+  }
+  updateCommitStatus();
+}
+
+/**
+ * Show how many clicks are buffered; the badge commits them when clicked
+ */
+function updateCommitStatus() {
+  const status = document.getElementById("commit-status");
+  const count = uncommittedCount();
+  status.hidden = count === 0;
+  if (count > 0) {
+    const hint = commitPolicy && commitPolicy.key ? ` (${commitPolicy.key} to save)` : "";
+    status.textContent = `${count} unsaved click${count === 1 ? "" : "s"}${hint}`;
+  }
+}
+
+// With the `tracks` arg, each click is assigned to the active track: keys 1-9
+// pick a track, "n" starts a new one. Tracks are told apart by marker colour.
+let tracksEnabled = false;
+let activeTrack = 1;
+let highestTrack = 1;
+const TRACK_COLORS = ["#e6194b", "#3cb44b", "#4363d8", "#ffe119", "#911eb4", "#42d4f4", "#f032e6", "#bfef45", "#9a6324"];
+
+function trackColor(track) {
+  return track == null ? "red" : TRACK_COLORS[(track - 1) % TRACK_COLORS.length];
+}
+
+/**
+ * Show the active track and how to change it
+ */
+function updateTrackStatus() {
+  const status = document.getElementById("track-status");
+  status.hidden = !tracksEnabled;
+  if (tracksEnabled) {
+    status.textContent = `Track ${activeTrack} (1-9, n: new)`;
+    status.style.borderColor = trackColor(activeTrack);
+  }
+}
+
+/**
+ * Pick the active track from the keyboard (once per page)
+ */
+function setupTrackKeys() {
+  document.addEventListener("keydown", (event) => {
+    if (!tracksEnabled || event.ctrlKey || event.metaKey || event.altKey) {
+      return;
+    }
+    if (commitPolicy !== null && event.key === commitPolicy.key) {
+      return;
+    }
+    if (event.key >= "1" && event.key <= "9") {
+      activeTrack = Number(event.key);
+    } else if (event.key === "n") {
+      activeTrack = highestTrack + 1;
+    } else {
+      return;
+    }
+    event.preventDefault();
+    highestTrack = Math.max(highestTrack, activeTrack);
+    updateTrackStatus();
+  });
+}
+
+// Review navigation. Each view keeps the ascending times of its annotated
+// frames and of its keyframes (sent by Python along with the video, plus
+// clicks made since): "]" / "[" seek to the next / previous annotated frame,
+// "}" / "{" to the next / previous keyframe, "k" to the nearest keyframe.
+// Each jump is a binary search.
+const NAV_TOLERANCE = 0.001;
+let activeView = null;
+let lastSeekId = null;
+
+/**
+ * Index of the first time >= t in an ascending array (binary search)
+ */
+function timeLowerBound(times, t) {
+  let lo = 0;
+  let hi = times.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (times[mid] < t) {
+      lo = mid + 1;
+    } else {
+      hi = mid;
+    }
+  }
+  return lo;
+}
+
+function nextTime(times, t) {
+  const i = timeLowerBound(times, t + NAV_TOLERANCE);
+  return i < times.length ? times[i] : null;
+}
+
+function previousTime(times, t) {
+  const i = timeLowerBound(times, t - NAV_TOLERANCE);
+  return i > 0 ? times[i - 1] : null;
+}
+
+function nearestTime(times, t) {
+  const i = timeLowerBound(times, t);
+  const candidates = times.slice(Math.max(i - 1, 0), i + 1);
+  if (!candidates.length) {
+    return null;
+  }
+  return candidates.reduce((a, b) => (Math.abs(b - t) < Math.abs(a - t) ? b : a));
+}
+
+/**
+ * Add a time to an ascending array, unless the frame is already there
+ */
+function insertTime(times, t) {
+  const i = timeLowerBound(times, t - NAV_TOLERANCE);
+  if (i < times.length && times[i] <= t + NAV_TOLERANCE) {
+    return;
+  }
+  times.splice(i, 0, t);
+}
+
+/**
+ * Pause a view on a time; synchronised views follow from its seek
+ */
+function seekView(view, t) {
+  const video = view.video;
+  if (!video.paused) {
+    video.pause();
+  }
+  video.currentTime = t;
+}
+
+/**
+ * Seek to a neighbouring annotated frame or keyframe of the active view
+ */
+function navigate(key) {
+  if (!views.length) {
+    return false;
+  }
+  const view = activeView !== null && views.includes(activeView) ? activeView : views[0];
+  const t = displayedTime(view);
+  let target = null;
+  if (key === "]" || key === "[") {
+    // Synchronised views share a clock: any view's annotations count
+    const candidates = (syncViews ? views : [view])
+      .map((v) => (key === "]" ? nextTime(v.annotated, t) : previousTime(v.annotated, t)))
+      .filter((time) => time !== null);
+    if (candidates.length) {
+      target = key === "]" ? Math.min(...candidates) : Math.max(...candidates);
+    }
+  } else if (key === "}") {
+    target = nextTime(view.keyframes, t);
+  } else if (key === "{") {
+    target = previousTime(view.keyframes, t);
+  } else if (key === "k") {
+    target = nearestTime(view.keyframes, t);
+  } else {
+    return false;
+  }
+  if (target !== null) {
+    seekView(view, target);
+  }
+  return true;
+}
+
+/**
+ * Navigation shortcuts (once per page)
+ */
+function setupNavigationKeys() {
+  document.addEventListener("keydown", (event) => {
+    if (event.ctrlKey || event.metaKey || event.altKey) {
+      return;
+    }
+    if (commitPolicy !== null && event.key === commitPolicy.key) {
+      return;
+    }
+    if (navigate(event.key)) {
+      event.preventDefault();
+    }
+  });
+}
+
+/**
+ * Apply a seek requested from Python with seek() (once per request)
+ */
+function applySeek(seek) {
+  if (seek == null || seek.id === lastSeekId) {
+    return;
+  }
+  lastSeekId = seek.id;
+  const targets = seek.view == null ? views : [views[seek.view]];
+  for (const view of targets) {
+    if (view) {
+      // A frame index is sent as one time per view, each from its own video
+      seekView(view, Array.isArray(seek.time) ? seek.time[view.index] : seek.time);
+    }
+  }
+}
+
+/**
+ * Ask Python to resend the payloads of the given sources (once per set of ids)
+ */
+function requestSources(srcIds) {
+  const wanted = srcIds.join(",");
+  if (requestedSrcIds === wanted) {
+    return;
+  }
+  requestedSrcIds = wanted;
+  srcRequest = wanted + ":" + Math.random().toString(36).slice(2);
+  sendValue();
+}
+
+/**
+ * Drop pending clicks that Python has acknowledged
+ */
+function acknowledge(ack) {
+  if (typeof ack !== "number") {
+    return;
+  }
+  // After an iframe reload Python remembers more than we do; keep counting
+  // from there so new clicks are not mistaken for duplicates.
+  lastSeq = Math.max(lastSeq, ack);
+  pendingClicks = pendingClicks.filter((click) => click.seq > ack);
+}
+
+/**
+ * Follow presented frames where requestVideoFrameCallback is supported.
+ * `video.currentTime` is not guaranteed to match the displayed frame after a
+ * pause or seek; the callback's `mediaTime` is the presentation timestamp of
+ * that frame. Callbacks are one-shot, so each one re-registers itself; they
+ * survive source changes, so this only needs to run once per view.
+ */
+function trackPresentedFrames(view) {
+  const video = view.video;
+  if (typeof video.requestVideoFrameCallback !== "function") {
+    return;
+  }
+
+  const onFrame = (now, metadata) => {
+    view.presentedFrame = {
+      mediaTime: metadata.mediaTime,
+      presentedFrames: metadata.presentedFrames,
+    };
+    // A paused seek presents its frame after "seeked" fires
+    if (video.paused) {
+      requestRedraw(view);
+    }
+    video.requestVideoFrameCallback(onFrame);
+  };
+  video.requestVideoFrameCallback(onFrame);
+}
+
+/**
+ * Resolve a server-relative media URL (e.g. "/media/<id>.mp4" from Streamlit's
+ * media file manager) against the app's base path. The component iframe is
+ * served from "<base>/component/...", so a bare "/media/..." would miss any
+ * configured server.baseUrlPath.
+ */
+function resolveMediaUrl(src) {
+  if (!src || src.charAt(0) !== "/" || src.charAt(1) === "/") {
+    return src;
+  }
+  const path = window.location.pathname;
+  const componentIdx = path.indexOf("/component/");
+  const basePath = componentIdx >= 0 ? path.substring(0, componentIdx) : "";
+  return window.location.origin + basePath + src;
+}
+
+/**
+ * Where the intrinsic video frame is drawn inside an element box of the given
+ * size. The browser scales the video uniformly so that it fits within the box
+ * while preserving aspect ratio, leaving letterbox bars on two sides.
+ */
+function contentBox(boxW, boxH, intrinsicW, intrinsicH) {
+  const scale = Math.min(boxW / intrinsicW, boxH / intrinsicH); // uniform scale applied
+  const width = intrinsicW * scale;
+  const height = intrinsicH * scale;
+  return {
+    scale: scale,
+    width: width,
+    height: height,
+    offsetX: (boxW - width) / 2,  // horizontal letterbox (left bar width)
+    offsetY: (boxH - height) / 2, // vertical letterbox (top bar height)
+  };
+}
+
+// Click markers of each view, sorted by the time of the frame they were
+// placed on, in intrinsic video pixels so they stay put when the player is
+// resized. Each view draws on a single <canvas>: thousands of markers cost
+// one paint instead of thousands of DOM nodes.
+
+// Only the most recent `maxMarkers` clicks keep a marker (null: no limit),
+// counted across all views. Each marker records the order it was added in,
+// so the oldest are known.
+let maxMarkers = null;
+let markersAdded = 0;
+
+// Markers within this distance (seconds) of the displayed frame are drawn.
+// Half a frame at 60fps: close enough to tell neighbouring frames apart.
+const MARKER_TIME_TOLERANCE = 0.5 / 60;
+const MARKER_RADIUS = 5;
+
+/**
+ * Index of the first marker with time >= t (binary search)
+ */
+function markerLowerBound(markers, t) {
+  let lo = 0;
+  let hi = markers.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (markers[mid].time < t) {
+      lo = mid + 1;
+    } else {
+      hi = mid;
+    }
+  }
+  return lo;
 }
 
 /**
- * Add a visual marker at the click position
+ * Add a visual marker at the click position (intrinsic video pixels)
  */
-function addClickMarker(x, y, frameTime, frameIndex) {
-  const overlay = document.getElementById("click-overlay");
+function addClickMarker(view, x, y, time, label, seq, track) {
+  const marker = {
+    x: x,
+    y: y,
+    time: time,
+    label: track == null ? label : `T${track} ${label}`,
+    color: trackColor(track),
+    seq: seq,
+    order: markersAdded++,
+  };
+  view.markers.splice(markerLowerBound(view.markers, time), 0, marker);
+  trimMarkers();
+  requestRedraw(view);
+}
 
-  // Create marker dot
-  const marker = document.createElement("div");
-  marker.className = "click-marker";
-  marker.style.left = x + "px";
-  marker.style.top = y + "px";
+/**
+ * Drop the oldest markers beyond maxMarkers
+ */
+function trimMarkers() {
+  if (maxMarkers === null) {
+    return;
+  }
+  const oldestKept = markersAdded - maxMarkers;
+  for (const view of views) {
+    if (view.markers.length && view.markers.some((marker) => marker.order < oldestKept)) {
+      view.markers = view.markers.filter((marker) => marker.order >= oldestKept);
+      requestRedraw(view);
+    }
+  }
+}
+
+/**
+ * Clear all visual markers of a view
+ */
+function clearMarkers(view) {
+  view.markers = [];
+  requestRedraw(view);
+}
 
-  // Create label with frame info
-  const label = document.createElement("div");
-  label.className = "click-label";
-  label.style.left = x + "px";
-  label.style.top = y + "px";
-  label.textContent = `${frameTime.toFixed(2)}s (f:${frameIndex})`;
+/**
+ * Time of the frame on screen, preferring requestVideoFrameCallback metadata
+ */
+function displayedTime(view) {
+  if (view.presentedFrame && !view.video.seeking) {
+    return view.presentedFrame.mediaTime;
+  }
+  return view.video.currentTime;
+}
 
-  overlay.appendChild(marker);
-  overlay.appendChild(label);
+/**
+ * Redraw a view's overlay at most once per animation frame
+ */
+function requestRedraw(view) {
+  if (view.redrawScheduled) {
+    return;
+  }
+  view.redrawScheduled = true;
+  window.requestAnimationFrame(() => {
+    view.redrawScheduled = false;
+    drawMarkers(view);
+  });
 }
 
 /**
- * Clear all visual markers
+ * Draw the markers belonging to the displayed frame in a single pass
  */
-function clearMarkers() {
-  const overlay = document.getElementById("click-overlay");
-  overlay.innerHTML = "";
+function drawMarkers(view) {
+  const video = view.video;
+  const canvas = view.canvas;
+  const markers = view.markers;
+  const ctx = canvas.getContext("2d");
+  const dpr = window.devicePixelRatio || 1;
+
+  ctx.setTransform(1, 0, 0, 1, 0, 0);
+  ctx.clearRect(0, 0, canvas.width, canvas.height);
+
+  // Markers only show on the paused frame they were placed on
+  if (!video.paused || !markers.length || !video.videoWidth || !video.videoHeight) {
+    return;
+  }
+
+  const t = displayedTime(view);
+  const first = markerLowerBound(markers, t - MARKER_TIME_TOLERANCE);
+  const last = markerLowerBound(markers, t + MARKER_TIME_TOLERANCE);
+  if (first === last) {
+    return;
+  }
+
+  const box = contentBox(canvas.width / dpr, canvas.height / dpr, video.videoWidth, video.videoHeight);
+  ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+
+  // All dots of a colour as one path: one fill and one stroke regardless of
+  // their number. Clicks not yet committed to Python are drawn as hollow rings.
+  const tracePath = (include) => {
+    ctx.beginPath();
+    for (let i = first; i < last; i++) {
+      if (!include(markers[i])) {
+        continue;
+      }
+      const px = box.offsetX + markers[i].x * box.scale;
+      const py = box.offsetY + markers[i].y * box.scale;
+      ctx.moveTo(px + MARKER_RADIUS, py);
+      ctx.arc(px, py, MARKER_RADIUS, 0, 2 * Math.PI);
+    }
+  };
+  ctx.lineWidth = 2;
+  const colors = new Set();
+  for (let i = first; i < last; i++) {
+    colors.add(markers[i].color);
+  }
+  for (const color of colors) {
+    tracePath((marker) => marker.seq <= committedSeq && marker.color === color);
+    ctx.fillStyle = color;
+    ctx.fill();
+    ctx.strokeStyle = "white";
+    ctx.stroke();
+  }
+  tracePath((marker) => marker.seq > committedSeq);
+  ctx.strokeStyle = "orange";
+  ctx.stroke();
+
+  // Labels with frame info
+  ctx.font = "12px monospace";
+  ctx.textBaseline = "middle";
+  for (let i = first; i < last; i++) {
+    const px = box.offsetX + markers[i].x * box.scale + 5;
+    const py = box.offsetY + markers[i].y * box.scale - 25;
+    const textWidth = ctx.measureText(markers[i].label).width;
+    ctx.fillStyle = "rgba(0, 0, 0, 0.7)";
+    ctx.fillRect(px, py - 9, textWidth + 12, 18);
+    ctx.fillStyle = "white";
+    ctx.fillText(markers[i].label, px + 6, py);
+  }
 }
 
 /**
- * Handle video click events
+ * Handle click events on a view's video
  */
-function clickListener(event) {
-  const video = document.getElementById("video");
+function clickListener(view, event) {
+  const video = view.video;
 
   // Only capture clicks when video is paused
   if (!video.paused) {
@@ -70,12 +573,12 @@ function clickListener(event) {
   }
 
   // Compute how the intrinsic video is letterboxed inside the displayed element.
-  // The browser scales the video uniformly so that it fits within rect while preserving aspect ratio.
-  const scale = Math.min(rect.width / intrinsicW, rect.height / intrinsicH); // uniform scale applied
-  const displayedContentW = intrinsicW * scale;
-  const displayedContentH = intrinsicH * scale;
-  const offsetX = (rect.width - displayedContentW) / 2;  // horizontal letterbox (left bar width)
-  const offsetY = (rect.height - displayedContentH) / 2; // vertical letterbox (top bar height)
+  const box = contentBox(rect.width, rect.height, intrinsicW, intrinsicH);
+  const scale = box.scale;
+  const displayedContentW = box.width;
+  const displayedContentH = box.height;
+  const offsetX = box.offsetX;
+  const offsetY = box.offsetY;
 
   // Coordinates inside the actual displayed video content (exclude letterbox bars)
   const withinContentX = clickX - offsetX;
@@ -91,174 +594,545 @@ function clickListener(event) {
   const x = withinContentX / scale;
   const y = withinContentY / scale;
 
+  // Coordinates and size as reported to Python: in the original's pixels
+  // when playing a proxy, mapped from the click's position within the frame
+  // (screen precision, not the proxy's).
+  const reportSize = view.reportSize;
+  const reportW = reportSize ? reportSize[0] : intrinsicW;
+  const reportH = reportSize ? reportSize[1] : intrinsicH;
+  const reportX = reportSize ? (withinContentX / displayedContentW) * reportW : x;
+  const reportY = reportSize ? (withinContentY / displayedContentH) * reportH : y;
+
   console.log(
     `Coordinate mapping: displayBox(${clickX.toFixed(2)}, ${clickY.toFixed(2)}) -> content(${withinContentX.toFixed(2)}, ${withinContentY.toFixed(2)}) -> intrinsic(${x.toFixed(2)}, ${y.toFixed(2)}) | intrinsic=${intrinsicW}x${intrinsicH} displayBox=${rect.width.toFixed(1)}x${rect.height.toFixed(1)} content=${displayedContentW.toFixed(1)}x${displayedContentH.toFixed(1)} offsets=(${offsetX.toFixed(1)}, ${offsetY.toFixed(1)}) scale=${scale.toFixed(4)}`
   );
 
   // Get current video time and estimated frame index
   const frameTime = video.currentTime;
-  // Try to get actual frame rate from video, fallback to 30fps
-  let frameRate = 30;
-  if (video.videoHeight && video.videoWidth) {
-    // For most web videos, 30fps is a reasonable default
-    // In a production environment, you might want to detect this more accurately
-    frameRate = 30;
-  }
-  const frameIndex = Math.floor(frameTime * frameRate);
+
+  // Exact timestamp of the frame on screen, unless the browser lacks
+  // requestVideoFrameCallback or a seek hasn't presented its frame yet
+  const frame = view.presentedFrame && !video.seeking ? view.presentedFrame : null;
+  const mediaTime = frame ? frame.mediaTime : null;
+
+  // Assume 30fps; Python replaces this with the exact index for local files
+  const frameRate = 30;
+  const frameIndex = Math.floor((mediaTime !== null ? mediaTime : frameTime) * frameRate);
 
   const unixTime = Date.now();
 
   // Store the click event with actual video coordinates
   const clickData = {
-    x: Math.round(x),
-    y: Math.round(y),
+    seq: ++lastSeq,
+    x: Math.round(reportX),
+    y: Math.round(reportY),
     frame_time: frameTime,
     frame_index: frameIndex,
-    width: intrinsicW,
-    height: intrinsicH,
-    unix_time: unixTime
+    width: reportW,
+    height: reportH,
+    unix_time: unixTime,
+    media_time: mediaTime,
+    presented_frames: frame ? frame.presentedFrames : null
   };
+  if (gridMode) {
+    clickData.view = view.index;
+  }
+  if (tracksEnabled) {
+    clickData.track_id = activeTrack;
+  }
 
-  clickEvents.push(clickData);
+  pendingClicks.push(clickData);
+  markTiming(view, "first_click");
 
-  // Add visual marker at the actual element box coordinates so it appears where user clicked
-  addClickMarker(clickX, clickY, frameTime, frameIndex);
+  // Add visual marker at the intrinsic coordinates, on the frame that was clicked
+  insertTime(view.annotated, mediaTime !== null ? mediaTime : frameTime);
+  addClickMarker(view, x, y, mediaTime !== null ? mediaTime : frameTime, `${frameTime.toFixed(2)}s (f:${frameIndex})`, clickData.seq, clickData.track_id);
 
-  // Send updated data to Streamlit
-  sendValue();
+  // Send updated data to Streamlit, now or as the commit policy says
+  scheduleCommit();
 }
 
 /**
- * Update the overlay size when video is resized
+ * Commit on play or seek, when the policy asks for it
  */
-function updateOverlaySize() {
-  const video = document.getElementById("video");
-  const overlay = document.getElementById("click-overlay");
+function commitOnPlay() {
+  if (commitPolicy !== null && commitPolicy.on_play) {
+    commitPending();
+  }
+}
 
-  const rect = video.getBoundingClientRect();
-  overlay.style.width = rect.width + "px";
-  overlay.style.height = rect.height + "px";
+/**
+ * Commit on the policy's key, and from the unsaved badge (once per page)
+ */
+function setupCommitTriggers() {
+  document.addEventListener("keydown", (event) => {
+    if (commitPolicy !== null && commitPolicy.key != null && event.key === commitPolicy.key) {
+      event.preventDefault();
+      commitPending();
+    }
+  });
+  document.getElementById("commit-status").addEventListener("click", commitPending);
+  // Don't lose a burst when the iframe goes away
+  window.addEventListener("pagehide", commitPending);
 }
 
-// Store the custom dimensions for coordinate scaling
-let customWidth = null;
-let customHeight = null;
+// Shared clock. Each view applies another's change only when its own state
+// differs, so the events it fires in turn settle instead of echoing back.
+// While playing, views are only re-aligned once they drift this far apart
+// (seconds); paused views are aligned exactly, for frame-accurate review.
+const SYNC_PLAYING_TOLERANCE = 0.15;
+const SYNC_PAUSED_TOLERANCE = 0.001;
 
 /**
- * The component's render function. This will be called immediately after
- * the component is initially loaded, and then again every time the
- * component gets new data from Python.
+ * Bring the other views to the play state, rate and position of `leader`
  */
-function onRender(event) {
-  let { src, height, width, start_time } = event.detail.args;
-
-  // Store custom dimensions for coordinate scaling
-  customWidth = width;
-  customHeight = height;
-
-  const video = document.getElementById("video");
-  const container = document.getElementById("video-container");
-
-  // Ensure video element has controls
-  video.setAttribute('controls', 'true');
-  video.setAttribute('controlslist', 'nofullscreen');
-
-  // Preserve current video time before any changes
-  const currentTime = video.currentTime || 0;
-
-  // Update video source if changed
-  const videoSourceChanged = video.src !== src;
-  if (videoSourceChanged) {
-    video.src = src;
-    // Clear previous click events when video changes
-    clickEvents = [];
-    clearMarkers();
-
-    // Handle video load errors
-    video.onerror = function (e) {
-      console.error("Failed to load video:", src, e);
-      // Still show the video element with controls for user feedback
-      // Add a visual indicator that the video failed to load
-      video.style.backgroundColor = "#000";
-      video.style.position = "relative";
-    };
+function syncFrom(leader) {
+  if (!syncViews) {
+    return;
+  }
+  const source = leader.video;
+  const tolerance = source.paused ? SYNC_PAUSED_TOLERANCE : SYNC_PLAYING_TOLERANCE;
+  for (const view of views) {
+    const video = view.video;
+    if (view === leader || view.loadedSrcId === null) {
+      continue;
+    }
+    if (video.playbackRate !== source.playbackRate) {
+      video.playbackRate = source.playbackRate;
+    }
+    if (source.paused && !video.paused) {
+      video.pause();
+    } else if (!source.paused && video.paused) {
+      video.play().catch((e) => console.warn("Could not play synchronised view:", e));
+    }
+    if (Math.abs(video.currentTime - source.currentTime) > tolerance) {
+      video.currentTime = source.currentTime;
+    }
+  }
+}
 
-    video.onloadstart = function () {
-      console.log("Started loading video:", src);
-    };
+// Layout: a single ResizeObserver on the video elements and the grid drives
+// both the overlay canvas sizes and the iframe height. Its callback reports
+// sizes without forcing a synchronous layout, and updates are coalesced into
+// one per animation frame.
+let layoutObserver = null;
+let layoutFrame = null;
+let gridHeight = 0;
+let lastFrameHeight = null;
 
-    video.oncanplay = function () {
-      console.log("Video ready to play");
-      // Clear any error styling
-      video.style.backgroundColor = "";
-    };
+/**
+ * Start observing the grid's size (once per page)
+ */
+function observeLayout() {
+  if (layoutObserver) {
+    return;
+  }
+  const grid = document.getElementById("views");
+  if (typeof ResizeObserver === "function") {
+    layoutObserver = new ResizeObserver((entries) => {
+      for (const entry of entries) {
+        const rect = entry.contentRect;
+        if (entry.target === grid) {
+          gridHeight = rect.height;
+        } else if (entry.target.view) {
+          entry.target.view.box = { width: rect.width, height: rect.height };
+        }
+      }
+      scheduleLayout();
+    });
+    layoutObserver.observe(grid);
+  } else {
+    // Older browsers: measure on window resize, registered exactly once
+    layoutObserver = { disconnect: () => window.removeEventListener("resize", measureLayout) };
+    window.addEventListener("resize", measureLayout);
+  }
+  window.addEventListener("pagehide", teardownLayout, { once: true });
+}
 
-    video.onloadedmetadata = function () {
-      console.log("Video metadata loaded");
-      updateFrameHeight();
-    };
+/**
+ * Fallback measurement for browsers without ResizeObserver
+ */
+function measureLayout() {
+  for (const view of views) {
+    const rect = view.video.getBoundingClientRect();
+    view.box = { width: rect.width, height: rect.height };
   }
+  gridHeight = document.getElementById("views").getBoundingClientRect().height;
+  scheduleLayout();
+}
 
-  // Set video dimensions
-  if (width) {
-    video.style.width = width + "px";
-    video.style.maxWidth = width + "px";
-  } else {
-    video.style.width = "100%";
-    video.style.maxWidth = "100%";
+/**
+ * Release the observer and any pending frame when the iframe goes away
+ */
+function teardownLayout() {
+  if (layoutObserver) {
+    layoutObserver.disconnect();
+    layoutObserver = null;
+  }
+  if (layoutFrame !== null) {
+    window.cancelAnimationFrame(layoutFrame);
+    layoutFrame = null;
   }
+}
 
-  if (height) {
-    video.style.height = height + "px";
-    video.style.maxHeight = height + "px";
-  } else {
-    video.style.height = "auto";
-    video.style.maxHeight = "none";
+/**
+ * Apply the latest measured sizes on the next animation frame
+ */
+function scheduleLayout() {
+  if (layoutFrame !== null) {
+    return;
+  }
+  layoutFrame = window.requestAnimationFrame(() => {
+    layoutFrame = null;
+    for (const view of views) {
+      updateOverlaySize(view, view.box.width, view.box.height);
+    }
+    // Each setFrameHeight is a message to the parent page; only send changes
+    if (gridHeight !== lastFrameHeight) {
+      lastFrameHeight = gridHeight;
+      Streamlit.setFrameHeight(gridHeight);
+    }
+  });
+}
+
+/**
+ * Update a view's overlay size when its video is resized
+ */
+function updateOverlaySize(view, width, height) {
+  const canvas = view.canvas;
+  const dpr = window.devicePixelRatio || 1;
+
+  canvas.style.width = width + "px";
+  canvas.style.height = height + "px";
+
+  // Backing store in device pixels keeps markers crisp on HiDPI screens
+  const pixelW = Math.round(width * dpr);
+  const pixelH = Math.round(height * dpr);
+  if (canvas.width !== pixelW || canvas.height !== pixelH) {
+    canvas.width = pixelW;
+    canvas.height = pixelH;
+    requestRedraw(view);
   }
+}
+
+/**
+ * Attach a view's event handlers. Runs once per view: handlers that depend
+ * on the current source read it from the element instead of closing over it,
+ * so nothing has to be re-registered when the source changes.
+ */
+function setupVideo(view) {
+  const video = view.video;
+
+  // Handle video load errors
+  video.onerror = function (e) {
+    console.error("Failed to load video:", video.currentSrc, e);
+    // Still show the video element with controls for user feedback
+    // Add a visual indicator that the video failed to load
+    video.style.backgroundColor = "#000";
+    video.style.position = "relative";
+    // The file may have been deleted on the server (e.g. evicted from the
+    // spool); Python resolves the video again when asked for it
+    const srcId = view.loadedSrcId;
+    if (srcId !== null && view.failedSrcId !== srcId) {
+      view.failedSrcId = srcId;
+      view.reload = { srcId: srcId, time: video.currentTime };
+      view.loadedSrcId = null;
+      requestedSrcIds = null;
+      requestSources([srcId]);
+    }
+  };
+
+  video.onloadstart = function () {
+    console.log("Started loading video:", video.currentSrc);
+  };
+
+  video.oncanplay = function () {
+    console.log("Video ready to play");
+    markTiming(view, "canplay");
+    view.failedSrcId = null;
+    // Clear any error styling
+    video.style.backgroundColor = "";
+  };
+
+  video.onloadedmetadata = function () {
+    console.log("Video metadata loaded");
+    markTiming(view, "loadedmetadata");
+    if (typeof ResizeObserver !== "function") {
+      measureLayout();
+    }
+  };
+
+  // Intrinsic size changed: marker positions depend on it
+  video.onresize = () => requestRedraw(view);
+
+  // Add click listener
+  video.onclick = (event) => clickListener(view, event);
+  trackPresentedFrames(view);
+
+  // Show/hide cursor based on video state
+  video.onplay = function () {
+    video.style.cursor = "default";
+    // Markers are hidden while playing
+    requestRedraw(view);
+    syncFrom(view);
+    commitOnPlay();
+  };
+
+  video.onpause = function () {
+    video.style.cursor = "crosshair";
+    requestRedraw(view);
+    syncFrom(view);
+  };
+
+  // Show the markers of whichever frame a seek lands on
+  video.onseeked = function () {
+    requestRedraw(view);
+    syncFrom(view);
+    commitOnPlay();
+  };
 
-  // Update frame height for Streamlit
-  function updateFrameHeight() {
-    const rect = video.getBoundingClientRect();
-    Streamlit.setFrameHeight(rect.height);
-    updateOverlaySize();
+  video.onratechange = () => syncFrom(view);
+
+  // The first view is the clock the others follow while playing
+  video.ontimeupdate = function () {
+    if (view.index === 0 && !video.paused) {
+      syncFrom(view);
+    }
+  };
+
+  if (layoutObserver && typeof ResizeObserver === "function") {
+    layoutObserver.observe(video);
   }
+}
 
-  // Only set up event handlers when video source changes or on initial load
-  if (videoSourceChanged || !video.onclick) {
-    video.onloadedmetadata = updateFrameHeight;
-    video.onresize = updateFrameHeight;
-    window.addEventListener("resize", updateFrameHeight);
+/**
+ * Create the player of the view at `index` and add it to the grid
+ */
+function createView(index) {
+  const container = document.createElement("div");
+  container.className = "video-container";
 
-    // Add click listener
-    video.onclick = clickListener;
+  const video = document.createElement("video");
+  video.className = "video";
+  video.setAttribute("controls", "true");
+  video.setAttribute("controlslist", "nofullscreen");
+  video.setAttribute("preload", "metadata");
+  video.setAttribute("playsinline", "");
+  video.textContent = "Your browser does not support the video tag.";
 
-    // Update overlay on video time changes
-    video.ontimeupdate = updateOverlaySize;
+  const canvas = document.createElement("canvas");
+  canvas.className = "click-overlay";
 
-    // Show/hide cursor based on video state
-    video.onplay = function () {
-      video.style.cursor = "default";
-      // Clear all visual markers when video starts playing
-      clearMarkers();
-    };
+  container.appendChild(video);
+  container.appendChild(canvas);
+  document.getElementById("views").appendChild(container);
 
-    video.onpause = function () {
-      video.style.cursor = "crosshair";
-    };
+  const view = {
+    index: index,
+    container: container,
+    video: video,
+    canvas: canvas,
+    loadedSrcId: null,
+    // Source whose URL failed to load and was asked for again, and where to
+    // resume it ({ srcId, time }). Each source is asked for again once
+    // until it plays.
+    failedSrcId: null,
+    reload: null,
+    // Size of the original video when a downscaled proxy is played ([w, h]),
+    // so clicks are reported in the original's pixels. null: report the
+    // played video's own pixels.
+    reportSize: null,
+    // Timing marks (ms) of the current video, measured from when its src
+    // was set. They are not sent on their own, only alongside clicks and
+    // source requests; Python records each mark once.
+    timings: {},
+    srcAssignedAt: null,
+    presentedFrame: null,
+    markers: [],
+    // Ascending times of annotated frames and keyframes, for navigation
+    annotated: [],
+    keyframes: [],
+    redrawScheduled: false,
+    box: { width: 0, height: 0 },
+  };
+  video.view = view;
+  // Navigation shortcuts apply to the view last pointed at
+  container.addEventListener("pointerenter", () => {
+    activeView = view;
+  });
+  setupVideo(view);
+  return view;
+}
+
+/**
+ * Create or remove views so that there are `count` of them
+ */
+function setViewCount(count) {
+  while (views.length < count) {
+    views.push(createView(views.length));
+  }
+  while (views.length > count) {
+    const view = views.pop();
+    if (layoutObserver && typeof ResizeObserver === "function") {
+      layoutObserver.unobserve(view.video);
+    }
+    view.video.removeAttribute("src");
+    view.video.load();
+    view.container.remove();
+  }
+}
+
+/**
+ * Start playing a new video in a view
+ */
+function loadSource(view, src, srcId, sentAt, startTime) {
+  const video = view.video;
+  video.src = resolveMediaUrl(src);
+  view.loadedSrcId = srcId;
+  view.srcAssignedAt = performance.now();
+  view.timings = { src_id: srcId };
+  if (sentAt != null) {
+    view.timings.transfer = Date.now() - sentAt;
+  }
+  view.presentedFrame = null;
+  // Set start time if specified (only for new videos). Re-renders of the
+  // same video leave the element alone, so playback position is kept.
+  if (startTime && startTime > 0) {
+    video.currentTime = startTime;
+  }
+}
+
+let keyListenersSet = false;
+
+/**
+ * The component's render function. This will be called immediately after
+ * the component is initially loaded, and then again every time the
+ * component gets new data from Python.
+ */
+function onRender(event) {
+  const args = event.detail.args;
+  const { sent_at, height, width, start_time, ack, max_markers, columns, sync, commit, tracks, seek } = args;
+  acknowledge(ack);
+
+  if (!keyListenersSet) {
+    keyListenersSet = true;
+    setupCommitTriggers();
+    setupTrackKeys();
+    setupNavigationKeys();
+  }
+  commitPolicy = commit == null ? null : commit;
+  if (commitPolicy === null) {
+    // Switched to immediate commits: nothing may stay buffered
+    commitPending();
   }
+  tracksEnabled = tracks === true;
+  updateTrackStatus();
+
+  // A single video comes as top-level args, a grid as a list of views
+  gridMode = args.views != null;
+  const specs = gridMode
+    ? args.views
+    : [
+        {
+          src: args.src,
+          src_id: args.src_id,
+          report_size: args.report_size,
+          annotated: args.annotated,
+          keyframes: args.keyframes,
+        },
+      ];
+  syncViews = gridMode && sync !== false;
+
+  observeLayout();
+  setViewCount(specs.length);
+  document.getElementById("views").style.gridTemplateColumns =
+    `repeat(${gridMode && columns ? columns : 1}, minmax(0, 1fr))`;
 
-  // Set start time if specified (only for new videos or initial load)
-  if (videoSourceChanged && start_time && start_time > 0) {
-    video.currentTime = start_time;
-  } else if (!videoSourceChanged && currentTime > 0) {
-    // Preserve current time during re-renders
-    video.currentTime = currentTime;
+  const markerLimit = max_markers == null ? null : max_markers;
+  if (markerLimit !== maxMarkers) {
+    maxMarkers = markerLimit;
+    trimMarkers();
   }
 
-  // Initial setup
-  updateFrameHeight();
+  // Update video sources that changed. Only the short ids are compared; the
+  // payloads may be very long data URLs.
+  const missing = [];
+  let sourcesChanged = false;
+  specs.forEach((spec, i) => {
+    const view = views[i];
+    view.reportSize = spec.report_size == null ? null : spec.report_size;
+    if (spec.src_id === view.loadedSrcId) {
+      return;
+    }
+    if (spec.src == null) {
+      // Python believes we already have this video; ask for it again
+      missing.push(spec.src_id);
+    } else if (view.reload !== null && view.reload.srcId === spec.src_id) {
+      // Same video at a new URL: keep the position and the clicks
+      loadSource(view, spec.src, spec.src_id, sent_at, view.reload.time);
+      view.reload = null;
+    } else {
+      loadSource(view, spec.src, spec.src_id, sent_at, start_time);
+      view.reload = null;
+      sourcesChanged = true;
+    }
+  });
+  if (missing.length) {
+    requestSources(missing);
+  }
+  if (sourcesChanged) {
+    // Clicks on the previous videos are discarded (Python resets its history)
+    pendingClicks = [];
+    committedSeq = lastSeq;
+    cancelCommitTimer();
+    updateCommitStatus();
+    views.forEach(clearMarkers);
+  }
+
+  // Navigation indexes come with the videos. Clicks Python has not seen yet
+  // are added back.
+  specs.forEach((spec, i) => {
+    const view = views[i];
+    if (spec.keyframes != null) {
+      view.keyframes = spec.keyframes;
+    }
+    if (spec.annotated != null) {
+      view.annotated = spec.annotated;
+      for (const click of pendingClicks) {
+        if (!gridMode || click.view === i) {
+          insertTime(view.annotated, click.media_time !== null ? click.media_time : click.frame_time);
+        }
+      }
+    }
+  });
+  applySeek(seek);
+
+  // Set video dimensions. Style writes are cheap; the ResizeObserver picks
+  // up any resulting size change. Grid views fill their column.
+  for (const view of views) {
+    const video = view.video;
+    if (width && !gridMode) {
+      video.style.width = width + "px";
+      video.style.maxWidth = width + "px";
+    } else {
+      video.style.width = "100%";
+      video.style.maxWidth = "100%";
+    }
+
+    if (height) {
+      video.style.height = height + "px";
+      video.style.maxHeight = height + "px";
+    } else {
+      video.style.height = "auto";
+      video.style.maxHeight = "none";
+    }
+  }
+
+  if (typeof ResizeObserver !== "function") {
+    measureLayout();
+  }
 }
 
 // Event listeners
 Streamlit.events.addEventListener(Streamlit.RENDER_EVENT, onRender);
-Streamlit.setComponentReady();
\ No newline at end of file
+Streamlit.setComponentReady();
@@ -0,0 +1,324 @@
+"""A small HTTP server that streams local videos with ``Range`` support.
+
+Browsers only seek efficiently when the server answers ``Range`` requests with
+``206 Partial Content``: with ``preload="metadata"`` the ``<video>`` element then
+fetches the container header first and afterwards only the byte ranges around
+the playback position. Streamlit's media file manager keeps whole files in
+memory, so for large local recordings the component can instead register the
+path here and hand the browser a URL to this server.
+
+The server runs in a daemon thread next to Streamlit and only serves files that
+were explicitly registered, under unguessable tokens.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+DEFAULT_MAX_ENTRIES = 1024
+
+_ROUTE_PREFIX = "/video/"
+
+
+def parse_range(header: str | None, size: int) -> Optional[Tuple[int, int]]:
+    """Parse an HTTP ``Range`` header into an inclusive ``(start, end)`` pair.
+
+    Parameters
+    ----------
+    header : str | None
+        The raw header value, e.g. ``"bytes=0-1023"``, ``"bytes=500-"`` or
+        ``"bytes=-500"``.
+    size : int
+        Size of the resource in bytes.
+
+    Returns
+    -------
+    tuple[int, int] | None
+        ``None`` when there is no usable header and the whole resource should
+        be served. Malformed headers and multi-range requests are ignored in
+        the same way, which RFC 9110 allows.
+
+    Raises
+    ------
+    ValueError
+        If the range is well-formed but cannot be satisfied (416).
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        start = int(first) if first else None
+        end = int(last) if last else None
+    except ValueError:
+        return None
+
+    if start is None:
+        # Suffix range: the last N bytes.
+        if end is None or end <= 0 or size == 0:
+            raise ValueError(f"Unsatisfiable range: {header!r}")
+        return max(size - end, 0), size - 1
+
+    if end is not None and start > end:
+        return None
+    if start >= size:
+        raise ValueError(f"Unsatisfiable range: {header!r}")
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+class _MediaRequestHandler(BaseHTTPRequestHandler):
+    server: _MediaHTTPServer
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self) -> None:
+        self._serve(send_body=False)
+
+    def do_GET(self) -> None:
+        self._serve(send_body=True)
+
+    def log_message(self, _format: str, *_args: Any) -> None:
+        # Seeking produces a request per range; keep stderr quiet.
+        pass
+
+    def _serve(self, send_body: bool) -> None:
+        entry = self.server.media.lookup(self.path)
+        if entry is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        path, mimetype = entry
+
+        try:
+            # Not a with-statement: a failed open is a 404, while errors
+            # raised while answering must not be.
+            f = open(path, "rb")  # noqa: SIM115
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            try:
+                byte_range = parse_range(self.headers.get("Range"), size)
+            except ValueError:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            if byte_range is None:
+                start, end = 0, size - 1
+                self.send_response(HTTPStatus.OK)
+            else:
+                start, end = byte_range
+                self.send_response(HTTPStatus.PARTIAL_CONTENT)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+
+            length = max(end - start + 1, 0)
+            self.send_header("Content-Type", mimetype)
+            self.send_header("Content-Length", str(length))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Cache-Control", "private, max-age=3600")
+            self.end_headers()
+
+            if send_body:
+                self._copy_range(f, start, length)
+
+    def _copy_range(self, f, start: int, length: int) -> None:
+        # Stream through one fixed buffer so memory use does not depend on the
+        # size of the requested range.
+        buffer = bytearray(self.server.media.chunk_size)
+        view = memoryview(buffer)
+        f.seek(start)
+        remaining = length
+        try:
+            while remaining > 0:
+                n = f.readinto(view[: min(remaining, len(buffer))])
+                if not n:
+                    break
+                self.wfile.write(view[:n])
+                remaining -= n
+        except (BrokenPipeError, ConnectionResetError):
+            # The browser routinely aborts range requests when the user seeks.
+            pass
+
+
+class _MediaHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], media: MediaServer) -> None:
+        super().__init__(address, _MediaRequestHandler)
+        self.media = media
+
+
+class MediaServer:
+    """Serve registered local files over HTTP with ``Range`` support.
+
+    Parameters
+    ----------
+    host : str
+        Interface to bind. The default only accepts local connections; use
+        ``"0.0.0.0"`` when browsers connect from other machines.
+    port : int
+        Port to bind, ``0`` picks a free one.
+    public_url : str | None
+        Base URL browsers should use to reach this server, e.g. when it sits
+        behind a reverse proxy. Defaults to ``http://<host>:<port>``.
+    chunk_size : int
+        Size of the read buffer used to stream each response.
+    max_entries : int
+        How many URLs are served at most. Once there are more, the least
+        recently registered or requested URL stops working.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        public_url: str | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.public_url = public_url
+        self.chunk_size = chunk_size
+        self.max_entries = max_entries
+        self._salt = secrets.token_bytes(16)
+        self._files: OrderedDict[str, Tuple[str, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._httpd: _MediaHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._httpd is not None
+
+    @property
+    def base_url(self) -> str:
+        if self.public_url:
+            return self.public_url.rstrip("/")
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> None:
+        """Bind the socket and start serving in a daemon thread."""
+        with self._lock:
+            if self._httpd is not None:
+                return
+            self._httpd = _MediaHTTPServer((self.host, self.port), self)
+            self.port = self._httpd.server_address[1]
+            self._thread = threading.Thread(
+                target=self._httpd.serve_forever,
+                name="streamlit-video-coordinates-media",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and release the socket."""
+        with self._lock:
+            httpd, self._httpd = self._httpd, None
+        if httpd is not None:
+            httpd.shutdown()
+            httpd.server_close()
+
+    def register(self, path: str | Path, mimetype: str) -> str:
+        """Make ``path`` available and return the URL it is served under.
+
+        The token embeds the file's identity (path, mtime and size), so a file
+        rewritten in place gets a new URL and stale browser caches are
+        bypassed. Earlier URLs of the file keep working (pages may still be
+        playing them) until the file is unregistered or they are the least
+        recently used of more than ``max_entries``. Starts the server if it
+        is not running yet.
+        """
+        resolved = Path(path).resolve()
+        st = os.stat(resolved)
+        identity = f"{resolved}:{st.st_mtime_ns}:{st.st_size}".encode()
+        token = hashlib.blake2b(identity, key=self._salt, digest_size=16).hexdigest()
+        name = f"{token}{resolved.suffix.lower()}"
+        with self._lock:
+            self._files[name] = (str(resolved), mimetype)
+            self._files.move_to_end(name)
+            while len(self._files) > self.max_entries:
+                self._files.popitem(last=False)
+        self.start()
+        return f"{self.base_url}{_ROUTE_PREFIX}{name}"
+
+    def unregister(self, path: str | Path) -> None:
+        """Stop serving every URL of ``path``, e.g. before deleting the file."""
+        resolved = str(Path(path).resolve())
+        with self._lock:
+            for name in [n for n, (p, _) in self._files.items() if p == resolved]:
+                del self._files[name]
+
+    def lookup(self, request_path: str) -> Optional[Tuple[str, str]]:
+        """Return ``(path, mimetype)`` for a request path, if registered."""
+        if not request_path.startswith(_ROUTE_PREFIX):
+            return None
+        name = request_path[len(_ROUTE_PREFIX) :].split("?", 1)[0]
+        with self._lock:
+            entry = self._files.get(name)
+            if entry is not None:
+                self._files.move_to_end(name)
+        return entry
+
+
+_media_server: MediaServer | None = None
+_media_server_lock = threading.Lock()
+
+
+def get_media_server() -> MediaServer:
+    """Return the process-wide media server, creating it on first use."""
+    global _media_server
+    with _media_server_lock:
+        if _media_server is None:
+            _media_server = MediaServer()
+        return _media_server
+
+
+def unregister_media(path: str | Path) -> None:
+    """Stop serving ``path`` from the process-wide media server, if one exists.
+
+    Used by the spool and the proxy cache when they delete a file. Unlike
+    :func:`get_media_server`, this never creates a server.
+    """
+    with _media_server_lock:
+        server = _media_server
+    if server is not None:
+        server.unregister(path)
+
+
+def configure_media_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    public_url: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+) -> MediaServer:
+    """Replace the process-wide media server with one using these settings.
+
+    Call this once at the top of the app, before the first video using
+    ``serving="http"`` is rendered. A previously running server is stopped.
+    """
+    global _media_server
+    with _media_server_lock:
+        if _media_server is not None:
+            _media_server.stop()
+        _media_server = MediaServer(host, port, public_url, chunk_size, max_entries)
+        return _media_server
@@ -0,0 +1,220 @@
+"""Optional instrumentation of the component's hot path.
+
+The component times the steps between a script run and a playable video
+(identifying the source, reading and encoding it, spooling, registering it
+with a server, drawing the component) and the browser reports how long it
+took to load and decode the video. Those measurements go to the configured
+sinks::
+
+    from streamlit_video_coordinates.metrics import (
+        LoggingSink,
+        PrometheusSink,
+        configure_metrics,
+    )
+
+    prometheus = PrometheusSink()
+    configure_metrics(LoggingSink(), prometheus)
+    ...
+    text = prometheus.exposition()  # serve this at /metrics
+
+With no sinks configured (the default) instrumentation is disabled: spans are
+a shared no-op context manager and counters return immediately.
+
+Recorded names
+--------------
+Spans (seconds): ``source_token``, ``resolve``, ``read``, ``encode``,
+``spool``, ``register``, ``component``, ``frame_index``, ``frame_decode``
+(:class:`.FrameGrabber`), ``proxy_encode``, and from the
+browser ``browser.transfer`` (send to receipt, across the server's and the
+browser's clocks), ``browser.loadedmetadata``, ``browser.canplay`` and
+``browser.first_click`` (each measured from when the video was set).
+
+Counters: ``clicks``, ``payload_bytes`` (size of each ``src`` sent to the
+browser).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Tuple
+
+from typing_extensions import Literal, Protocol
+
+MetricKind = Literal["span", "counter"]
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """One recorded span duration or counter increment."""
+
+    name: str
+    kind: MetricKind
+    value: float
+    attributes: Mapping[str, Any] = field(default_factory=dict)
+
+
+class MetricsSink(Protocol):
+    """Anything that can receive measurements."""
+
+    def record(self, measurement: Measurement) -> None: ...
+
+
+class LoggingSink:
+    """Write every measurement to a logger."""
+
+    def __init__(self, logger: logging.Logger | None = None, level: int = logging.DEBUG) -> None:
+        self.logger = logger or logging.getLogger("streamlit_video_coordinates")
+        self.level = level
+
+    def record(self, measurement: Measurement) -> None:
+        if measurement.kind == "span":
+            value = f"{measurement.value * 1e3:.3f} ms"
+        else:
+            value = f"+{measurement.value:g}"
+        self.logger.log(self.level, "%s %s %s", measurement.name, value, dict(measurement.attributes))
+
+
+class CallbackSink:
+    """Pass every measurement to a function."""
+
+    def __init__(self, callback: Callable[[Measurement], None]) -> None:
+        self.callback = callback
+
+    def record(self, measurement: Measurement) -> None:
+        self.callback(measurement)
+
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+class PrometheusSink:
+    """Aggregate measurements for the Prometheus text exposition format.
+
+    Spans become histograms named ``<prefix>_<name>_seconds`` and counters
+    ``<prefix>_<name>_total``; attributes become labels.
+    """
+
+    def __init__(self, prefix: str = "streamlit_video_coordinates", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[_Labels, float]] = defaultdict(dict)
+        # name -> labels -> [bucket counts..., sum, count]
+        self._histograms: Dict[str, Dict[_Labels, List[float]]] = defaultdict(dict)
+
+    def _metric_name(self, name: str) -> str:
+        return f"{self.prefix}_{name}".replace(".", "_")
+
+    def record(self, measurement: Measurement) -> None:
+        labels = tuple(sorted((k, str(v)) for k, v in measurement.attributes.items()))
+        name = self._metric_name(measurement.name)
+        with self._lock:
+            if measurement.kind == "counter":
+                series = self._counters[name]
+                series[labels] = series.get(labels, 0.0) + measurement.value
+                return
+            series = self._histograms[name]
+            state = series.get(labels)
+            if state is None:
+                state = series[labels] = [0.0] * (len(self.buckets) + 2)
+            index = bisect_left(self.buckets, measurement.value)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += measurement.value
+            state[-1] += 1
+
+    def exposition(self) -> str:
+        """Return all metrics in the Prometheus text format."""
+
+        def render(labels: _Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ""
+            escaped = (
+                k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+                for k, v in pairs
+            )
+            return "{" + ",".join(escaped) + "}"
+
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name}_total counter")
+                for labels, value in series.items():
+                    lines.append(f"{name}_total{render(labels)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                metric = f"{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                for labels, state in series.items():
+                    cumulative = 0.0
+                    for bound, count in zip(self.buckets, state):
+                        cumulative += count
+                        lines.append(f"{metric}_bucket{render(labels, (('le', f'{bound:g}'),))} {cumulative:g}")
+                    lines.append(f"{metric}_bucket{render(labels, (('le', '+Inf'),))} {state[-1]:g}")
+                    lines.append(f"{metric}_sum{render(labels)} {state[-2]:g}")
+                    lines.append(f"{metric}_count{render(labels)} {state[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+
+_sinks: Tuple[MetricsSink, ...] = ()
+
+
+def configure_metrics(*sinks: MetricsSink) -> None:
+    """Send measurements to ``sinks``; call without arguments to disable."""
+    global _sinks
+    _sinks = tuple(sinks)
+
+
+def enabled() -> bool:
+    return bool(_sinks)
+
+
+def record(name: str, kind: MetricKind, value: float, **attributes: Any) -> None:
+    """Send a measurement to every sink (no-op when disabled)."""
+    sinks = _sinks
+    if not sinks:
+        return
+    measurement = Measurement(name, kind, value, attributes)
+    for sink in sinks:
+        sink.record(measurement)
+
+
+def count(name: str, value: float = 1, **attributes: Any) -> None:
+    """Increment a counter."""
+    if _sinks:
+        record(name, "counter", value, **attributes)
+
+
+@contextmanager
+def _timed(name: str, attributes: Dict[str, Any]) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, "span", time.perf_counter() - start, **attributes)
+
+
+class _NoSpan:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str, **attributes: Any):
+    """Context manager timing its body as a span named ``name``."""
+    if not _sinks:
+        return _NO_SPAN
+    return _timed(name, attributes)
@@ -0,0 +1,98 @@
+"""Sorted indexes of frame times, for jumping between annotations.
+
+A :class:`TimeIndex` keeps distinct times in one ascending array, so finding
+the next or previous annotated frame (or keyframe) is a binary search,
+however many there are. The player keeps the same index for its keyboard
+shortcuts: ``]`` / ``[`` jump to the next / previous annotated frame,
+``}`` / ``{`` to the next / previous keyframe and ``k`` to the nearest
+keyframe. From Python::
+
+    index = get_annotation_index("video")
+    seek("video", index.next(current_time))
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Iterator, Mapping
+
+import numpy as np
+
+# Times closer than this (seconds) are the same frame: lookups from a frame
+# skip the frame itself. Well below the frame duration of 240 fps video.
+DEFAULT_TOLERANCE = 1e-3
+
+
+def _click_time(click: Mapping[str, Any]) -> float:
+    time = click.get("media_time")
+    if time is None:
+        time = click.get("frame_time")
+    return np.nan if time is None else time
+
+
+class TimeIndex:
+    """Distinct times in ascending order, with O(log n) neighbour lookups.
+
+    Parameters
+    ----------
+    times : array-like
+        Times in seconds, in any order and with duplicates.
+    tolerance : float
+        Times within this many seconds of the time looked up from are not
+        its neighbours (they are the frame on screen).
+    """
+
+    def __init__(self, times: Any = (), tolerance: float = DEFAULT_TOLERANCE) -> None:
+        self.times = np.unique(np.asarray(times, dtype=np.float64))
+        self.times.flags.writeable = False
+        self.tolerance = tolerance
+
+    @classmethod
+    def from_clicks(
+        cls, clicks: Iterable[Mapping[str, Any]], frame_table: Any = None
+    ) -> TimeIndex:
+        """Index the frames of clicks.
+
+        Each click's ``media_time`` (or ``frame_time``) is used; with the
+        video's :class:`.FrameTable` it is snapped to the presentation time
+        of the clicked frame, so every annotated frame appears once.
+        """
+        times = np.fromiter((_click_time(click) for click in clicks), dtype=np.float64)
+        times = times[~np.isnan(times)]
+        if frame_table is not None and len(frame_table) and len(times):
+            times = frame_table.frame_time(frame_table.frame_index(times))
+        return cls(times)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self.times.tolist())
+
+    def __repr__(self) -> str:
+        return f"TimeIndex({len(self)} times)"
+
+    def next(self, t: float) -> float | None:
+        """Return the first time after ``t``, or ``None`` if there is none."""
+        i = int(np.searchsorted(self.times, t + self.tolerance, side="right"))
+        return float(self.times[i]) if i < len(self.times) else None
+
+    def previous(self, t: float) -> float | None:
+        """Return the last time before ``t``, or ``None`` if there is none."""
+        i = int(np.searchsorted(self.times, t - self.tolerance, side="left"))
+        return float(self.times[i - 1]) if i > 0 else None
+
+    def nearest(self, t: float) -> float | None:
+        """Return the time closest to ``t`` (``t`` itself if indexed), or ``None`` if empty."""
+        i = int(np.searchsorted(self.times, t))
+        candidates = self.times[max(i - 1, 0) : i + 1]
+        if not len(candidates):
+            return None
+        return float(candidates[np.abs(candidates - t).argmin()])
+
+    def union(self, other: TimeIndex) -> TimeIndex:
+        """Return an index of the times of both indexes."""
+        return TimeIndex(np.concatenate([self.times, other.times]), self.tolerance)
+
+    def tolist(self) -> list:
+        """Return the times as a list, e.g. to send to the frontend."""
+        return self.times.tolist()
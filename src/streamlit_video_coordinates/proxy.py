@@ -0,0 +1,233 @@
+"""Downscaled proxy videos for playing high-resolution footage.
+
+4K and 8K recordings are slow to download and to scrub through in a browser.
+With proxy playback the component plays a small H.264 copy instead, made once
+per video with a locally installed ``ffmpeg`` and kept on disk. Timestamps
+are copied unchanged, so frame times and indices refer to the original, and
+the frontend reports click coordinates in the original's pixels.
+
+The proxy is scaled by a whole factor where possible, so that its pixel grid
+lines up exactly with the original's.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from . import metrics
+from .ffmpeg import run_ffmpeg
+from .media_server import unregister_media
+from .sources import content_id, local_path, source_token
+from .timestamps import frame_table_for_source
+
+DEFAULT_PROXY_HEIGHT = 540
+
+
+def _default_directory() -> Path:
+    return Path(tempfile.gettempdir()) / "streamlit_video_coordinates" / "proxies"
+
+
+@dataclass(frozen=True)
+class ProxyVideo:
+    """A proxy and the size of the video it stands in for."""
+
+    path: Path
+    width: int
+    height: int
+    original_width: int
+    original_height: int
+
+
+def proxy_size(width: int, height: int, max_height: int) -> Tuple[int, int]:
+    """Return the proxy size for a ``width`` x ``height`` video.
+
+    Both sides are divided by the smallest whole factor that brings the
+    height within ``max_height`` and rounded down to even numbers, which
+    H.264 requires.
+    """
+    factor = max(1, math.ceil(height / max_height))
+    return max(2, width // factor // 2 * 2), max(2, height // factor // 2 * 2)
+
+
+class ProxyCache:
+    """Creates proxies with ffmpeg and keeps them on disk.
+
+    Parameters
+    ----------
+    directory : str | Path | None
+        Where proxies are written. Defaults to a folder in the system
+        temporary directory.
+    ffmpeg, ffprobe : str
+        Executables to use.
+    crf : int
+        H.264 quality (lower is better and larger).
+    preset : str
+        H.264 encoder preset.
+    keyframe_interval : float
+        Seconds between keyframes. Short intervals make seeking fast.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        ffmpeg: str = "ffmpeg",
+        ffprobe: str = "ffprobe",
+        crf: int = 28,
+        preset: str = "veryfast",
+        keyframe_interval: float = 0.5,
+    ) -> None:
+        self.directory = Path(directory) if directory else _default_directory()
+        self.ffmpeg = ffmpeg
+        self.ffprobe = ffprobe
+        self.crf = crf
+        self.preset = preset
+        self.keyframe_interval = keyframe_interval
+        self._known: Dict[Tuple[str, int], ProxyVideo | None] = {}
+        self._lock = threading.Lock()
+        self._encoding: Dict[Path, threading.Lock] = {}
+
+    def get(self, source: Any, max_height: int = DEFAULT_PROXY_HEIGHT) -> ProxyVideo | None:
+        """Return the proxy of a local video, creating it if needed.
+
+        Returns ``None`` when the video is no taller than ``max_height``,
+        in which case the original should be played. The first call for a
+        video encodes the proxy and blocks until it is done; later calls,
+        from any session, reuse it.
+
+        Raises
+        ------
+        RuntimeError
+            If ffmpeg is not installed or fails.
+        ValueError
+            If ``source`` is a URL.
+        """
+        memo_key = (source_token(source), max_height)
+        with self._lock:
+            if memo_key in self._known:
+                proxy = self._known[memo_key]
+                if proxy is None or proxy.path.exists():
+                    return proxy
+
+        original = local_path(source)
+        width, height = self._original_size(source, original)
+        if height <= max_height:
+            proxy = None
+        else:
+            size = proxy_size(width, height, max_height)
+            name = f"{content_id(source)}_{size[0]}x{size[1]}_crf{self.crf}.mp4"
+            path = self._encode(original, self.directory / name, size)
+            proxy = ProxyVideo(path, size[0], size[1], width, height)
+
+        with self._lock:
+            self._known[memo_key] = proxy
+        return proxy
+
+    def clear(self) -> None:
+        """Delete every proxy."""
+        with self._lock:
+            self._known.clear()
+            if self.directory.exists():
+                for path in self.directory.iterdir():
+                    unregister_media(path)
+                    path.unlink(missing_ok=True)
+
+    def _tool(self, name: str) -> str:
+        executable = shutil.which(name)
+        if executable is None:
+            raise RuntimeError(
+                f"Proxy playback requires {name!r}; install ffmpeg or pass its "
+                "location to configure_proxies()"
+            )
+        return executable
+
+    def _original_size(self, source: Any, path: Path) -> Tuple[int, int]:
+        frames = frame_table_for_source(source)
+        if frames is not None and frames.width and frames.height:
+            return frames.width, frames.height
+
+        result = subprocess.run(
+            [
+                self._tool(self.ffprobe), "-v", "error", "-select_streams", "v:0",
+                "-show_entries", "stream=width,height", "-of", "csv=p=0:s=x", str(path),
+            ],
+            capture_output=True,
+            text=True,
+        )
+        try:
+            width, height = (int(v) for v in result.stdout.strip().split("x")[:2])
+        except ValueError:
+            raise RuntimeError(f"Could not read the video size of {path}: {result.stderr.strip()}") from None
+        return width, height
+
+    def _encode(self, original: Path, target: Path, size: Tuple[int, int]) -> Path:
+        with self._lock:
+            lock = self._encoding.setdefault(target, threading.Lock())
+        # One encode per proxy, even when several sessions ask at once
+        with lock:
+            try:
+                return self._encode_locked(original, target, size)
+            finally:
+                with self._lock:
+                    if self._encoding.get(target) is lock:
+                        del self._encoding[target]
+
+    def _encode_locked(self, original: Path, target: Path, size: Tuple[int, int]) -> Path:
+        if target.exists():
+            return target
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".part.mp4")
+        os.close(fd)
+        command = [
+            self._tool(self.ffmpeg), "-y", "-v", "error", "-i", str(original),
+            "-map", "0:v:0", "-map", "0:a:0?",
+            "-vf", f"scale={size[0]}:{size[1]}",
+            # Keep every frame at its original timestamp
+            "-fps_mode", "passthrough",
+            "-c:v", "libx264", "-preset", self.preset, "-crf", str(self.crf),
+            "-pix_fmt", "yuv420p",
+            "-force_key_frames", f"expr:gte(t,n_forced*{self.keyframe_interval})",
+            "-c:a", "aac", "-b:a", "96k",
+            "-movflags", "+faststart",
+            tmp_name,
+        ]
+        try:
+            with metrics.span("proxy_encode"):
+                result = run_ffmpeg(command, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(f"ffmpeg failed to create a proxy of {original}: {result.stderr.strip()}")
+            os.replace(tmp_name, target)
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+        return target
+
+
+_proxy_cache: ProxyCache | None = None
+_proxy_cache_lock = threading.Lock()
+
+
+def get_proxy_cache() -> ProxyCache:
+    """Return the process-wide proxy cache, creating it on first use."""
+    global _proxy_cache
+    with _proxy_cache_lock:
+        if _proxy_cache is None:
+            _proxy_cache = ProxyCache()
+        return _proxy_cache
+
+
+def configure_proxies(**settings: Any) -> ProxyCache:
+    """Replace the process-wide proxy cache with one using these settings.
+
+    Accepts the parameters of :class:`ProxyCache`.
+    """
+    global _proxy_cache
+    with _proxy_cache_lock:
+        _proxy_cache = ProxyCache(**settings)
+        return _proxy_cache
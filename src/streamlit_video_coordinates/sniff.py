@@ -0,0 +1,74 @@
+"""Detect a video's container format from its first bytes.
+
+File names lie (or are missing, for raw bytes), and a WebM served as
+``video/mp4`` does not play in every browser. Every supported container
+announces itself within its first few hundred bytes, so detection only ever
+looks at :data:`HEADER_SIZE` bytes, however large the video is.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import IO, Any, Optional
+
+HEADER_SIZE = 512
+
+_MP4_BRANDS_QUICKTIME = (b"qt  ",)
+_MPEG_TS_PACKET = 188
+
+
+def sniff_mimetype(header: bytes | bytearray | memoryview) -> Optional[str]:
+    """Return the MIME type of the container starting with ``header``.
+
+    Recognises MP4/QuickTime (``ftyp`` and bare ``moov``/``mdat`` boxes),
+    WebM and Matroska, Ogg, AVI and MPEG-TS. Returns ``None`` when the header
+    matches none of them.
+    """
+    view = memoryview(header).cast("B")
+    if len(view) < 12:
+        return None
+
+    kind = bytes(view[4:8])
+    if kind == b"ftyp":
+        return "video/quicktime" if bytes(view[8:12]) in _MP4_BRANDS_QUICKTIME else "video/mp4"
+    if kind in (b"moov", b"mdat", b"free", b"wide", b"skip"):
+        return "video/quicktime"
+
+    magic = bytes(view[:4])
+    if magic == b"\x1a\x45\xdf\xa3":
+        # The EBML header names the DocType within its first few bytes
+        return "video/webm" if b"webm" in bytes(view[:64]) else "video/x-matroska"
+    if magic == b"OggS":
+        return "video/ogg"
+    if magic == b"RIFF" and bytes(view[8:12]) == b"AVI ":
+        return "video/x-msvideo"
+    if view[0] == 0x47 and len(view) > _MPEG_TS_PACKET and view[_MPEG_TS_PACKET] == 0x47:
+        return "video/mp2t"
+    return None
+
+
+def read_header(source: str | Path | bytes | IO[bytes] | Any) -> Optional[memoryview]:
+    """Return up to :data:`HEADER_SIZE` leading bytes of a local source.
+
+    Bytes and ``BytesIO``-like objects are sliced without copying; other
+    streams are read and put back at their original position. Returns
+    ``None`` for unseekable streams, whose bytes could not be put back.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return memoryview(source)[:HEADER_SIZE]
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            return memoryview(f.read(HEADER_SIZE))
+    if hasattr(source, "getbuffer"):
+        # A slice of the buffer would keep the object's buffer exported
+        # (and the object unresizable), so copy these few bytes.
+        with source.getbuffer() as view:
+            return memoryview(bytes(view[:HEADER_SIZE]))
+    if getattr(source, "seekable", lambda: False)():
+        position = source.tell()
+        try:
+            source.seek(0)
+            return memoryview(source.read(HEADER_SIZE))
+        finally:
+            source.seek(position)
+    return None
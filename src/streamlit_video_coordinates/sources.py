@@ -0,0 +1,409 @@
+"""Resolve the ``source`` argument into something the frontend can play.
+
+Built in are URLs, local paths, raw bytes and file-like objects. Other types
+can be displayed once an adapter converting them into one of those has been
+registered with :func:`register_source_type`.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import singledispatch
+from pathlib import Path
+from typing import Any, Callable, Set, Tuple
+
+from typing_extensions import Literal, TypeAlias
+
+from . import metrics, url_util
+from .cache import content_fingerprint, file_fingerprint, path_identity, source_cache
+from .media_server import get_media_server
+from .sniff import read_header, sniff_mimetype
+from .spool import iter_chunks, spool, upload_identity
+
+_logger = logging.getLogger(__name__)
+
+ServingMode: TypeAlias = Literal["media", "http", "data"]
+SourceKind: TypeAlias = Literal["url", "path", "bytes", "file"]
+
+_URL_SCHEMAS = ("http", "https", "data")
+
+_MIMETYPES_BY_EXTENSION = {
+    ".mp4": "video/mp4",
+    ".webm": "video/webm",
+    ".ogg": "video/ogg",
+    ".ogv": "video/ogg",
+    ".avi": "video/x-msvideo",
+    ".mov": "video/quicktime",
+    ".m4v": "video/mp4",
+    ".mkv": "video/x-matroska",
+    ".ts": "video/mp2t",
+}
+
+_EXTENSIONS_BY_MIMETYPE = {
+    mimetype: extension
+    for extension, mimetype in reversed(list(_MIMETYPES_BY_EXTENSION.items()))
+}
+
+_DEFAULT_MIMETYPE = "video/mp4"
+
+
+def mimetype_from_name(name: str) -> str:
+    """Guess a video MIME type from a file name, falling back to MP4."""
+    return _MIMETYPES_BY_EXTENSION.get(Path(name).suffix.lower(), _DEFAULT_MIMETYPE)
+
+
+def detect_mimetype(source: str | Path | bytes | Any) -> str:
+    """Return the MIME type of a local source (path, bytes or file-like).
+
+    The container is recognised from the first few hundred bytes (see
+    :mod:`.sniff`); only when that fails is the file name's extension used,
+    and finally MP4 assumed.
+    """
+    header = read_header(source)
+    mimetype = sniff_mimetype(header) if header is not None else None
+    if mimetype is not None:
+        return mimetype
+    if isinstance(source, (str, Path)):
+        return mimetype_from_name(str(source))
+    return mimetype_from_name(getattr(source, "name", None) or "")
+
+
+def _suffix_for(mimetype: str) -> str:
+    return _EXTENSIONS_BY_MIMETYPE.get(mimetype, "")
+
+
+@singledispatch
+def as_source(source: Any) -> Any:
+    """Convert ``source`` with the adapter registered for its type, if any.
+
+    Objects of unregistered types are returned unchanged.
+    """
+    return source
+
+
+def register_source_type(cls: type, adapter: Callable[[Any], Any]) -> None:
+    """Display objects of type ``cls`` (and its subclasses) as videos.
+
+    ``adapter`` converts such an object into a built-in source: a URL, a
+    local path, bytes or a file-like object. It runs on every rerun, so
+    adapters that produce content (e.g. encode NumPy frames into a video)
+    should cache their result, ideally as a file path.
+
+    For example, objects of a bucket mirrored to a local directory::
+
+        register_source_type(S3Object, lambda obj: mirror_dir / obj.key)
+    """
+    as_source.register(cls)(adapter)
+
+
+def source_kind(source: Any) -> SourceKind:
+    """Classify a built-in source.
+
+    Raises
+    ------
+    ValueError
+        If ``source`` is none of the built-in kinds.
+    """
+    if isinstance(source, (str, Path)):
+        return "url" if url_util.is_url(str(source), allowed_schemas=_URL_SCHEMAS) else "path"
+    if isinstance(source, bytes):
+        return "bytes"
+    if hasattr(source, "read"):
+        return "file"
+    raise ValueError(
+        "Source must be a URL string, file path, bytes, or file-like object "
+        f"(or a type registered with register_source_type), not {type(source).__name__}"
+    )
+
+
+def to_data_url(content: bytes, mimetype: str) -> str:
+    """Encode raw video bytes as a base64 ``data:`` URL."""
+    with metrics.span("encode"):
+        encoded = base64.b64encode(content).decode("utf-8")
+    return f"data:{mimetype};base64,{encoded}"
+
+
+def media_manager_available() -> bool:
+    """Whether Streamlit's media file manager can be used.
+
+    The manager only exists while a script runs under ``streamlit run``; in
+    "bare" mode (plain ``python script.py`` or unit tests) it does not.
+    """
+    from streamlit import runtime  # noqa: PLC0415
+
+    return runtime.exists()
+
+
+def register_media(path_or_data: str | bytes, mimetype: str, coordinates: str) -> str:
+    """Register a file or bytes with Streamlit's media file manager.
+
+    Returns the short ``/media/...`` URL the browser can fetch the video from.
+    The registration is tied to the current session and ``coordinates``, so
+    Streamlit frees the file once no session references it any more.
+    """
+    from streamlit import runtime  # noqa: PLC0415
+
+    with metrics.span("register"):
+        return runtime.get_instance().media_file_mgr.add(
+            path_or_data, mimetype, coordinates
+        )
+
+
+def renew_media(url: str | None, coordinates: str) -> bool:
+    """Keep a URL returned by :func:`register_media` for another script run.
+
+    Registrations only last one script run. Renewing one ties the file the
+    manager still holds to the current session and ``coordinates`` again,
+    without reading the video. Returns ``False`` when that is not possible
+    (no runtime, or the file was freed); the source then has to be
+    registered again.
+    """
+    from streamlit import runtime  # noqa: PLC0415
+    from streamlit.runtime.media_file_manager import _get_session_id  # noqa: PLC0415
+    from streamlit.runtime.media_file_storage import MediaFileStorageError  # noqa: PLC0415
+
+    if url is None or not runtime.exists():
+        return False
+    manager = runtime.get_instance().media_file_mgr
+    file_id = url.rsplit("/", 1)[-1].split(".", 1)[0]
+    # MediaFileManager has no public API for this; its private state is used
+    # defensively, and any mismatch falls back to registering again.
+    try:
+        with manager._lock:
+            if file_id not in manager._file_metadata:
+                return False
+            if manager._storage.get_url(file_id) != url:
+                return False
+            manager._files_by_session_and_coord[_get_session_id()][coordinates] = file_id
+    except (AttributeError, MediaFileStorageError):
+        return False
+    return True
+
+
+def source_token(source: str | Path | bytes | Any) -> str:
+    """Return a short token that changes exactly when the video does.
+
+    Cheap for every source type: a ``stat`` for paths, the upload ID for
+    Streamlit uploads and a sampled fingerprint for bytes. Only ``data:``
+    URLs passed in by the caller and plain streams have to be hashed in full
+    (streams in bounded chunks).
+
+    Raises
+    ------
+    FileNotFoundError
+        If ``source`` is a path that does not exist.
+    ValueError
+        If ``source`` has an unsupported type.
+    """
+    source = as_source(source)
+    kind = source_kind(source)
+    if kind == "url":
+        parts: Any = ("url", hashlib.blake2b(str(source).encode(), digest_size=16).hexdigest())
+    elif kind == "path":
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"Video file not found: {path}")
+        parts = ("path", *path_identity(path))
+    elif kind == "bytes":
+        parts = ("bytes", content_fingerprint(source))
+    else:
+        parts = upload_identity(source)
+        if parts is None and hasattr(source, "getbuffer"):
+            with source.getbuffer() as view:
+                parts = ("bytes", content_fingerprint(view))
+        elif parts is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for chunk in iter_chunks(source):
+                digest.update(chunk)
+            parts = ("stream", digest.hexdigest())
+    return hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+
+_content_ids: OrderedDict[str, str] = OrderedDict()
+_MAX_CONTENT_IDS = 256
+_content_ids_lock = threading.Lock()
+
+
+def content_id(source: str | Path | bytes | Any) -> str:
+    """Return an identifier of the video's content, stable across sessions.
+
+    Unlike :func:`source_token`, which may be based on an upload ID or a file
+    modification time, the same video gets the same ID whether it is opened
+    from disk, uploaded again or passed as bytes. URLs are identified by the
+    URL itself. Results are memoised per :func:`source_token`, so the content
+    is sampled once per video and process.
+    """
+    source = as_source(source)
+    token = source_token(source)
+    with _content_ids_lock:
+        if token in _content_ids:
+            _content_ids.move_to_end(token)
+            return _content_ids[token]
+
+    kind = source_kind(source)
+    if kind == "url":
+        value = "url-" + hashlib.blake2b(str(source).encode(), digest_size=16).hexdigest()
+    elif kind == "path":
+        value = file_fingerprint(source)
+    elif kind == "bytes":
+        value = content_fingerprint(source)
+    elif hasattr(source, "getbuffer"):
+        with source.getbuffer() as view:
+            value = content_fingerprint(view)
+    else:
+        value = content_fingerprint(b"".join(iter_chunks(source)))
+
+    with _content_ids_lock:
+        _content_ids[token] = value
+        while len(_content_ids) > _MAX_CONTENT_IDS:
+            _content_ids.popitem(last=False)
+    return value
+
+
+def local_path(source: str | Path | bytes | Any) -> Path:
+    """Return a local file holding the video, for tools that need a path.
+
+    Paths are returned as they are; bytes and file-like objects are copied
+    to the spool (once per content, see :mod:`.spool`).
+
+    Raises
+    ------
+    ValueError
+        If ``source`` is a URL or has an unsupported type.
+    """
+    source = as_source(source)
+    kind = source_kind(source)
+    if kind == "url":
+        raise ValueError("URL sources have no local file")
+    if kind == "path":
+        return Path(source)
+    suffix = _suffix_for(detect_mimetype(source))
+    with metrics.span("spool"):
+        if kind == "bytes":
+            return spool.add_bytes(source, suffix=suffix)
+        return spool.add_file_like(source, suffix=suffix)
+
+
+def _read_file(path: Path) -> bytes:
+    with metrics.span("read"):
+        return path.read_bytes()
+
+
+def _read_content(source: Any) -> bytes:
+    with metrics.span("read"):
+        if hasattr(source, "getvalue"):
+            # BytesIO or similar
+            return source.getvalue()
+        # Read from file-like object
+        return source.read()
+
+
+_warned_uncached: Set[Tuple[str, int, int]] = set()
+
+
+def _warn_if_uncached(identity: Tuple[str, int, int], payload_size: int) -> None:
+    # A payload over the cache budget is never stored, so the file is read
+    # again on every rerun; say so once per file.
+    if payload_size <= source_cache.max_bytes or identity in _warned_uncached:
+        return
+    _warned_uncached.add(identity)
+    _logger.warning(
+        "%s needs a %d MiB payload, more than source_cache.max_bytes (%d MiB), "
+        "so it is read again on every rerun. Raise source_cache.max_bytes or use "
+        'serving="http" to stream it from disk.',
+        identity[0],
+        payload_size // 2**20,
+        source_cache.max_bytes // 2**20,
+    )
+
+
+def resolve_source(
+    source: str | Path | bytes | Any,
+    serving: ServingMode = "media",
+    coordinates: str = "streamlit_video_coordinates",
+) -> str:
+    """Turn a user-supplied video source into a ``src`` for the frontend.
+
+    Parameters
+    ----------
+    source : str | Path | bytes | Any
+        URL, local file path, raw bytes, a file-like object or an object of
+        a type registered with :func:`register_source_type`.
+    serving : "media" | "http" | "data"
+        How local content reaches the browser. ``"media"`` registers it with
+        Streamlit's media file manager and passes a short URL; ``"http"``
+        streams from the built-in range-request server (see
+        :mod:`.media_server`), after spooling bytes and file-like objects to
+        disk in chunks (see :mod:`.spool`); ``"data"`` inlines it as a base64
+        ``data:`` URL. ``"media"`` silently falls back to ``"data"`` when no
+        Streamlit runtime is running.
+        Local content is labelled with the MIME type detected from its
+        first bytes (see :func:`detect_mimetype`). With ``"media"`` and
+        ``"data"``, files larger than ``source_cache.max_bytes`` are not
+        cached and are read again on every call (a warning is logged once).
+    coordinates : str
+        Media file manager slot for this component instance.
+
+    Returns
+    -------
+    str
+        A URL (``http(s)``, ``data:`` or a server-relative ``/media/...``).
+
+    Raises
+    ------
+    FileNotFoundError
+        If ``source`` is a path that does not exist.
+    ValueError
+        If ``source`` has an unsupported type or ``serving`` is unknown.
+    """
+    if serving not in ("media", "http", "data"):
+        raise ValueError(f"Unknown serving mode: {serving!r}")
+
+    source = as_source(source)
+    kind = source_kind(source)
+    if kind == "url":
+        # URL source (including data URLs)
+        return str(source)
+
+    use_media = serving in ("media", "http") and media_manager_available()
+
+    if kind == "path":
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"Video file not found: {path}")
+
+        # Keyed by (path, mtime, size): every session showing this file shares
+        # a single read, and a rewritten file is picked up on the next rerun.
+        identity = path_identity(path)
+        mimetype = detect_mimetype(path)
+        if serving == "http":
+            # Streamed from disk on demand; nothing is read here.
+            return get_media_server().register(path, mimetype)
+        # Base64 grows the payload by a third
+        _warn_if_uncached(identity, identity[2] if use_media else identity[2] * 4 // 3)
+        if use_media:
+            content = source_cache.get_or_create(("raw", *identity), lambda: _read_file(path))
+            return register_media(content, mimetype, coordinates)
+        return source_cache.get_or_create(
+            ("data", mimetype, *identity),
+            lambda: to_data_url(_read_file(path), mimetype),
+        )
+
+    mimetype = detect_mimetype(source)
+    if serving == "http":
+        # Bytes and file-like objects (e.g. from st.file_uploader) are copied
+        # to disk in bounded chunks, never materialised in memory.
+        return get_media_server().register(local_path(source), mimetype)
+    content = source if kind == "bytes" else _read_content(source)
+
+    if use_media:
+        # The media file manager deduplicates identical content itself.
+        return register_media(content, mimetype, coordinates)
+    return source_cache.get_or_create(
+        ("data", mimetype, content_fingerprint(content)),
+        lambda: to_data_url(content, mimetype),
+    )
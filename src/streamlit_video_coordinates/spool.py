@@ -0,0 +1,236 @@
+"""Copy in-memory and file-like video sources to disk in fixed-size chunks.
+
+Reading an upload with ``getvalue()`` and base64-encoding it costs a couple of
+full copies of the video per rerun. With ``serving="http"`` the content is
+instead streamed once into a spool file, named after its content, and the
+range-request server reads it back from there. Peak memory is one chunk
+buffer no matter how large the video is.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, Iterator
+
+from .media_server import unregister_media
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024 * 1024
+
+
+def _default_directory() -> Path:
+    return Path(tempfile.gettempdir()) / "streamlit_video_coordinates" / "spool"
+
+
+def _new_digest():
+    # Spool files are named after a hash of their whole content: a sampled
+    # fingerprint could give two different videos the same file
+    return hashlib.blake2b(digest_size=16)
+
+
+def upload_identity(source: Any) -> Hashable | None:
+    """Identity of a Streamlit ``UploadedFile``, or ``None`` for other objects."""
+    # Streamlit's UploadedFile carries a stable per-upload ID, which lets
+    # reruns skip reading the content altogether.
+    file_id = getattr(source, "file_id", None)
+    size = getattr(source, "size", None)
+    if file_id is None or size is None:
+        return None
+    return ("upload", file_id, size)
+
+
+def iter_chunks(source: Any, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes | memoryview]:
+    """Yield the whole content of a file-like object in bounded chunks.
+
+    ``BytesIO``-like objects are sliced through ``getbuffer()`` without
+    copying. Other streams are read from the start, and their position is
+    restored afterwards when they are seekable.
+    """
+    if hasattr(source, "getbuffer"):
+        with source.getbuffer() as view:
+            for start in range(0, view.nbytes, chunk_size):
+                yield view[start : start + chunk_size]
+        return
+
+    seekable = getattr(source, "seekable", lambda: False)()
+    position = source.tell() if seekable else None
+    if seekable:
+        source.seek(0)
+    try:
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        if position is not None:
+            source.seek(position)
+
+
+class Spool:
+    """A content-addressed directory of spooled video files.
+
+    Parameters
+    ----------
+    directory : str | Path | None
+        Where spool files are written. Defaults to a folder in the system
+        temporary directory.
+    max_bytes : int
+        Once the spool grows past this size, the least recently used files
+        are deleted.
+    chunk_size : int
+        Size of each read/write while copying a stream.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        self.directory = Path(directory) if directory else _default_directory()
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self._known: Dict[Hashable, Path] = {}
+        self._lock = threading.Lock()
+
+    def add_file_like(self, source: Any, suffix: str = "") -> Path:
+        """Spool a file-like object and return the path of its copy.
+
+        Streamlit uploads are recognised by their ``file_id`` and read only
+        once. Other streams are re-read on every call (in chunks) to find
+        their content hash, and only written when no file with that hash
+        exists yet. Streams that cannot be rewound are hashed while they are
+        copied, since they can only be read once.
+        """
+        identity = upload_identity(source)
+        if identity is not None:
+            known = self._lookup(identity)
+            if known is not None:
+                return known
+
+        seekable = getattr(source, "seekable", lambda: False)()
+        if hasattr(source, "getbuffer") or seekable:
+            digest = _new_digest()
+            for chunk in iter_chunks(source, self.chunk_size):
+                digest.update(chunk)
+            path = self.directory / f"{digest.hexdigest()}{suffix}"
+            if path.exists():
+                self._touch(path)
+            else:
+                path = self._write(iter_chunks(source, self.chunk_size), path.name)
+        else:
+            path = self._write(iter_chunks(source, self.chunk_size), None, suffix)
+
+        if identity is not None:
+            with self._lock:
+                self._known[identity] = path
+        return path
+
+    def add_bytes(self, data: bytes, suffix: str = "") -> Path:
+        """Spool raw bytes and return the path of their copy."""
+        digest = _new_digest()
+        view = memoryview(data)
+        for start in range(0, view.nbytes, self.chunk_size):
+            digest.update(view[start : start + self.chunk_size])
+        name = f"{digest.hexdigest()}{suffix}"
+        path = self.directory / name
+        if path.exists():
+            self._touch(path)
+            return path
+
+        return self._write([data], name)
+
+    def clear(self) -> None:
+        """Delete every spooled file."""
+        with self._lock:
+            self._known.clear()
+            if self.directory.exists():
+                for path in self.directory.iterdir():
+                    unregister_media(path)
+                    path.unlink(missing_ok=True)
+
+    def _lookup(self, identity: Hashable) -> Path | None:
+        with self._lock:
+            path = self._known.get(identity)
+        if path is not None and path.exists():
+            self._touch(path)
+            return path
+        return None
+
+    def _write(
+        self, chunks: Iterable[bytes | memoryview], name: str | None, suffix: str = ""
+    ) -> Path:
+        # Without a name, the file is named after the hash of what it was
+        # written from.
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        digest = _new_digest()
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in chunks:
+                    if name is None:
+                        digest.update(chunk)
+                    out.write(chunk)
+            return self._commit(Path(tmp_name), name or f"{digest.hexdigest()}{suffix}")
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def _commit(self, tmp: Path, name: str) -> Path:
+        path = self.directory / name
+        if path.exists():
+            # Same content was spooled before (possibly by another session).
+            tmp.unlink()
+            self._touch(path)
+        else:
+            os.replace(tmp, path)
+        self._evict(keep=path)
+        return path
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        # Recency is kept in the access time. The modification time must not
+        # change: the media server derives a file's URL from it, and pages
+        # may still be streaming that URL.
+        with contextlib.suppress(OSError):
+            os.utime(path, ns=(time.time_ns(), path.stat().st_mtime_ns))
+
+    def _evict(self, keep: Path) -> None:
+        with self._lock:
+            files = []
+            for p in self.directory.iterdir():
+                if p.suffix == ".part" or p == keep:
+                    continue
+                try:
+                    st = p.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((st.st_atime, st.st_size, p))
+
+            total = sum(size for _, size, _ in files) + keep.stat().st_size
+            removed = set()
+            for _, size, p in sorted(files, key=lambda f: f[0]):
+                if total <= self.max_bytes:
+                    break
+                # Evicted files stop being served. A page still playing one
+                # fails to load it and asks for the video again, which
+                # spools it again under a new URL.
+                unregister_media(p)
+                p.unlink(missing_ok=True)
+                removed.add(p)
+                total -= size
+            if removed:
+                self._known = {
+                    k: v for k, v in self._known.items() if v not in removed
+                }
+
+
+# Shared by every session in the process.
+spool = Spool()
@@ -0,0 +1,207 @@
+"""Persistent, append-only storage for clicks.
+
+Session state only lives as long as the browser tab, and replaying a long
+annotation session through it means shipping every click through every
+rerun. An :class:`AnnotationStore` instead keeps clicks in a SQLite database
+(in WAL mode, so readers never block the writing sessions). Clicks are keyed
+by the video's content ID (see :func:`.sources.content_id`) and an annotator
+name, and can be queried back by frame or time range through an index,
+without loading the rest::
+
+    store = AnnotationStore("annotations.db")
+    streamlit_video_coordinates(video, store=store, annotator="alice")
+    ...
+    table = store.query(content_id(video), frames=(100, 200))
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+import numpy as np
+from typing_extensions import Literal
+
+from .table import CLICK_COLUMNS, ClickTable
+
+
+def _column_type(dtype: np.dtype) -> str:
+    return "REAL" if dtype.kind == "f" else "INTEGER"
+
+
+# The annotator comes last, so that range queries over all annotators can
+# still scan the index.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clicks (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    annotator TEXT NOT NULL,
+    {columns}
+);
+CREATE INDEX IF NOT EXISTS clicks_by_video_frame ON clicks (video_id, frame_index, annotator);
+CREATE INDEX IF NOT EXISTS clicks_by_video_time ON clicks (video_id, frame_time, annotator);
+""".format(
+    columns=",\n    ".join(
+        f"{name} {_column_type(dtype)}" for name, dtype in CLICK_COLUMNS.items()
+    )
+)
+
+_FIELDS = tuple(CLICK_COLUMNS)
+
+# Integer columns come back as -1 when missing, like ClickTable stores them.
+# Missing floats come back as NULL, which NumPy converts to NaN.
+_SELECT = ", ".join(
+    name if dtype.kind == "f" else f"COALESCE({name}, -1)"
+    for name, dtype in CLICK_COLUMNS.items()
+)
+
+_INSERT = "INSERT INTO clicks (video_id, annotator, {}) VALUES (?, ?, {})".format(
+    ", ".join(_FIELDS), ", ".join("?" for _ in _FIELDS)
+)
+
+
+class AnnotationStore:
+    """Clicks of many videos and annotators in one SQLite database.
+
+    Safe to share between sessions (threads) of one Streamlit server, and
+    between processes opening the same file.
+
+    Parameters
+    ----------
+    path : str | Path
+        Database file, created if missing. ``":memory:"`` keeps the store in
+        memory (mostly useful for tests).
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Durable across application crashes; only an OS crash or power loss
+        # may lose the latest transactions.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def append(
+        self, video_id: str, clicks: Iterable[Mapping[str, Any]], annotator: str = ""
+    ) -> int:
+        """Append a batch of clicks in a single transaction.
+
+        Returns the number of clicks written. Unknown fields are dropped.
+        """
+        rows = [
+            (video_id, annotator, *(click.get(name) for name in _FIELDS))
+            for click in clicks
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(_INSERT, rows)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return len(rows)
+
+    def _where(
+        self,
+        video_id: str,
+        annotator: str | None,
+        frames: Tuple[int, int] | None,
+        times: Tuple[float, float] | None,
+    ) -> Tuple[str, List[Any]]:
+        clauses, params = ["video_id = ?"], [video_id]
+        if annotator is not None:
+            clauses.append("annotator = ?")
+            params.append(annotator)
+        if frames is not None:
+            clauses.append("frame_index >= ? AND frame_index < ?")
+            params.extend(frames)
+        if times is not None:
+            clauses.append("frame_time >= ? AND frame_time < ?")
+            params.extend(times)
+        return " AND ".join(clauses), params
+
+    def query(
+        self,
+        video_id: str,
+        annotator: str | None = None,
+        frames: Tuple[int, int] | None = None,
+        times: Tuple[float, float] | None = None,
+        return_type: Literal["table", "list"] = "table",
+    ) -> ClickTable | List[Dict[str, Any]]:
+        """Return the stored clicks of a video, in the order they were written.
+
+        Parameters
+        ----------
+        video_id : str
+            Content ID of the video.
+        annotator : str | None
+            Only return this annotator's clicks. ``None`` returns everyone's.
+        frames : (int, int) | None
+            Half-open ``[start, stop)`` range of frame indices.
+        times : (float, float) | None
+            Half-open ``[start, stop)`` range of frame times in seconds.
+        return_type : "table" | "list"
+            A :class:`.ClickTable` (the default) or a list of dicts.
+        """
+        if return_type not in ("table", "list"):
+            raise ValueError(f"Unknown return_type: {return_type!r}")
+
+        where, params = self._where(video_id, annotator, frames, times)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_SELECT} FROM clicks WHERE {where} ORDER BY id", params
+            ).fetchall()
+
+        columns = zip(*rows) if rows else [()] * len(_FIELDS)
+        table = ClickTable.from_columns(
+            {
+                name: np.array(values, dtype=CLICK_COLUMNS[name])
+                for name, values in zip(_FIELDS, columns)
+            }
+        )
+        if return_type == "list":
+            return table.to_list()
+        return table
+
+    def count(
+        self,
+        video_id: str,
+        annotator: str | None = None,
+        frames: Tuple[int, int] | None = None,
+        times: Tuple[float, float] | None = None,
+    ) -> int:
+        """Return how many clicks :meth:`query` would return."""
+        where, params = self._where(video_id, annotator, frames, times)
+        with self._lock:
+            (count,) = self._conn.execute(
+                f"SELECT COUNT(*) FROM clicks WHERE {where}", params
+            ).fetchone()
+        return count
+
+    def annotators(self, video_id: str) -> List[str]:
+        """Return the annotators that have clicks on a video."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT annotator FROM clicks WHERE video_id = ? ORDER BY annotator",
+                (video_id,),
+            ).fetchall()
+        return [annotator for (annotator,) in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> AnnotationStore:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,210 @@
+"""Columnar, NumPy-backed storage for click events.
+
+:class:`ClickTable` keeps one typed array per click field instead of one dict
+per click. It still behaves like the familiar ``List[Dict[str, Any]]`` (length,
+indexing and iteration yield plain dicts, and a table equals the click list
+it was built from), so existing callers keep working, while CV pipelines can
+take the columns directly without copying.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, overload
+
+import numpy as np
+
+# Field name -> dtype of its column. Missing (None) fields are stored as NaN
+# (float columns) or -1 (integer columns) and read back as None; unknown
+# fields are dropped.
+CLICK_COLUMNS: Dict[str, np.dtype] = {
+    "x": np.dtype(np.int32),
+    "y": np.dtype(np.int32),
+    "frame_time": np.dtype(np.float64),
+    "frame_index": np.dtype(np.int64),
+    "width": np.dtype(np.int32),
+    "height": np.dtype(np.int32),
+    "unix_time": np.dtype(np.int64),
+    "media_time": np.dtype(np.float64),
+    "presented_frames": np.dtype(np.int64),
+    "track_id": np.dtype(np.int64),
+}
+
+_INITIAL_CAPACITY = 64
+
+
+def _fill_value(dtype: np.dtype) -> Any:
+    return np.nan if dtype.kind == "f" else -1
+
+
+def _missing_to_none(value: Any, dtype: np.dtype) -> Any:
+    # Each column's own sentinel: float columns only mark missing values with
+    # NaN, so -1.0 there is a real value
+    if dtype.kind == "f":
+        return None if value != value else value  # NaN is the only value != itself
+    return None if value == -1 else value
+
+
+def _row_matches(row: Dict[str, Any], click: Any) -> bool:
+    # A click dict leaves out fields it has no value for, and fields outside
+    # CLICK_COLUMNS are not stored at all, so such a click can't be equal
+    return (
+        isinstance(click, Mapping)
+        and click.keys() <= row.keys()
+        and all(row[name] == click.get(name) for name in row)
+    )
+
+
+class ClickTable(Sequence[Dict[str, Any]]):
+    """Click events stored as one typed NumPy array per field.
+
+    Parameters
+    ----------
+    records : Iterable[Mapping[str, Any]]
+        Click dicts as returned by the component. Only the fields in
+        ``CLICK_COLUMNS`` are stored: others, such as a grid click's
+        ``view``, are dropped.
+
+    A table equals a list of click dicts when each dict has the same values
+    as its row, with fields the dict leaves out missing from the row. A list
+    with fields the table doesn't store is never equal to it.
+
+    Examples
+    --------
+    >>> table = ClickTable([{"x": 1, "y": 2, "frame_time": 0.5}])
+    >>> table["x"]
+    array([1], dtype=int32)
+    >>> table[0]["frame_time"]
+    0.5
+    """
+
+    def __init__(self, records: Iterable[Mapping[str, Any]] = ()) -> None:
+        self._size = 0
+        self._data = {
+            name: np.empty(_INITIAL_CAPACITY, dtype)
+            for name, dtype in CLICK_COLUMNS.items()
+        }
+        self.extend(records)
+
+    @classmethod
+    def from_columns(cls, columns: Mapping[str, Any]) -> ClickTable:
+        """Build a table from equally long column arrays (copied once)."""
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+        size = lengths.pop() if lengths else 0
+
+        table = cls()
+        table._reserve(size)
+        for name, dtype in CLICK_COLUMNS.items():
+            target = table._data[name]
+            if name in columns:
+                target[:size] = np.asarray(columns[name], dtype=dtype)
+            else:
+                target[:size] = _fill_value(dtype)
+        table._size = size
+        return table
+
+    def extend(self, records: Iterable[Mapping[str, Any]]) -> None:
+        """Append click dicts. Amortised O(1) per click."""
+        records = list(records)
+        if not records:
+            return
+        start, stop = self._size, self._size + len(records)
+        self._reserve(stop)
+        for name, dtype in CLICK_COLUMNS.items():
+            fill = _fill_value(dtype)
+            self._data[name][start:stop] = np.fromiter(
+                (
+                    fill if (v := r.get(name)) is None else v
+                    for r in records
+                ),
+                dtype=dtype,
+                count=len(records),
+            )
+        self._size = stop
+
+    def append(self, record: Mapping[str, Any]) -> None:
+        self.extend((record,))
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._data["x"])
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name, column in self._data.items():
+            grown = np.empty(capacity, column.dtype)
+            grown[: self._size] = column[: self._size]
+            self._data[name] = grown
+
+    @property
+    def columns(self) -> List[str]:
+        return list(CLICK_COLUMNS)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @overload
+    def __getitem__(self, index: int) -> Dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Dict[str, Any]]: ...
+
+    @overload
+    def __getitem__(self, index: str) -> np.ndarray: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, str):
+            if index not in self._data:
+                raise KeyError(index)
+            return self._data[index][: self._size]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("ClickTable index out of range")
+        return {
+            name: _missing_to_none(column[index].item(), column.dtype)
+            for name, column in self._data.items()
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self._size):
+            yield self[i]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ClickTable):
+            return len(self) == len(other) and all(
+                np.array_equal(self[name], other[name], equal_nan=True)
+                for name in CLICK_COLUMNS
+            )
+        if isinstance(other, list):
+            return len(self) == len(other) and all(
+                _row_matches(row, click) for row, click in zip(self, other)
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ClickTable({self._size} clicks)"
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Return the clicks as a list of plain dicts."""
+        return list(self)
+
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        """Return ``{field: array}`` views of the columns (no copy)."""
+        return {name: column[: self._size] for name, column in self._data.items()}
+
+    def to_pandas(self):
+        """Return a ``pandas.DataFrame`` backed by the column arrays."""
+        import pandas as pd  # noqa: PLC0415
+
+        return pd.DataFrame(self.to_numpy(), copy=False)
+
+    def to_arrow(self):
+        """Return a ``pyarrow.Table`` that shares memory with the columns."""
+        import pyarrow as pa  # noqa: PLC0415
+
+        return pa.table({name: pa.array(v) for name, v in self.to_numpy().items()})
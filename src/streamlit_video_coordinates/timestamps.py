@@ -0,0 +1,536 @@
+"""Per-frame presentation timestamps read straight from the container.
+
+The browser only knows the playback time of a click, not which frame was on
+screen. Assuming a fixed frame rate gets 25/60 fps and variable frame rate
+footage wrong, so for local sources the sample tables are read from the file
+header instead:
+
+- MP4 / MOV: ``moov/trak/mdia/minf/stbl`` (``stts`` decode deltas, ``ctts``
+  composition offsets, ``stss`` sync samples) plus the ``elst`` edit list.
+- Matroska / WebM: the block timestamps of the video track, read from each
+  ``Cluster`` without touching the frame payloads.
+
+The resulting :class:`FrameTable` is built once per video, cached, and maps
+click times to frame indices by binary search.
+"""
+
+from __future__ import annotations
+
+import io
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .cache import content_fingerprint, path_identity
+from .sources import as_source, content_id, source_kind
+
+# Small enough to keep, large enough to cover every video a process shows.
+_MAX_CACHED_TABLES = 64
+
+
+class ContainerError(ValueError):
+    """Raised when a file is not a supported or well-formed container."""
+
+
+@dataclass(frozen=True)
+class FrameTable:
+    """Presentation timestamps of every frame of a video's first video track.
+
+    Attributes
+    ----------
+    pts : np.ndarray
+        Presentation time of each frame in seconds, in display order.
+    keyframes : np.ndarray
+        Presentation times of the sync samples (keyframes), ascending.
+    width, height : int | None
+        Display size of the track, when the container records it.
+    resolution : float
+        Precision of the container's timestamps in seconds (e.g. 1 ms for
+        most WebM files).
+    """
+
+    pts: np.ndarray
+    keyframes: np.ndarray
+    width: Optional[int] = None
+    height: Optional[int] = None
+    resolution: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self.pts)
+
+    @property
+    def frame_rate(self) -> float:
+        """Median frame rate; only meaningful for constant frame rate video."""
+        if len(self.pts) < 2:
+            return 0.0
+        return float(1.0 / np.median(np.diff(self.pts)))
+
+    def frame_index(self, times: Any) -> np.ndarray:
+        """Map playback times (seconds) to the index of the displayed frame.
+
+        A frame is displayed from its own timestamp up to the next one, so
+        this is the last frame whose timestamp is ``<= t``. Times before the
+        first frame map to frame 0.
+        """
+        times = np.asarray(times, dtype=np.float64)
+        # Both the browser (microseconds) and the container (e.g. milliseconds
+        # in WebM) round timestamps; don't let that push a click exactly on a
+        # frame boundary back onto the previous frame.
+        tolerance = self.resolution / 2 + 1e-6
+        idx = np.searchsorted(self.pts, times + tolerance, side="right") - 1
+        return np.clip(idx, 0, max(len(self.pts) - 1, 0))
+
+    def frame_time(self, index: Any) -> np.ndarray:
+        """Presentation time of the given frame indices."""
+        return self.pts[np.asarray(index, dtype=np.int64)]
+
+
+# ---------------------------------------------------------------------------
+# MP4 / MOV
+# ---------------------------------------------------------------------------
+
+_MP4_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl", b"edts"}
+
+
+def _iter_boxes(f: IO[bytes], start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield ``(type, payload_start, box_end)`` for boxes in ``[start, end)``."""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack(">I4s", header)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - pos
+        if size < header_size:
+            raise ContainerError(f"Corrupt MP4 box {kind!r} at offset {pos}")
+        yield kind, pos + header_size, min(pos + size, end)
+        pos += size
+
+
+def _collect_boxes(f: IO[bytes], start: int, end: int) -> Dict[bytes, Any]:
+    """Read a box subtree into nested dicts; leaf payloads stay on disk."""
+    boxes: Dict[bytes, Any] = {}
+    for kind, payload_start, box_end in _iter_boxes(f, start, end):
+        if kind == b"trak":
+            boxes.setdefault(b"trak", []).append(
+                _collect_boxes(f, payload_start, box_end)
+            )
+        elif kind in _MP4_CONTAINERS:
+            boxes[kind] = _collect_boxes(f, payload_start, box_end)
+        else:
+            boxes[kind] = (payload_start, box_end)
+    return boxes
+
+
+def _read_payload(f: IO[bytes], span: Tuple[int, int]) -> bytes:
+    f.seek(span[0])
+    return f.read(span[1] - span[0])
+
+
+def _read_table(payload: bytes, columns: int, dtype: str) -> np.ndarray:
+    (count,) = struct.unpack_from(">I", payload, 4)
+    table = np.frombuffer(payload, dtype=dtype, count=count * columns, offset=8)
+    return table.reshape(count, columns).astype(np.int64)
+
+
+def _mp4_track_size(payload: bytes) -> Tuple[Optional[int], Optional[int]]:
+    offset = 88 if payload[0] == 1 else 76
+    if len(payload) < offset + 8:
+        return None, None
+    width, height = struct.unpack_from(">II", payload, offset)
+    return (width >> 16) or None, (height >> 16) or None
+
+
+def _mp4_edits(payload: bytes) -> Tuple[int, int]:
+    """Return the leading empty edits' duration and the first edit's media time.
+
+    The duration is in the movie's timescale (``mvhd``), the media time in
+    the track's (``mdhd``).
+    """
+    version = payload[0]
+    (count,) = struct.unpack_from(">I", payload, 4)
+    entry = ">Qq" if version == 1 else ">Ii"
+    step = struct.calcsize(entry) + 4  # media_rate
+    empty = 0
+    for i in range(count):
+        duration, media_time = struct.unpack_from(entry, payload, 8 + i * step)
+        if media_time >= 0:
+            return empty, media_time
+        empty += duration  # -1 marks an empty edit: nothing is shown
+    return empty, 0
+
+
+def _read_mp4(f: IO[bytes], size: int) -> FrameTable:
+    top = _collect_boxes(f, 0, size)
+    if b"moov" not in top:
+        if b"moof" in top:
+            raise ContainerError("Fragmented MP4 files are not supported")
+        raise ContainerError("MP4 file has no 'moov' box")
+
+    for trak in top[b"moov"].get(b"trak", []):
+        mdia = trak.get(b"mdia", {})
+        hdlr = mdia.get(b"hdlr")
+        if hdlr is None or _read_payload(f, hdlr)[8:12] != b"vide":
+            continue
+
+        mdhd = _read_payload(f, mdia[b"mdhd"])
+        (timescale,) = struct.unpack_from(">I", mdhd, 20 if mdhd[0] == 1 else 12)
+        stbl = mdia.get(b"minf", {}).get(b"stbl", {})
+        if b"stts" not in stbl or not timescale:
+            raise ContainerError("Video track has no sample timing table")
+
+        stts = _read_table(_read_payload(f, stbl[b"stts"]), 2, ">u4")
+        deltas = np.repeat(stts[:, 1], stts[:, 0])
+        dts = np.concatenate(([0], np.cumsum(deltas)[:-1])) if len(deltas) else deltas
+
+        times = dts
+        if b"ctts" in stbl:
+            payload = _read_payload(f, stbl[b"ctts"])
+            ctts = _read_table(payload, 2, ">i4" if payload[0] == 1 else ">u4")
+            offsets = np.repeat(ctts[:, 1], ctts[:, 0])
+            # A table shorter than the samples leaves the rest unshifted
+            offsets = offsets[: len(dts)]
+            offsets = np.pad(offsets, (0, len(dts) - len(offsets)))
+            times = dts + offsets
+
+        delay = 0.0
+        elst = trak.get(b"edts", {}).get(b"elst")
+        if elst is not None:
+            empty, shift = _mp4_edits(_read_payload(f, elst))
+            times = times - shift
+            if empty and b"mvhd" in top[b"moov"]:
+                mvhd = _read_payload(f, top[b"moov"][b"mvhd"])
+                (movie_timescale,) = struct.unpack_from(">I", mvhd, 20 if mvhd[0] == 1 else 12)
+                delay = empty / movie_timescale if movie_timescale else 0.0
+
+        decode_order_pts = times / timescale + delay
+        if b"stss" in stbl:
+            sync = _read_table(_read_payload(f, stbl[b"stss"]), 1, ">u4")[:, 0] - 1
+            sync = sync[(sync >= 0) & (sync < len(times))]
+            keyframes = np.sort(decode_order_pts[sync])
+        else:
+            keyframes = np.sort(decode_order_pts)
+
+        width = height = None
+        if b"tkhd" in trak:
+            width, height = _mp4_track_size(_read_payload(f, trak[b"tkhd"]))
+        return FrameTable(
+            np.sort(decode_order_pts), keyframes, width, height, 1.0 / timescale
+        )
+
+    raise ContainerError("MP4 file has no video track")
+
+
+# ---------------------------------------------------------------------------
+# Matroska / WebM
+# ---------------------------------------------------------------------------
+
+_EBML_HEADER = 0x1A45DFA3
+_SEGMENT = 0x18538067
+_INFO = 0x1549A966
+_TIMESTAMP_SCALE = 0x2AD7B1
+_TRACKS = 0x1654AE6B
+_TRACK_ENTRY = 0xAE
+_TRACK_NUMBER = 0xD7
+_TRACK_TYPE = 0x83
+_VIDEO = 0xE0
+_PIXEL_WIDTH = 0xB0
+_PIXEL_HEIGHT = 0xBA
+_DISPLAY_WIDTH = 0x54B0
+_DISPLAY_HEIGHT = 0x54BA
+_CLUSTER = 0x1F43B675
+_CLUSTER_TIMESTAMP = 0xE7
+_SIMPLE_BLOCK = 0xA3
+_BLOCK_GROUP = 0xA0
+_BLOCK = 0xA1
+_REFERENCE_BLOCK = 0xFB
+
+# Children of a Segment. Meeting one while inside an unknown-size Cluster
+# means that Cluster has ended.
+_SEGMENT_CHILDREN = {
+    _CLUSTER, _INFO, _TRACKS, 0x1C53BB6B, 0x114D9B74, 0x1941A469, 0x1043A770, 0x1254C367,
+}
+
+
+def _read_vint(f: IO[bytes], keep_marker: bool) -> Tuple[Optional[int], int]:
+    """Read an EBML variable-length integer, returning ``(value, length)``.
+
+    The value is ``None`` for the reserved "unknown size" encoding.
+    """
+    first = f.read(1)
+    if not first:
+        raise EOFError
+    b = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not b & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise ContainerError("Invalid EBML variable-length integer")
+
+    rest = f.read(length - 1)
+    if len(rest) < length - 1:
+        raise EOFError
+    value = b if keep_marker else b & (mask - 1)
+    all_ones = value == mask - 1
+    for byte in rest:
+        value = (value << 8) | byte
+        all_ones = all_ones and byte == 0xFF
+    if not keep_marker and all_ones:
+        return None, length
+    return value, length
+
+
+def _read_element_header(f: IO[bytes]) -> Tuple[int, Optional[int], int]:
+    """Return ``(id, size, header_length)`` of the element at the cursor."""
+    element_id, id_length = _read_vint(f, keep_marker=True)
+    size, size_length = _read_vint(f, keep_marker=False)
+    return element_id, size, id_length + size_length  # type: ignore[return-value]
+
+
+def _iter_elements(f: IO[bytes], start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+    """Yield ``(id, data_start, data_end)`` for sized elements in a range."""
+    pos = start
+    while pos < end:
+        f.seek(pos)
+        try:
+            element_id, size, header_length = _read_element_header(f)
+        except EOFError:
+            return
+        data_start = pos + header_length
+        data_end = end if size is None else min(data_start + size, end)
+        yield element_id, data_start, data_end
+        pos = data_end
+
+
+def _read_uint(f: IO[bytes], start: int, end: int) -> int:
+    f.seek(start)
+    return int.from_bytes(f.read(end - start), "big")
+
+
+def _read_mkv_video_track(f: IO[bytes], start: int, end: int) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    for element_id, data_start, data_end in _iter_elements(f, start, end):
+        if element_id != _TRACK_ENTRY:
+            continue
+        number = track_type = width = height = None
+        for child_id, child_start, child_end in _iter_elements(f, data_start, data_end):
+            if child_id == _TRACK_NUMBER:
+                number = _read_uint(f, child_start, child_end)
+            elif child_id == _TRACK_TYPE:
+                track_type = _read_uint(f, child_start, child_end)
+            elif child_id == _VIDEO:
+                dims = {}
+                for vid_id, vid_start, vid_end in _iter_elements(f, child_start, child_end):
+                    dims[vid_id] = _read_uint(f, vid_start, vid_end)
+                width = dims.get(_DISPLAY_WIDTH, dims.get(_PIXEL_WIDTH))
+                height = dims.get(_DISPLAY_HEIGHT, dims.get(_PIXEL_HEIGHT))
+        if track_type == 1:
+            return number, width, height
+    return None, None, None
+
+
+def _read_block_header(f: IO[bytes], start: int) -> Tuple[int, int, int]:
+    """Return ``(track_number, relative_timestamp, flags)`` of a block."""
+    f.seek(start)
+    track, _ = _read_vint(f, keep_marker=False)
+    timestamp, flags = struct.unpack(">hB", f.read(3))
+    return track or 0, timestamp, flags
+
+
+def _read_cluster(
+    f: IO[bytes],
+    start: int,
+    end: int,
+    sized: bool,
+    track: int,
+    out: List[Tuple[int, bool]],
+) -> int:
+    """Append ``(timestamp, is_keyframe)`` of the track's blocks in a cluster.
+
+    Returns the position where the cluster ended, which for clusters of
+    unknown size is the start of the next Segment-level element.
+    """
+    cluster_timestamp = 0
+    pos = start
+    while pos < end:
+        f.seek(pos)
+        try:
+            element_id, size, header_length = _read_element_header(f)
+        except EOFError:
+            return end
+        if not sized and element_id in _SEGMENT_CHILDREN:
+            return pos
+        data_start = pos + header_length
+        data_end = end if size is None else min(data_start + size, end)
+
+        if element_id == _CLUSTER_TIMESTAMP:
+            cluster_timestamp = _read_uint(f, data_start, data_end)
+        elif element_id == _SIMPLE_BLOCK:
+            number, rel, flags = _read_block_header(f, data_start)
+            if number == track:
+                out.append((cluster_timestamp + rel, bool(flags & 0x80)))
+        elif element_id == _BLOCK_GROUP:
+            block = None
+            referenced = False
+            for child_id, child_start, _ in _iter_elements(f, data_start, data_end):
+                if child_id == _BLOCK:
+                    block = child_start
+                elif child_id == _REFERENCE_BLOCK:
+                    referenced = True
+            if block is not None:
+                number, rel, _ = _read_block_header(f, block)
+                if number == track:
+                    out.append((cluster_timestamp + rel, not referenced))
+        pos = data_end
+    return end
+
+
+def _read_matroska(f: IO[bytes], size: int) -> FrameTable:
+    segment = None
+    for element_id, data_start, data_end in _iter_elements(f, 0, size):
+        if element_id == _SEGMENT:
+            segment = (data_start, data_end)
+            break
+    if segment is None:
+        raise ContainerError("Matroska file has no Segment")
+
+    timestamp_scale = 1_000_000  # nanoseconds per tick
+    track = width = height = None
+    blocks: List[Tuple[int, bool]] = []
+
+    pos, end = segment
+    while pos < end:
+        f.seek(pos)
+        try:
+            element_id, element_size, header_length = _read_element_header(f)
+        except EOFError:
+            break
+        data_start = pos + header_length
+        data_end = end if element_size is None else min(data_start + element_size, end)
+
+        if element_id == _INFO:
+            for child_id, child_start, child_end in _iter_elements(f, data_start, data_end):
+                if child_id == _TIMESTAMP_SCALE:
+                    timestamp_scale = _read_uint(f, child_start, child_end)
+        elif element_id == _TRACKS:
+            track, width, height = _read_mkv_video_track(f, data_start, data_end)
+        elif element_id == _CLUSTER and track is not None:
+            data_end = _read_cluster(
+                f, data_start, data_end, element_size is not None, track, blocks
+            )
+        pos = data_end
+
+    if track is None:
+        raise ContainerError("Matroska file has no video track")
+
+    ticks = np.array([t for t, _ in blocks], dtype=np.int64)
+    key = np.array([k for _, k in blocks], dtype=bool)
+    tick = timestamp_scale / 1e9
+    pts = ticks * tick
+    return FrameTable(np.sort(pts), np.sort(pts[key]), width, height, tick)
+
+
+# ---------------------------------------------------------------------------
+# Entry points
+# ---------------------------------------------------------------------------
+
+
+def read_frame_table(f: IO[bytes]) -> FrameTable:
+    """Parse the frame timestamp table of a seekable binary file.
+
+    Raises
+    ------
+    ContainerError
+        If the container is not MP4/MOV or Matroska/WebM, or is malformed.
+    """
+    f.seek(0, io.SEEK_END)
+    size = f.tell()
+    f.seek(0)
+    head = f.read(12)
+
+    try:
+        if head[:4] == _EBML_HEADER.to_bytes(4, "big"):
+            return _read_matroska(f, size)
+        if head[4:8] in (b"ftyp", b"moov", b"mdat", b"free", b"wide", b"skip"):
+            return _read_mp4(f, size)
+    except ContainerError:
+        raise
+    except (struct.error, EOFError, KeyError, IndexError, ValueError) as e:
+        raise ContainerError(f"Malformed container: {e}") from e
+    raise ContainerError("Unsupported container format")
+
+
+_tables: OrderedDict[Hashable, FrameTable] = OrderedDict()
+_tables_lock = threading.Lock()
+
+
+def _cached(key: Hashable, read) -> FrameTable:
+    with _tables_lock:
+        if key in _tables:
+            _tables.move_to_end(key)
+            return _tables[key]
+    table = read()
+    with _tables_lock:
+        _tables[key] = table
+        while len(_tables) > _MAX_CACHED_TABLES:
+            _tables.popitem(last=False)
+    return table
+
+
+def frame_table_for_source(source: Any) -> FrameTable | None:
+    """Return the (cached) frame table of a local video source.
+
+    Accepts the same sources as ``streamlit_video_coordinates``. Returns
+    ``None`` for URLs and for content whose container cannot be parsed, in
+    which case the frontend's frame estimate has to do.
+    """
+    source = as_source(source)
+    try:
+        kind = source_kind(source)
+        if kind == "path":
+            path = Path(source)
+
+            def read() -> FrameTable:
+                with open(path, "rb") as f:
+                    return read_frame_table(f)
+
+            return _cached(("path", *path_identity(path)), read)
+
+        if kind == "bytes":
+            return _cached(
+                ("bytes", content_fingerprint(source)),
+                lambda: read_frame_table(io.BytesIO(source)),
+            )
+
+        if kind == "file" and hasattr(source, "getbuffer"):
+            with source.getbuffer() as view:
+                key = ("bytes", content_fingerprint(view))
+            return _cached(key, lambda: _read_stream(source))
+
+        if kind == "file" and getattr(source, "seekable", lambda: False)():
+            # Plain streams have no cheap identity, but content_id() is
+            # memoised per source token: the table is parsed once per content
+            return _cached(("bytes", content_id(source)), lambda: _read_stream(source))
+    except (ContainerError, OSError, ValueError):
+        return None
+    return None
+
+
+def _read_stream(source: IO[bytes]) -> FrameTable:
+    position = source.tell()
+    try:
+        return read_frame_table(source)
+    finally:
+        source.seek(position)
@@ -0,0 +1,207 @@
+"""Per-frame object tracks interpolated between clicked frames.
+
+Annotators typically click an object every few frames (with ``tracks=True``
+each click carries the ``track_id`` they picked). :class:`Tracks` groups the
+clicks by track and fills in the frames between them::
+
+    tracks = Tracks(clicks, method="cubic")
+    frames, xy = tracks.positions(track_id=1, start=100, stop=200)
+    tracks.at(150)  # {track_id: array([x, y]), ...} for every track at frame 150
+
+Interpolation is lazy: building a :class:`Tracks` only sorts the clicks,
+each track's spline is fitted the first time it is queried, and a query
+evaluates just the frames it asks for, as one NumPy operation over the frame
+indices. Frame times for the returned indices come from the video's
+:class:`.FrameTable` (``frame_table.frame_time(frames)``).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Tuple, Union
+
+import numpy as np
+from typing_extensions import Literal
+
+from .table import ClickTable
+
+InterpolationMethod = Literal["linear", "cubic"]
+
+
+class _Track:
+    """The clicked frames of one track and its interpolating curve."""
+
+    def __init__(self, frames: np.ndarray, xy: np.ndarray, method: InterpolationMethod) -> None:
+        self.frames = frames
+        self.xy = xy
+        self.method = method
+        self._second_derivatives: np.ndarray | None = None
+
+    def evaluate(self, frames: np.ndarray) -> np.ndarray:
+        """Return the ``(n, 2)`` positions at ``frames``, all within the track's span."""
+        knots, values = self.frames, self.xy
+        if len(knots) == 1:
+            return np.repeat(values, len(frames), axis=0)
+        # Segment i runs from knots[i] to knots[i + 1]
+        i = np.clip(np.searchsorted(knots, frames, side="right") - 1, 0, len(knots) - 2)
+        h = (knots[i + 1] - knots[i]).astype(np.float64)
+        b = ((frames - knots[i]) / h)[:, None]
+        a = 1.0 - b
+        out = a * values[i] + b * values[i + 1]
+        if self.method == "cubic" and len(knots) > 2:
+            m = self.second_derivatives()
+            out += ((a**3 - a) * m[i] + (b**3 - b) * m[i + 1]) * (h * h / 6.0)[:, None]
+        return out
+
+    def second_derivatives(self) -> np.ndarray:
+        """Fit the natural cubic spline through the clicks (once per track)."""
+        if self._second_derivatives is None:
+            self._second_derivatives = _natural_spline(self.frames.astype(np.float64), self.xy)
+        return self._second_derivatives
+
+
+def _natural_spline(t: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Second derivatives at the knots of the natural cubic spline through ``(t, y)``.
+
+    Solves the tridiagonal system with the Thomas algorithm, for the x and y
+    columns of ``y`` at once.
+    """
+    h = np.diff(t)
+    slopes = np.diff(y, axis=0) / h[:, None]
+    # Row i of the interior system, knot i + 1:
+    #   h[i] m[i] + 2 (h[i] + h[i+1]) m[i+1] + h[i+1] m[i+2] = rhs[i]
+    # The sweeps are sequential; plain floats make them ~20x faster than
+    # indexing arrays element by element.
+    h_list = h.tolist()
+    diagonal = (2.0 * (h[:-1] + h[1:])).tolist()
+    rhs_x, rhs_y = (6.0 * np.diff(slopes, axis=0)).T.tolist()
+    for i in range(1, len(diagonal)):
+        w = h_list[i] / diagonal[i - 1]
+        diagonal[i] -= w * h_list[i]
+        rhs_x[i] -= w * rhs_x[i - 1]
+        rhs_y[i] -= w * rhs_y[i - 1]
+    mx, my = rhs_x[-1] / diagonal[-1], rhs_y[-1] / diagonal[-1]
+    rhs_x[-1], rhs_y[-1] = mx, my
+    for i in range(len(diagonal) - 2, -1, -1):
+        mx = (rhs_x[i] - h_list[i + 1] * mx) / diagonal[i]
+        my = (rhs_y[i] - h_list[i + 1] * my) / diagonal[i]
+        rhs_x[i], rhs_y[i] = mx, my
+    m = np.zeros((len(t), 2))
+    m[1:-1, 0] = rhs_x
+    m[1:-1, 1] = rhs_y
+    return m
+
+
+class Tracks:
+    """Clicks grouped by ``track_id``, interpolated to every frame they span.
+
+    Parameters
+    ----------
+    clicks : ClickTable | Iterable[Mapping[str, Any]]
+        Clicks with ``x``, ``y``, ``frame_index`` and ``track_id``. Clicks
+        without a frame index are ignored; when a track has several clicks
+        on one frame, the last one made is used.
+    method : "linear" | "cubic"
+        Straight lines between clicks, or a natural cubic spline through
+        them (tracks with only two clicks are linear either way).
+    untracked : int | None
+        Track id for clicks without one. By default they are ignored.
+    """
+
+    def __init__(
+        self,
+        clicks: Union[ClickTable, Iterable[Mapping[str, Any]]],
+        method: InterpolationMethod = "linear",
+        untracked: int | None = None,
+    ) -> None:
+        if method not in ("linear", "cubic"):
+            raise ValueError(f"Unknown interpolation method: {method!r}")
+        self.method = method
+        table = clicks if isinstance(clicks, ClickTable) else ClickTable(clicks)
+        track = table["track_id"].copy()
+        if untracked is not None:
+            track[track == -1] = untracked
+        frame = table["frame_index"]
+        keep = np.flatnonzero((track != -1) & (frame >= 0))
+        # By track, then frame, then the order the clicks were made in
+        order = keep[np.lexsort((keep, frame[keep], track[keep]))]
+        track, frame = track[order], frame[order]
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = (track[1:] != track[:-1]) | (frame[1:] != frame[:-1])
+        order, track, frame = order[last], track[last], frame[last]
+
+        xy = np.empty((len(order), 2))
+        xy[:, 0] = table["x"][order]
+        xy[:, 1] = table["y"][order]
+        first = np.ones(len(track), dtype=bool)
+        first[1:] = track[1:] != track[:-1]
+        starts = np.flatnonzero(first)
+        stops = np.r_[starts[1:], len(track)] if len(track) else starts
+        self._tracks: Dict[int, _Track] = {
+            int(track[start]): _Track(frame[start:stop], xy[start:stop], method)
+            for start, stop in zip(starts.tolist(), stops.tolist())
+        }
+        # Track spans, for finding the tracks present on a frame
+        self._ids = np.array(list(self._tracks), dtype=np.int64)
+        self._first = frame[starts]
+        self._last = frame[stops - 1]
+
+    @property
+    def track_ids(self) -> List[int]:
+        """The ids of the tracks, in ascending order."""
+        return list(self._tracks)
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def __contains__(self, track_id: object) -> bool:
+        return track_id in self._tracks
+
+    def _track(self, track_id: int) -> _Track:
+        try:
+            return self._tracks[track_id]
+        except KeyError:
+            raise KeyError(f"No clicks on track {track_id!r}") from None
+
+    def keyframes(self, track_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the clicked frame indices of a track and the ``(n, 2)`` clicked positions."""
+        track = self._track(track_id)
+        return track.frames.copy(), track.xy.copy()
+
+    def span(self, track_id: int) -> Tuple[int, int]:
+        """Return the first clicked frame of a track and one past its last."""
+        frames = self._track(track_id).frames
+        return int(frames[0]), int(frames[-1]) + 1
+
+    def positions(
+        self, track_id: int, start: int | None = None, stop: int | None = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the positions of a track on frames ``start`` to ``stop`` (exclusive).
+
+        Only frames within the track's span are returned: an object is not
+        extrapolated before its first click or after its last.
+
+        Returns
+        -------
+        frames : np.ndarray
+            The frame indices, ascending.
+        xy : np.ndarray
+            ``(n, 2)`` float positions, in the clicks' pixels.
+        """
+        track = self._track(track_id)
+        first, end = self.span(track_id)
+        lo = first if start is None else max(first, start)
+        hi = end if stop is None else min(end, stop)
+        frames = np.arange(lo, max(lo, hi), dtype=np.int64)
+        return frames, track.evaluate(frames)
+
+    def at(self, frame_index: int) -> Dict[int, np.ndarray]:
+        """Return the ``[x, y]`` position of every track spanning a frame."""
+        present = (self._first <= frame_index) & (frame_index <= self._last)
+        frame = np.array([frame_index], dtype=np.int64)
+        return {
+            track_id: self._tracks[track_id].evaluate(frame)[0]
+            for track_id in self._ids[present].tolist()
+        }
+
+    def __repr__(self) -> str:
+        return f"Tracks({len(self)} tracks, method={self.method!r})"
@@ -0,0 +1,450 @@
+"""Vectorised coordinate transformations for batches of clicks.
+
+Clicks report ``x``/``y`` in the video's intrinsic pixels. Mapping them to
+normalised coordinates, crops, resized or rotated frames or an undistorted
+camera model is one NumPy operation per batch here, not a Python loop over
+dicts::
+
+    from streamlit_video_coordinates import transforms
+
+    to_model = transforms.crop(100, 50).then(transforms.resize((640, 480), (224, 224)))
+    xy = transforms.apply(clicks, to_model)  # (n, 2) float array
+
+Transforms compose with :meth:`Transform.then` (or ``@``, right to left);
+chains of affine maps and homographies collapse into a single matrix, so a
+composed transform costs one pass over the points however long it is.
+
+Clicks from videos of different sizes can share a batch: give :func:`apply`
+a factory taking ``(width, height)`` and it is called once per resolution
+found in the clicks' ``width``/``height``. The factories in this module
+(:func:`normalize`, :func:`denormalize`, :func:`rotate90`) are cached per
+resolution; wrap your own in ``functools.lru_cache`` to do the same.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Mapping, Sequence, Tuple, Union
+
+import numpy as np
+
+from .table import ClickTable
+
+Size = Tuple[int, int]
+
+
+def _frozen(array: Any) -> np.ndarray:
+    array = np.array(array, dtype=np.float64)
+    array.flags.writeable = False
+    return array
+
+
+def _as_points(points: Any) -> np.ndarray:
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError(f"Expected an (n, 2) array of points, got shape {points.shape}")
+    return points
+
+
+class Transform(ABC):
+    """A map of 2D points, applied to ``(n, 2)`` arrays.
+
+    ``a.then(b)`` applies ``a`` and then ``b``; ``b @ a`` is the same
+    composition written as in mathematics.
+    """
+
+    def __call__(self, points: Any) -> np.ndarray:
+        """Return the transformed ``(n, 2)`` points as a new float array."""
+        return self._apply(_as_points(points))
+
+    @abstractmethod
+    def _apply(self, points: np.ndarray) -> np.ndarray:
+        """Return the transformed float ``(n, 2)`` array."""
+
+    def inverse(self) -> Transform:
+        """Return the transform undoing this one."""
+        raise NotImplementedError(f"{type(self).__name__} has no inverse")
+
+    def then(self, other: Transform) -> Transform:
+        """Return the transform applying ``self``, then ``other``."""
+        return Chain((self, other))
+
+    def __matmul__(self, other: Transform) -> Transform:
+        if not isinstance(other, Transform):
+            return NotImplemented
+        return other.then(self)
+
+
+class Homography(Transform):
+    """A projective map given by a 3x3 matrix acting on ``(x, y, 1)``."""
+
+    def __init__(self, matrix: Any) -> None:
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if matrix.shape != (3, 3):
+            raise ValueError(f"Expected a 3x3 matrix, got shape {matrix.shape}")
+        self.matrix = _frozen(matrix)
+
+    @classmethod
+    def from_points(cls, source: Any, target: Any) -> Homography:
+        """Fit the homography mapping ``source`` points onto ``target`` points.
+
+        Needs at least 4 point pairs, no three of them collinear; with more,
+        the least-squares fit (direct linear transform) is returned.
+        """
+        source, target = _as_points(source), _as_points(target)
+        if len(source) != len(target) or len(source) < 4:
+            raise ValueError("Need at least 4 pairs of corresponding points")
+        x, y = source[:, 0], source[:, 1]
+        u, v = target[:, 0], target[:, 1]
+        zeros, ones = np.zeros_like(x), np.ones_like(x)
+        rows = np.concatenate(
+            [
+                np.stack([x, y, ones, zeros, zeros, zeros, -u * x, -u * y, -u], axis=1),
+                np.stack([zeros, zeros, zeros, x, y, ones, -v * x, -v * y, -v], axis=1),
+            ]
+        )
+        # The solution is the right singular vector of the smallest singular value
+        matrix = np.linalg.svd(rows)[2][-1].reshape(3, 3)
+        return cls(matrix / matrix[2, 2])
+
+    def _apply(self, points: np.ndarray) -> np.ndarray:
+        m = self.matrix
+        out = points @ m[:2, :2].T
+        out += m[:2, 2]
+        w = points @ m[2, :2]
+        w += m[2, 2]
+        out /= w[:, None]
+        return out
+
+    def inverse(self) -> Homography:
+        return Homography(np.linalg.inv(self.matrix))
+
+    def then(self, other: Transform) -> Transform:
+        if isinstance(other, Homography):
+            # Affine is a Homography too: products of the two stay one matrix
+            matrix = other.matrix @ self.matrix
+            if isinstance(self, Affine) and isinstance(other, Affine):
+                return Affine(matrix)
+            return Homography(matrix)
+        return super().then(other)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.matrix.tolist()})"
+
+
+class Affine(Homography):
+    """An affine map: a 3x3 matrix with last row ``(0, 0, 1)``, or its 2x3 top."""
+
+    def __init__(self, matrix: Any) -> None:
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if matrix.shape == (2, 3):
+            matrix = np.vstack([matrix, [0.0, 0.0, 1.0]])
+        if matrix.shape != (3, 3) or not np.allclose(matrix[2], [0.0, 0.0, 1.0]):
+            raise ValueError("Expected a 2x3 matrix or a 3x3 matrix with last row (0, 0, 1)")
+        super().__init__(matrix)
+
+    def _apply(self, points: np.ndarray) -> np.ndarray:
+        m = self.matrix
+        out = points @ m[:2, :2].T
+        out += m[:2, 2]
+        return out
+
+    def inverse(self) -> Affine:
+        return Affine(np.linalg.inv(self.matrix))
+
+
+class Chain(Transform):
+    """Transforms applied one after the other."""
+
+    def __init__(self, transforms: Iterable[Transform]) -> None:
+        steps: List[Transform] = []
+        for transform in transforms:
+            parts = transform.transforms if isinstance(transform, Chain) else (transform,)
+            for part in parts:
+                # Neighbouring matrices are multiplied into one
+                if steps and isinstance(steps[-1], Homography) and isinstance(part, Homography):
+                    steps[-1] = steps[-1].then(part)
+                else:
+                    steps.append(part)
+        self.transforms: Tuple[Transform, ...] = tuple(steps)
+
+    def _apply(self, points: np.ndarray) -> np.ndarray:
+        for transform in self.transforms:
+            points = transform._apply(points)
+        return points
+
+    def inverse(self) -> Chain:
+        return Chain(t.inverse() for t in reversed(self.transforms))
+
+    def then(self, other: Transform) -> Transform:
+        return Chain((self, other))
+
+    def __repr__(self) -> str:
+        return f"Chain({list(self.transforms)!r})"
+
+
+# ---------------------------------------------------------------------------
+# Lens distortion
+# ---------------------------------------------------------------------------
+
+
+def _distortion_coefficients(coefficients: Sequence[float]) -> np.ndarray:
+    coefficients = np.zeros(5) if coefficients is None else np.ravel(coefficients).astype(np.float64)
+    if len(coefficients) not in (4, 5):
+        raise ValueError("Expected distortion coefficients (k1, k2, p1, p2[, k3])")
+    return _frozen(np.pad(coefficients, (0, 5 - len(coefficients))))
+
+
+def _distort_normalized(x: np.ndarray, y: np.ndarray, coefficients: np.ndarray):
+    k1, k2, p1, p2, k3 = coefficients
+    r2 = x * x + y * y
+    radial = 1 + r2 * (k1 + r2 * (k2 + r2 * k3))
+    xy = x * y
+    dx = 2 * p1 * xy + p2 * (r2 + 2 * x * x)
+    dy = p1 * (r2 + 2 * y * y) + 2 * p2 * xy
+    return radial, dx, dy
+
+
+class _LensModel(Transform):
+    def __init__(
+        self,
+        camera_matrix: Any,
+        distortion: Sequence[float],
+        new_camera_matrix: Any = None,
+        iterations: int = 5,
+    ) -> None:
+        self.camera_matrix = _frozen(camera_matrix)
+        self.distortion = _distortion_coefficients(distortion)
+        self.new_camera_matrix = _frozen(
+            camera_matrix if new_camera_matrix is None else new_camera_matrix
+        )
+        self.iterations = iterations
+
+    @staticmethod
+    def _to_normalized(points: np.ndarray, k: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        y = (points[:, 1] - k[1, 2]) / k[1, 1]
+        x = (points[:, 0] - k[0, 2] - k[0, 1] * y) / k[0, 0]
+        return x, y
+
+    @staticmethod
+    def _to_pixels(x: np.ndarray, y: np.ndarray, k: np.ndarray) -> np.ndarray:
+        out = np.empty((len(x), 2))
+        out[:, 0] = k[0, 0] * x + k[0, 1] * y + k[0, 2]
+        out[:, 1] = k[1, 1] * y + k[1, 2]
+        return out
+
+
+class Undistort(_LensModel):
+    """Map distorted image pixels to an ideal pinhole camera's pixels.
+
+    Uses OpenCV's camera model and conventions (the result matches
+    ``cv2.undistortPoints(points, K, dist, P=new_camera_matrix)``), without
+    requiring OpenCV.
+
+    Parameters
+    ----------
+    camera_matrix : array-like
+        3x3 intrinsic matrix ``K`` of the calibrated camera.
+    distortion : sequence of float
+        Coefficients ``(k1, k2, p1, p2[, k3])``.
+    new_camera_matrix : array-like | None
+        Intrinsics of the undistorted image; defaults to ``camera_matrix``.
+    iterations : int
+        Fixed-point iterations inverting the distortion model.
+    """
+
+    def _apply(self, points: np.ndarray) -> np.ndarray:
+        xd, yd = self._to_normalized(points, self.camera_matrix)
+        x, y = xd.copy(), yd.copy()
+        for _ in range(self.iterations):
+            radial, dx, dy = _distort_normalized(x, y, self.distortion)
+            x = (xd - dx) / radial
+            y = (yd - dy) / radial
+        return self._to_pixels(x, y, self.new_camera_matrix)
+
+    def inverse(self) -> Distort:
+        return Distort(self.camera_matrix, self.distortion, self.new_camera_matrix)
+
+
+class Distort(_LensModel):
+    """Map ideal pinhole pixels to distorted image pixels (the inverse of :class:`Undistort`)."""
+
+    def _apply(self, points: np.ndarray) -> np.ndarray:
+        x, y = self._to_normalized(points, self.new_camera_matrix)
+        radial, dx, dy = _distort_normalized(x, y, self.distortion)
+        return self._to_pixels(x * radial + dx, y * radial + dy, self.camera_matrix)
+
+    def inverse(self) -> Undistort:
+        return Undistort(self.camera_matrix, self.distortion, self.new_camera_matrix)
+
+
+# ---------------------------------------------------------------------------
+# Constructors
+# ---------------------------------------------------------------------------
+
+
+def identity() -> Affine:
+    return Affine(np.eye(3))
+
+
+def translate(tx: float, ty: float) -> Affine:
+    return Affine([[1.0, 0.0, tx], [0.0, 1.0, ty]])
+
+
+def scale(sx: float, sy: float | None = None) -> Affine:
+    return Affine([[sx, 0.0, 0.0], [0.0, sx if sy is None else sy, 0.0]])
+
+
+def rotate(degrees: float, center: Tuple[float, float] = (0.0, 0.0)) -> Affine:
+    """Rotate counterclockwise as seen on screen (where y points down) about ``center``."""
+    theta = np.deg2rad(degrees)
+    c, s = np.cos(theta), np.sin(theta)
+    cx, cy = center
+    rotation = Affine([[c, s, 0.0], [-s, c, 0.0]])
+    return translate(-cx, -cy).then(rotation).then(translate(cx, cy))
+
+
+def crop(left: float, top: float) -> Affine:
+    """Map frame pixels to pixels of a crop whose top-left corner is ``(left, top)``."""
+    return translate(-left, -top)
+
+
+def resize(from_size: Size, to_size: Size) -> Affine:
+    """Map pixels of a ``from_size`` frame to the same frame resized to ``to_size``."""
+    return scale(to_size[0] / from_size[0], to_size[1] / from_size[1])
+
+
+@lru_cache(maxsize=128)
+def normalize(width: int, height: int) -> Affine:
+    """Map pixels of a ``width`` x ``height`` frame to ``[0, 1]`` coordinates."""
+    return scale(1.0 / width, 1.0 / height)
+
+
+@lru_cache(maxsize=128)
+def denormalize(width: int, height: int) -> Affine:
+    """Map ``[0, 1]`` coordinates to pixels of a ``width`` x ``height`` frame."""
+    return scale(float(width), float(height))
+
+
+@lru_cache(maxsize=128)
+def rotate90(width: int, height: int, k: int = 1) -> Affine:
+    """Map pixel indices of a frame to those of ``np.rot90(frame, k)``.
+
+    ``width`` and ``height`` are the size of the frame before rotating.
+    """
+    matrix = np.eye(3)
+    w, h = width, height
+    for _ in range(k % 4):
+        # One counterclockwise quarter turn: (x, y) -> (y, w - 1 - x)
+        step = np.array([[0.0, 1.0, 0.0], [-1.0, 0.0, w - 1.0], [0.0, 0.0, 1.0]])
+        matrix = step @ matrix
+        w, h = h, w
+    return Affine(matrix)
+
+
+# ---------------------------------------------------------------------------
+# Click batches
+# ---------------------------------------------------------------------------
+
+Clicks = Union[ClickTable, Iterable[Mapping[str, Any]], np.ndarray]
+TransformLike = Union[Transform, Callable[[int, int], Transform]]
+
+
+def _column(clicks: Any, name: str) -> np.ndarray:
+    if isinstance(clicks, ClickTable):
+        return clicks[name]
+    return np.fromiter(
+        (-1 if (v := click.get(name)) is None else v for click in clicks),
+        dtype=np.float64,
+        count=len(clicks),
+    )
+
+
+def points(clicks: Clicks) -> np.ndarray:
+    """Return the ``x``/``y`` of clicks as an ``(n, 2)`` float array.
+
+    Accepts a :class:`.ClickTable`, click dicts or an ``(n, 2)`` array.
+    """
+    if isinstance(clicks, np.ndarray):
+        return _as_points(clicks)
+    if not isinstance(clicks, ClickTable):
+        clicks = list(clicks)
+    out = np.empty((len(clicks), 2))
+    out[:, 0] = _column(clicks, "x")
+    out[:, 1] = _column(clicks, "y")
+    return out
+
+
+def apply(clicks: Clicks, transform: TransformLike) -> np.ndarray:
+    """Transform the positions of a batch of clicks.
+
+    ``transform`` is a :class:`Transform`, or a factory called with each
+    distinct ``(width, height)`` of the clicks whose transform is applied to
+    the clicks of that size. Returns an ``(n, 2)`` float array in the order
+    of ``clicks``.
+    """
+    if isinstance(transform, Transform):
+        return transform._apply(points(clicks))
+    if isinstance(clicks, np.ndarray):
+        raise ValueError("A per-resolution transform needs clicks with width and height")
+    if not isinstance(clicks, ClickTable):
+        clicks = list(clicks)
+    xy = points(clicks)
+    widths = _column(clicks, "width").astype(np.int64)
+    heights = _column(clicks, "height").astype(np.int64)
+    if not len(xy):
+        return xy
+    # Missing sizes read as -1; a factory must never see them
+    if (widths <= 0).any() or (heights <= 0).any():
+        raise ValueError("A per-resolution transform needs clicks with a positive width and height")
+    # Usually every click is on the same video: skip grouping
+    if (widths == widths[0]).all() and (heights == heights[0]).all():
+        return transform(int(widths[0]), int(heights[0]))._apply(xy)
+    sizes, groups = _group_sizes(widths, heights)
+    per_size = [transform(width, height) for width, height in sizes]
+    if all(isinstance(t, Homography) for t in per_size):
+        return _apply_matrices(xy, np.stack([t.matrix for t in per_size]), groups)
+    out = np.empty_like(xy)
+    for group, size_transform in enumerate(per_size):
+        mask = groups == group
+        out[mask] = size_transform._apply(xy[mask])
+    return out
+
+
+# Distinct sizes found by scanning before falling back to sorting
+_GROUP_SCANS = 8
+
+
+def _group_sizes(widths: np.ndarray, heights: np.ndarray) -> Tuple[List[Size], np.ndarray]:
+    """Return the distinct ``(width, height)`` pairs and each click's index into them."""
+    keys = (widths << 32) | (heights & 0xFFFFFFFF)
+    groups = np.full(len(keys), -1, dtype=np.intp)
+    sizes: List[Size] = []
+    # A batch rarely mixes more than a few sizes, and scanning once per size
+    # is much faster than sorting a million keys
+    for _ in range(_GROUP_SCANS):
+        remaining = groups < 0
+        first = int(remaining.argmax())
+        if not remaining[first]:
+            return sizes, groups
+        groups[keys == keys[first]] = len(sizes)
+        sizes.append((int(widths[first]), int(heights[first])))
+    rest = groups < 0
+    unique, inverse = np.unique(keys[rest], return_inverse=True)
+    groups[rest] = inverse.reshape(-1) + len(sizes)
+    sizes += [(key >> 32, key & 0xFFFFFFFF) for key in unique.tolist()]
+    return sizes, groups
+
+
+def _apply_matrices(xy: np.ndarray, matrices: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """Apply ``matrices[groups[i]]`` to point ``i``, for all points at once."""
+    x, y = xy[:, 0], xy[:, 1]
+    out = np.empty_like(xy)
+    for row in range(2):
+        a, b, c = (matrices[:, row, col][groups] for col in range(3))
+        out[:, row] = a * x + b * y + c
+    if not np.allclose(matrices[:, 2], [0.0, 0.0, 1.0]):
+        a, b, c = (matrices[:, 2, col][groups] for col in range(3))
+        out /= (a * x + b * y + c)[:, None]
+    return out
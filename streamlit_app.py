@@ -1,5 +1,5 @@
 import streamlit as st
-from src.streamlit_video_coordinates import streamlit_video_coordinates
+from src.streamlit_video_coordinates import download_button, streamlit_video_coordinates
 
 st.set_page_config(
     page_title="Streamlit Video Coordinates Demo",
@@ -66,12 +66,11 @@ with tab1:
                         )
                         st.write(f"**Timestamp:** {click.get('unix_time', 'N/A')}")
 
-                # Export data
-                if st.button("📋 Copy Coordinates as JSON", key="copy_upload"):
-                    import json
-
-                    json_data = json.dumps(clicks, indent=2)
-                    st.text_area("JSON Data:", json_data, height=200)
+                # Export data (serialised in chunks, only when a download is requested)
+                export_format = st.selectbox(
+                    "Export format", ["csv", "jsonl", "coco", "parquet"], key="format_upload"
+                )
+                download_button(clicks, export_format, key="download_upload")
             else:
                 st.info("Pause the video and click on it to capture coordinates")
 
@@ -123,12 +122,11 @@ with tab2:
                             )
                             st.write(f"**Timestamp:** {click.get('unix_time', 'N/A')}")
 
-                    # Export data
-                    if st.button("📋 Copy Coordinates as JSON", key="copy_url"):
-                        import json
-
-                        json_data = json.dumps(clicks, indent=2)
-                        st.text_area("JSON Data:", json_data, height=200)
+                    # Export data (serialised in chunks, only when a download is requested)
+                    export_format = st.selectbox(
+                        "Export format", ["csv", "jsonl", "coco", "parquet"], key="format_url"
+                    )
+                    download_button(clicks, export_format, key="download_url")
                 else:
                     st.info("Pause the video and click on it to capture coordinates")
 
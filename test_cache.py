@@ -0,0 +1,65 @@
+"""Tests for the process-wide source cache"""
+
+from streamlit_video_coordinates import sources
+from streamlit_video_coordinates.cache import (
+    SourceCache,
+    content_fingerprint,
+    source_cache,
+)
+
+
+def test_lru_eviction_respects_budget():
+    cache = SourceCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"5678")
+    assert cache.get("a") == b"1234"  # "a" is now most recently used
+
+    cache.put("c", b"9012")
+    assert "b" not in cache
+    assert "a" in cache
+    assert "c" in cache
+
+    stats = cache.stats
+    assert (stats.hits, stats.evictions, stats.current_bytes) == (1, 1, 8)
+
+
+def test_oversized_values_are_not_stored():
+    cache = SourceCache(max_bytes=3)
+    assert cache.get_or_create("big", lambda: b"too large") == b"too large"
+    assert len(cache) == 0
+
+
+def test_fingerprint_distinguishes_large_content():
+    big = bytes(3 * 1024 * 1024)
+    assert content_fingerprint(big) == content_fingerprint(bytearray(big))
+    assert content_fingerprint(big) != content_fingerprint(big + b"\x00")
+
+
+def test_path_sources_share_one_resolution(tmp_path):
+    video = tmp_path / "clip.webm"
+    video.write_bytes(b"not really a video")
+    source_cache.clear()
+
+    first = sources.resolve_source(video, serving="data")
+    second = sources.resolve_source(str(video), serving="data")
+
+    assert first is second
+    assert first.startswith("data:video/webm;base64,")
+    assert source_cache.stats.hits == 1
+
+
+def test_files_over_budget_are_not_cached_and_warn_once(tmp_path, caplog):
+    video = tmp_path / "big.webm"
+    video.write_bytes(b"\x00" * 1000)
+    source_cache.clear()
+    budget = source_cache.max_bytes
+    source_cache.max_bytes = 100
+    try:
+        with caplog.at_level("WARNING", logger="streamlit_video_coordinates"):
+            sources.resolve_source(video, serving="data")
+            sources.resolve_source(video, serving="data")
+    finally:
+        source_cache.max_bytes = budget
+
+    assert len(source_cache) == 0
+    assert len([r for r in caplog.records if "source_cache.max_bytes" in r.message]) == 1
@@ -0,0 +1,91 @@
+"""Tests for click history reassembly"""
+
+import gc
+
+from streamlit_video_coordinates.clicks import ClickHistory
+
+
+def _click(seq, x=0):
+    return {"seq": seq, "x": x, "y": 0, "frame_time": 0.0}
+
+
+def test_batches_are_appended_once():
+    history = ClickHistory()
+
+    assert history.apply({"clicks": [_click(1, x=10)]}) == [
+        {"x": 10, "y": 0, "frame_time": 0.0}
+    ]
+    # Unacknowledged clicks are resent alongside the new one
+    history.apply({"clicks": [_click(1, x=10), _click(2, x=20)]})
+    # Streamlit reports the last value again on unrelated reruns
+    history.apply({"clicks": [_click(1, x=10), _click(2, x=20)]})
+
+    assert [c["x"] for c in history.clicks] == [10, 20]
+    assert history.last_seq == 2
+
+
+def test_rebinding_keeps_sequence_numbers():
+    history = ClickHistory()
+    history.bind("video")
+    history.apply({"clicks": [_click(1), _click(2)]})
+    history.bind("video")
+    assert len(history) == 2
+
+    history.bind("other-video")
+
+    assert history.apply({"clicks": [_click(2)]}) == []
+    assert len(history.apply({"clicks": [_click(3)]})) == 1
+    assert len(history) == 1
+
+
+def test_legacy_full_list_replaces_history():
+    history = ClickHistory()
+    history.apply([{"x": 1}, {"x": 2}])
+    assert history.clicks == [{"x": 1}, {"x": 2}]
+    assert history.apply(None) == []
+
+
+def test_bounded_history_spills_oldest_clicks(tmp_path):
+    history = ClickHistory(max_clicks=3, spill_directory=tmp_path)
+    history.apply({"clicks": [_click(i, x=i) for i in range(1, 6)]})
+    history.commit()
+    history.apply({"clicks": [_click(6, x=6)]})
+    # Nothing is spilled before the new clicks are committed
+    assert len(history.clicks) == 4
+    history.commit()
+
+    assert [c["x"] for c in history.clicks] == [4, 5, 6]
+    assert history.table()["x"].tolist() == [4, 5, 6]
+    assert [c["x"] for c in history.spilled()] == [1, 2, 3]
+    assert [c["x"] for c in history] == [1, 2, 3, 4, 5, 6]
+    assert len(history) == 6
+
+    history.max_clicks = 1
+    assert [c["x"] for c in history.clicks] == [6]
+    assert len(history) == 6
+
+    history.bind("video")
+    history.bind("other-video")
+    assert len(history) == 0
+    assert list(history) == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_new_clicks_are_final_when_committed(tmp_path):
+    history = ClickHistory(max_clicks=1, spill_directory=tmp_path)
+    new = history.apply({"clicks": [_click(1), _click(2)]})
+    for click in new:
+        click["frame_index"] = 7
+    history.commit()
+    assert [c["frame_index"] for c in history] == [7, 7]
+
+
+def test_spill_file_is_removed_with_the_history(tmp_path):
+    history = ClickHistory(max_clicks=1, spill_directory=tmp_path)
+    history.apply({"clicks": [_click(1), _click(2)]})
+    history.commit()
+    assert len(list(tmp_path.iterdir())) == 1
+
+    del history
+    gc.collect()
+    assert list(tmp_path.iterdir()) == []
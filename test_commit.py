@@ -0,0 +1,41 @@
+"""Tests for commit policies"""
+
+import json
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from helpers import make_mp4
+from streamlit_video_coordinates import CommitPolicy
+
+
+def test_policy_without_triggers_is_immediate():
+    assert CommitPolicy().to_args() is None
+    assert CommitPolicy(max_batch=1).immediate
+
+
+def test_policy_args():
+    policy = CommitPolicy(debounce_ms=500, key="Enter", max_batch=10)
+    assert policy.to_args() == {"debounce_ms": 500, "on_play": False, "key": "Enter", "max_batch": 10}
+
+
+@pytest.mark.parametrize(
+    ("settings", "message"),
+    [({"debounce_ms": -1}, "debounce_ms must not be negative"), ({"max_batch": 0}, "max_batch must be at least 1")],
+)
+def test_invalid_policies(settings, message):
+    with pytest.raises(ValueError, match=message):
+        CommitPolicy(**settings)
+
+
+def test_policy_is_sent_to_the_frontend(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(make_mp4([(50, 24)]))
+    at = AppTest.from_string(
+        "from streamlit_video_coordinates import CommitPolicy, streamlit_video_coordinates\n"
+        f"streamlit_video_coordinates({str(video)!r}, key='video', commit=CommitPolicy(on_play=True))\n"
+    )
+    at.run()
+    assert not at.exception
+    (component,) = at.get("component_instance")
+    assert json.loads(component.proto.json_args)["commit"]["on_play"] is True
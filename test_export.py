@@ -0,0 +1,96 @@
+"""Tests for the streaming exporters"""
+
+import csv
+import io
+import json
+
+import pytest
+import streamlit as st
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+from streamlit.testing.v1 import AppTest
+
+from streamlit_video_coordinates import export
+from streamlit_video_coordinates.export import (
+    iter_coco,
+    iter_csv,
+    iter_jsonl,
+    iter_parquet,
+    write_export,
+)
+from streamlit_video_coordinates.table import ClickTable
+
+CLICKS = [
+    {"x": i, "y": 2 * i, "frame_time": i / 25, "frame_index": i, "width": 640, "height": 360, "unix_time": 1700000000000 + i}
+    for i in range(25)
+]
+
+
+def test_exporters_yield_bounded_chunks():
+    chunks = list(iter_jsonl(CLICKS, chunk_size=10))
+    assert [chunk.count("\n") for chunk in chunks] == [10, 10, 5]
+    assert [json.loads(line) for line in "".join(chunks).splitlines()] == CLICKS
+
+
+def test_csv_round_trip():
+    text = "".join(iter_csv(iter(CLICKS), chunk_size=7))
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert len(rows) == 25
+    assert rows[3]["x"] == "3"
+    assert rows[3]["media_time"] == ""
+
+
+def test_coco_document():
+    clicks = [*CLICKS, dict(CLICKS[0], x=99)]
+    doc = json.loads("".join(iter_coco(clicks, video_name="clip", chunk_size=4)))
+
+    assert len(doc["annotations"]) == 26
+    assert len(doc["images"]) == 25
+    assert doc["images"][1]["file_name"] == "clip_000001"
+    assert doc["annotations"][-1]["keypoints"] == [99, 0, 2]
+    assert doc["annotations"][-1]["image_id"] == 0
+    assert doc["categories"][0]["keypoints"] == ["point"]
+
+
+@pytest.mark.parametrize("source", [CLICKS, ClickTable(CLICKS)], ids=["list", "table"])
+def test_parquet_row_groups(source):
+    pq = pytest.importorskip("pyarrow.parquet")
+    data = b"".join(iter_parquet(source, chunk_size=10))
+    parquet = pq.ParquetFile(io.BytesIO(data))
+
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column("x").to_pylist() == list(range(25))
+    assert table.column("media_time").null_count == 25
+
+
+def test_write_export_to_path(tmp_path):
+    path = tmp_path / "clicks.jsonl"
+    write_export(CLICKS, path, "jsonl")
+    assert len(path.read_text().splitlines()) == 25
+    with pytest.raises(ValueError, match="Unknown export format"):
+        write_export(CLICKS, io.BytesIO(), "xml")
+
+
+@pytest.mark.parametrize("deferred", [True, False])
+def test_download_button(monkeypatch, deferred):
+    downloads = []
+    original = st.download_button
+
+    def download_button(label, data, **kwargs):
+        downloads.append(data)
+        return original(label, data, **kwargs)
+
+    monkeypatch.setattr(st, "download_button", download_button)
+    monkeypatch.setattr(export, "_deferred_downloads_supported", lambda: deferred)
+    at = AppTest.from_string(
+        "from streamlit_video_coordinates import download_button\n"
+        f"download_button({CLICKS[:3]!r}, 'coco', options={{'video_name': 'clip'}})\n"
+    )
+    at.run()
+    assert not at.exception
+
+    (data,) = downloads
+    assert callable(data) == deferred
+    data, _ = convert_data_to_bytes_and_infer_mime(data() if deferred else data, ValueError())
+    doc = json.loads(data)
+    assert [image["file_name"] for image in doc["images"]] == ["clip_000000", "clip_000001", "clip_000002"]
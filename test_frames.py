@@ -0,0 +1,168 @@
+"""Tests for grabbing clicked frames"""
+
+import shutil
+import stat
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from helpers import make_mp4
+from streamlit_video_coordinates.frames import FFmpegDecoder, FrameGrabber
+
+WIDTH, HEIGHT = 64, 48
+FRAME = 24 / 600
+
+
+@pytest.fixture
+def video(tmp_path):
+    # 50 frames at 25 fps, keyframes at 0 s and 1 s
+    path = tmp_path / "video.mp4"
+    path.write_bytes(make_mp4([(50, 24)], stss=[1, 26], size=(WIDTH, HEIGHT)))
+    return path
+
+
+class FakeDecoder:
+    """Returns frames whose pixels hold their frame number"""
+
+    def __init__(self):
+        self.calls = []
+
+    def decode(self, _path, start, times, size):
+        self.calls.append((start, list(times)))
+        width, height = size
+        return [np.full((height, width, 3), round(t / FRAME), dtype=np.uint8) for t in times]
+
+
+def test_frames_are_grouped_by_keyframe(video):
+    decoder = FakeDecoder()
+    grabber = FrameGrabber(decoder)
+    frames = grabber.frames(video, [30, 2, 40, 5])
+
+    assert [f[0, 0, 0] for f in frames] == [30, 2, 40, 5]
+    assert frames[0].shape == (HEIGHT, WIDTH, 3)
+    assert [start for start, _ in decoder.calls] == pytest.approx([0.0, 1.0])
+    assert decoder.calls[0][1] == pytest.approx([2 * FRAME, 5 * FRAME])
+    assert decoder.calls[1][1] == pytest.approx([30 * FRAME, 40 * FRAME])
+
+
+def test_decoded_frames_are_cached(video):
+    decoder = FakeDecoder()
+    grabber = FrameGrabber(decoder)
+    grabber.frames(video, [3, 4])
+    grabber.frames(video.read_bytes(), [4, 3, 4, 6])
+
+    # The bytes are the same video: only frame 6 is new
+    assert decoder.calls[1][1] == pytest.approx([6 * FRAME])
+    frame = grabber.frames(video, [3])[0]
+    with pytest.raises(ValueError, match='read-only'):
+        frame[0, 0, 0] = 1
+
+
+def test_frame_cache_is_bounded(video):
+    decoder = FakeDecoder()
+    grabber = FrameGrabber(decoder, max_bytes=2 * WIDTH * HEIGHT * 3)
+    grabber.frames(video, [1, 2, 3])
+    assert len(grabber.cache) == 2
+
+    grabber.frames(video, [1])
+    assert len(decoder.calls) == 2
+
+
+def test_grab_uses_click_frames(video):
+    decoder = FakeDecoder()
+    grabber = FrameGrabber(decoder)
+    clicks = [
+        {"x": 1, "y": 1, "frame_time": 0.3, "frame_index": 7},
+        # Without an exact index the frame is looked up by time
+        {"x": 1, "y": 1, "frame_time": 0.0, "media_time": 12 * FRAME, "frame_index": None},
+    ]
+    frames = grabber.grab(video, clicks)
+    assert [f[0, 0, 0] for f in frames] == [7, 12]
+
+
+def test_patches_are_centered_and_padded(video):
+    class Gradient(FakeDecoder):
+        def decode(self, _path, _start, times, size):
+            width, height = size
+            frame = np.zeros((height, width, 3), dtype=np.uint8)
+            frame[..., 0] = np.arange(width)[None, :]
+            frame[..., 1] = np.arange(height)[:, None]
+            return [frame] * len(times)
+
+    grabber = FrameGrabber(Gradient())
+    clicks = [
+        {"x": 20, "y": 10, "frame_index": 0, "width": WIDTH, "height": HEIGHT},
+        {"x": 0, "y": 0, "frame_index": 0, "width": WIDTH, "height": HEIGHT},
+        # Clicked on a display twice the frame's size
+        {"x": 40, "y": 20, "frame_index": 0, "width": 2 * WIDTH, "height": 2 * HEIGHT},
+    ]
+    patches = grabber.patches(video, clicks, size=8)
+
+    assert patches.shape == (3, 8, 8, 3)
+    assert patches[0, 4, 4, :2].tolist() == [20, 10]
+    assert patches[0, 0, 0, :2].tolist() == [16, 6]
+    # Top-left corner: the first 4 rows and columns are padding
+    assert not patches[1, :4, :4].any()
+    assert patches[1, 4, 5, :2].tolist() == [1, 0]
+    assert patches[2, 4, 4, :2].tolist() == [20, 10]
+
+
+def test_frames_need_a_frame_table(tmp_path):
+    path = tmp_path / "video.avi"
+    path.write_bytes(b"RIFF\x00\x00\x00\x00AVI " + bytes(100))
+    with pytest.raises(ValueError, match='frame timestamps'):
+        FrameGrabber(FakeDecoder()).frames(path, [0])
+
+
+def test_frame_indices_are_checked(video):
+    with pytest.raises(ValueError, match='Frame indices'):
+        FrameGrabber(FakeDecoder()).frames(video, [50])
+
+
+def test_ffmpeg_decoder(tmp_path, video):
+    log = tmp_path / "args.log"
+    script = tmp_path / "ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"open({str(log)!r}, 'w').write('\\n'.join(sys.argv[1:]))\n"
+        "n = int(sys.argv[sys.argv.index('-frames:v') + 1])\n"
+        f"sys.stdout.buffer.write(bytes(range(n)) * {WIDTH * HEIGHT * 3})\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+
+    frames = FFmpegDecoder(str(script)).decode(video, 1.0, [1.2, 1.4], (WIDTH, HEIGHT))
+    args = log.read_text().split("\n")
+    assert len(frames) == 2
+    assert frames[0].shape == (HEIGHT, WIDTH, 3)
+    assert args[args.index("-ss") + 1] == "1.000000"
+    assert "between(t,1.199500,1.200500)+between(t,1.399500,1.400500)" in args[args.index("-vf") + 1]
+
+
+def test_ffmpeg_decoder_needs_ffmpeg(video):
+    with pytest.raises(RuntimeError, match="ffmpeg"):
+        FFmpegDecoder("no-such-ffmpeg").decode(video, 0.0, [0.0], (WIDTH, HEIGHT))
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg")
+def test_frames_decoded_by_ffmpeg(tmp_path):
+    # Frame n is a flat grey of brightness 4 * n
+    video = tmp_path / "ramp.mp4"
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-f", "lavfi",
+            "-i", f"color=black:size={WIDTH}x{HEIGHT}:rate=25:duration=2",
+            "-vf", "format=yuv420p,geq=lum='4*N':cb=128:cr=128",
+            "-c:v", "mpeg4", "-q:v", "1", "-g", "25", "-pix_fmt", "yuv420p",
+            str(video),
+        ],
+        check=True,
+    )
+
+    frames = FrameGrabber().frames(video, [10, 30, 40])
+    assert [f.shape for f in frames] == [(HEIGHT, WIDTH, 3)] * 3
+    # Converted from limited-range YUV
+    expected = [(4 * n - 16) * 255 / 219 for n in (10, 30, 40)]
+    assert [f.mean() for f in frames] == pytest.approx(expected, abs=4)
@@ -0,0 +1,111 @@
+"""Tests for the multi-video grid"""
+
+import pytest
+
+pytest.importorskip("streamlit.testing.v1")
+from streamlit.testing.v1 import AppTest
+
+from helpers import component_args, make_mp4
+
+_SCRIPT = """
+import streamlit as st
+from streamlit_video_coordinates import streamlit_video_grid
+
+st.session_state["result"] = streamlit_video_grid(
+    {{"left": {left!r}, "right": {right!r}}}, key="grid", return_type={return_type!r}
+)
+"""
+
+
+@pytest.fixture
+def videos(tmp_path):
+    left, right = tmp_path / "left.mp4", tmp_path / "right.mp4"
+    # 25 fps, and 50 fps with a different frame size
+    left.write_bytes(make_mp4([(50, 24)]))
+    right.write_bytes(make_mp4([(100, 12)], size=(320, 180)))
+    return str(left), str(right)
+
+
+def _app(videos, return_type="list"):
+    left, right = videos
+    at = AppTest.from_string(_SCRIPT.format(left=left, right=right, return_type=return_type))
+    at.run()
+    assert not at.exception
+    return at
+
+
+def _click(seq, view, t):
+    return {"seq": seq, "view": view, "x": 10, "y": 20, "frame_time": t, "width": 640, "height": 360}
+
+
+def test_grid_is_one_component_with_all_views(videos):
+    at = _app(videos)
+    args = component_args(at)
+    assert len(args["views"]) == 2
+    assert all(view["src"] and view["src_id"] for view in args["views"])
+    assert args["columns"] == 2
+    assert args["sync"] is True
+
+    # Nothing changed: the payloads are not sent again
+    at.run()
+    assert [view["src"] for view in component_args(at)["views"]] == [None, None]
+
+
+def test_clicks_are_tagged_with_view_ids(videos):
+    at = _app(videos)
+    at.session_state["grid"] = {"clicks": [_click(1, 0, 0.5), _click(2, 1, 0.5)]}
+    at.run()
+
+    clicks = at.session_state["result"]
+    assert [click["view"] for click in clicks] == ["left", "right"]
+    # Frame indices come from each view's own video
+    assert [click["frame_index"] for click in clicks] == [12, 25]
+    assert component_args(at)["ack"] == 2
+
+
+def test_table_return_type_splits_views(videos):
+    at = _app(videos, return_type="table")
+    at.session_state["grid"] = {"clicks": [_click(1, 1, 0.1), _click(2, 1, 0.2)]}
+    at.run()
+
+    tables = at.session_state["result"]
+    assert set(tables) == {"left", "right"}
+    assert len(tables["left"]) == 0
+    assert tables["right"]["frame_index"].tolist() == [5, 10]
+
+
+def test_remounted_frontend_gets_requested_sources(videos):
+    at = _app(videos)
+    right_id = component_args(at)["views"][1]["src_id"]
+    at.session_state["grid"] = {"clicks": [], "src_request": f"{right_id}:abc"}
+    at.run()
+
+    left, right = component_args(at)["views"]
+    assert left["src"] is None
+    assert right["src"]
+
+
+_SEEK_SCRIPT = """
+import streamlit as st
+from streamlit_video_coordinates import seek, streamlit_video_grid
+
+if st.session_state.get("seek_to") is not None:
+    seek("grid", **st.session_state.pop("seek_to"))
+streamlit_video_grid({{"left": {left!r}, "right": {right!r}}}, key="grid")
+"""
+
+
+def test_frame_index_seeks_each_view_in_its_own_video(videos):
+    left, right = videos
+    at = AppTest.from_string(_SEEK_SCRIPT.format(left=left, right=right))
+    at.run()
+
+    at.session_state["seek_to"] = {"frame_index": 30}
+    at.run()
+    assert not at.exception
+    # 25 and 50 fps
+    assert component_args(at)["seek"]["time"] == pytest.approx([1.2, 0.6])
+
+    at.session_state["seek_to"] = {"frame_index": 30, "view": "right"}
+    at.run()
+    assert component_args(at)["seek"] == {"id": 2, "time": pytest.approx(0.6), "view": 1}
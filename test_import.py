@@ -0,0 +1,48 @@
+"""Import-time budget of the package"""
+
+import re
+import subprocess
+import sys
+
+import streamlit_video_coordinates as svc
+from streamlit_video_coordinates.table import ClickTable
+
+# Cumulative import time of the package itself, in microseconds. Generous,
+# so that only heavy dependencies creeping back into the import path fail.
+IMPORT_BUDGET_US = 250_000
+
+
+def _import_in_subprocess(code):
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_does_not_load_heavy_dependencies():
+    result = _import_in_subprocess(
+        "import sys, streamlit_video_coordinates; "
+        "print(sorted(m for m in ('streamlit', 'numpy', 'sqlite3', 'pyarrow') if m in sys.modules))"
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_import_time_budget():
+    result = _import_in_subprocess("import streamlit_video_coordinates")
+    match = re.search(r"\|\s*(\d+) \| streamlit_video_coordinates$", result.stderr, re.M)
+    assert match is not None
+    assert int(match.group(1)) < IMPORT_BUDGET_US
+
+
+def test_lazy_attributes_resolve():
+    assert svc.ClickTable is ClickTable
+    assert callable(svc.download_button)
+
+
+def test_all_lists_every_public_name():
+    assert set(svc._LAZY_ATTRIBUTES) <= set(svc.__all__)
+    assert len(set(svc.__all__)) == len(svc.__all__)
+    for name in svc.__all__:
+        assert getattr(svc, name) is not None
@@ -0,0 +1,110 @@
+"""Tests for the range-request media server"""
+
+import http.client
+import os
+from urllib.parse import urlparse
+
+import pytest
+
+from streamlit_video_coordinates.media_server import MediaServer, parse_range
+
+
+@pytest.fixture
+def served_video(tmp_path):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(bytes(range(256)) * 40)  # 10240 bytes
+
+    server = MediaServer(chunk_size=1000)
+    url = urlparse(server.register(video, "video/mp4"))
+    yield server, url
+    server.stop()
+
+
+def _request(server, url, method="GET", headers=None):
+    conn = http.client.HTTPConnection(server.host, server.port, timeout=5)
+    conn.request(method, url.path, headers=headers or {})
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    with pytest.raises(ValueError, match="Unsatisfiable"):
+        parse_range("bytes=100-", 100)
+
+
+def test_full_response_advertises_ranges(served_video):
+    server, url = served_video
+    response, body = _request(server, url)
+
+    assert response.status == 200
+    assert response.getheader("Accept-Ranges") == "bytes"
+    assert response.getheader("Content-Type") == "video/mp4"
+    assert len(body) == 10240
+
+
+def test_partial_content(served_video):
+    server, url = served_video
+    response, body = _request(server, url, headers={"Range": "bytes=5000-7499"})
+
+    assert response.status == 206
+    assert response.getheader("Content-Range") == "bytes 5000-7499/10240"
+    assert body == (bytes(range(256)) * 40)[5000:7500]
+
+
+def test_head_and_unsatisfiable_range(served_video):
+    server, url = served_video
+
+    response, body = _request(server, url, method="HEAD")
+    assert response.status == 200
+    assert response.getheader("Content-Length") == "10240"
+    assert body == b""
+
+    response, _ = _request(server, url, headers={"Range": "bytes=20000-"})
+    assert response.status == 416
+    assert response.getheader("Content-Range") == "bytes */10240"
+
+
+def test_unregistered_paths_are_not_served(served_video):
+    server, url = served_video
+    response, _ = _request(server, url._replace(path="/video/../../etc/passwd"))
+    assert response.status == 404
+
+
+def test_earlier_urls_of_a_file_stay_valid(served_video, tmp_path):
+    server, url = served_video
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"rewritten")
+    os.utime(video, ns=(0, 0))
+    new_url = urlparse(server.register(video, "video/mp4"))
+
+    assert new_url != url
+    assert _request(server, url)[1] == b"rewritten"
+    assert _request(server, new_url)[1] == b"rewritten"
+
+    server.unregister(video)
+    assert _request(server, url)[0].status == 404
+    assert _request(server, new_url)[0].status == 404
+
+
+def test_registry_is_bounded(tmp_path):
+    server = MediaServer(max_entries=2)
+    paths = [tmp_path / f"{i}.mp4" for i in range(3)]
+    for path in paths:
+        path.write_bytes(b"video")
+    first, second = (urlparse(server.register(p, "video/mp4")).path for p in paths[:2])
+    server.lookup(first)  # requested, so now the most recently used
+    third = urlparse(server.register(paths[2], "video/mp4")).path
+    server.stop()
+
+    assert server.lookup(first) is not None
+    assert server.lookup(second) is None
+    assert server.lookup(third) is not None
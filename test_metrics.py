@@ -0,0 +1,63 @@
+"""Tests for the instrumentation hooks"""
+
+import pytest
+
+from streamlit_video_coordinates import (
+    _InstanceState,
+    _report_browser_timings,
+    metrics,
+    sources,
+)
+from streamlit_video_coordinates.cache import source_cache
+from streamlit_video_coordinates.metrics import (
+    CallbackSink,
+    Measurement,
+    PrometheusSink,
+    configure_metrics,
+)
+
+
+@pytest.fixture
+def recorded():
+    measurements = []
+    configure_metrics(CallbackSink(measurements.append))
+    yield measurements
+    configure_metrics()
+
+
+def test_disabled_spans_are_shared_no_ops():
+    assert not metrics.enabled()
+    assert metrics.span("a") is metrics.span("b", serving="data")
+
+
+def test_source_resolution_is_timed(recorded, tmp_path):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"frames" * 100)
+    source_cache.clear()
+
+    sources.resolve_source(video, serving="data")
+
+    assert [m.name for m in recorded] == ["read", "encode"]
+    assert all(m.kind == "span" and m.value >= 0 for m in recorded)
+
+
+def test_browser_timings_are_recorded_once(recorded):
+    state = _InstanceState()
+    value = {"clicks": [], "timings": {"src_id": "abc", "canplay": 120.0}}
+    _report_browser_timings(state, value)
+    _report_browser_timings(state, value)
+
+    assert recorded == [Measurement("browser.canplay", "span", 0.12)]
+
+
+def test_prometheus_exposition():
+    sink = PrometheusSink()
+    sink.record(Measurement("clicks", "counter", 3))
+    sink.record(Measurement("resolve", "span", 0.02, {"serving": "data"}))
+    sink.record(Measurement("resolve", "span", 20.0, {"serving": "data"}))
+
+    text = sink.exposition()
+    assert "streamlit_video_coordinates_clicks_total 3" in text
+    assert 'streamlit_video_coordinates_resolve_seconds_bucket{serving="data",le="0.025"} 1' in text
+    assert 'streamlit_video_coordinates_resolve_seconds_bucket{serving="data",le="+Inf"} 2' in text
+    assert 'streamlit_video_coordinates_resolve_seconds_count{serving="data"} 2' in text
@@ -0,0 +1,89 @@
+"""Tests for annotation navigation"""
+
+import io
+
+import pytest
+
+from helpers import component_args, make_mp4
+from streamlit_video_coordinates.navigation import TimeIndex
+from streamlit_video_coordinates.timestamps import read_frame_table
+
+
+def test_neighbour_lookups_skip_the_current_frame():
+    index = TimeIndex([2.0, 0.5, 1.0, 1.0])
+    assert index.tolist() == [0.5, 1.0, 2.0]
+    assert index.next(1.0) == 2.0
+    assert index.next(1.0004) == 2.0
+    assert index.next(0.0) == 0.5
+    assert index.next(2.0) is None
+    assert index.previous(1.0) == 0.5
+    assert index.previous(0.5) is None
+    assert index.nearest(1.4) == 1.0
+    assert index.nearest(1.6) == 2.0
+    assert TimeIndex().nearest(1.0) is None
+
+
+def test_clicks_are_snapped_to_their_frames():
+    table = read_frame_table(io.BytesIO(make_mp4([(50, 24)])))  # 25 fps
+    clicks = [
+        {"frame_time": 0.51},
+        {"frame_time": 0.53, "media_time": 0.50},  # same frame
+        {"frame_time": 1.0},
+        {"x": 1},  # no time
+    ]
+    assert TimeIndex.from_clicks(clicks, table).tolist() == pytest.approx([0.48, 1.0])
+    assert len(TimeIndex.from_clicks(clicks)) == 3
+
+
+pytest.importorskip("streamlit.testing.v1")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+_SCRIPT = """
+import streamlit as st
+from streamlit_video_coordinates import get_annotation_index, seek, streamlit_video_coordinates
+
+if st.session_state.get("seek_to") is not None:
+    seek("video", **st.session_state.pop("seek_to"))
+streamlit_video_coordinates({video!r}, key="video")
+st.session_state["index"] = get_annotation_index("video")
+"""
+
+
+@pytest.fixture
+def app(tmp_path):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(make_mp4([(50, 24)], stss=[1, 26]))
+    at = AppTest.from_string(_SCRIPT.format(video=str(video)))
+    at.run()
+    assert not at.exception
+    return at
+
+
+def test_indexes_are_sent_with_the_video(app):
+    args = component_args(app)
+    assert args["annotated"] == []
+    assert args["keyframes"] == [0.0, 1.0]
+
+    app.session_state["video"] = {"clicks": [{"seq": 1, "x": 1, "y": 1, "frame_time": 0.61}]}
+    app.run()
+    # The frontend has the video and adds its own clicks to its index
+    assert component_args(app)["annotated"] is None
+    assert app.session_state["index"].tolist() == pytest.approx([0.6])
+
+    # A remounted frontend asks for the video again, and gets the index too
+    app.session_state["video"] = {"clicks": [], "src_request": "x:1"}
+    app.run()
+    assert component_args(app)["annotated"] == pytest.approx([0.6])
+
+
+def test_seek_is_sent_once(app):
+    app.session_state["seek_to"] = {"frame_index": 30}
+    app.run()
+    assert not app.exception
+    assert component_args(app)["seek"] == {"id": 1, "time": pytest.approx(1.2), "view": None}
+    app.run()
+    assert component_args(app)["seek"] is None
+
+    app.session_state["seek_to"] = {"frame_index": 50}
+    app.run()
+    assert app.exception
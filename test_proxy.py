@@ -0,0 +1,102 @@
+"""Tests for proxy playback"""
+
+import stat
+import sys
+
+import pytest
+
+from helpers import make_mp4
+from streamlit_video_coordinates.proxy import ProxyCache, proxy_size
+
+
+@pytest.mark.parametrize(
+    ("size", "max_height", "expected"),
+    [
+        ((3840, 2160), 540, (960, 540)),
+        ((7680, 4320), 540, (960, 540)),
+        ((1920, 1080), 720, (960, 540)),
+        ((1000, 1001), 500, (332, 332)),
+        ((640, 360), 540, (640, 360)),
+    ],
+)
+def test_proxy_size_uses_whole_factors(size, max_height, expected):
+    assert proxy_size(*size, max_height) == expected
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path):
+    """An 'ffmpeg' that records its calls and copies its input to its output"""
+    log = tmp_path / "calls.log"
+    script = tmp_path / "ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import shutil, sys\n"
+        f"open({str(log)!r}, 'a').write(' '.join(sys.argv[1:]) + '\\n')\n"
+        "shutil.copyfile(sys.argv[sys.argv.index('-i') + 1], sys.argv[-1])\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return script, log
+
+
+def test_proxies_are_encoded_once(tmp_path, fake_ffmpeg):
+    script, log = fake_ffmpeg
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(make_mp4([(10, 20)], size=(3840, 2160)))
+    cache = ProxyCache(directory=tmp_path / "proxies", ffmpeg=str(script))
+
+    proxy = cache.get(video, max_height=540)
+    assert (proxy.width, proxy.height) == (960, 540)
+    assert (proxy.original_width, proxy.original_height) == (3840, 2160)
+    assert proxy.path.exists()
+    assert "scale=960:540" in log.read_text()
+
+    # Bytes with the same content share the proxy; nothing is re-encoded
+    assert cache.get(video.read_bytes(), max_height=540).path == proxy.path
+    assert cache.get(video, max_height=540) == proxy
+    assert len(log.read_text().splitlines()) == 1
+    assert "-fps_mode passthrough" in log.read_text()
+    assert not cache._encoding
+
+
+def test_old_ffmpeg_gets_vsync(tmp_path):
+    log = tmp_path / "calls.log"
+    script = tmp_path / "ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import shutil, sys\n"
+        f"open({str(log)!r}, 'a').write(' '.join(sys.argv[1:]) + '\\n')\n"
+        "if '-fps_mode' in sys.argv:\n"
+        "    sys.exit(\"Unrecognized option 'fps_mode'.\")\n"
+        "shutil.copyfile(sys.argv[sys.argv.index('-i') + 1], sys.argv[-1])\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(make_mp4([(10, 20)], size=(3840, 2160)))
+    cache = ProxyCache(directory=tmp_path / "proxies", ffmpeg=str(script))
+
+    assert cache.get(video, max_height=540).path.exists()
+    first, second = log.read_text().splitlines()
+    assert "-fps_mode passthrough" in first
+    assert "-vsync passthrough" in second
+
+    # The executable is remembered as an old one
+    cache.get(video, max_height=270)
+    assert "-vsync passthrough" in log.read_text().splitlines()[2]
+
+
+def test_small_videos_need_no_proxy(tmp_path, fake_ffmpeg):
+    script, log = fake_ffmpeg
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(make_mp4([(10, 20)], size=(640, 360)))
+    cache = ProxyCache(directory=tmp_path / "proxies", ffmpeg=str(script))
+
+    assert cache.get(video, max_height=540) is None
+    assert not log.exists()
+
+
+def test_missing_ffmpeg_is_reported(tmp_path):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(make_mp4([(10, 20)], size=(3840, 2160)))
+    cache = ProxyCache(directory=tmp_path / "proxies", ffmpeg=str(tmp_path / "no-ffmpeg"))
+    with pytest.raises(RuntimeError, match="ffmpeg"):
+        cache.get(video)
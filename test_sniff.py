@@ -0,0 +1,77 @@
+"""Tests for container sniffing and custom source types"""
+
+import io
+
+import pytest
+
+from streamlit_video_coordinates import sources
+from streamlit_video_coordinates.sniff import HEADER_SIZE, read_header, sniff_mimetype
+
+MP4 = b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00isomiso2"
+MOV = b"\x00\x00\x00\x14ftypqt  \x00\x00\x02\x00qt  "
+WEBM = b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01\x42\x82\x84webm\x42\x87\x81\x04"
+MKV = b"\x1a\x45\xdf\xa3\xa3\x42\x86\x81\x01\x42\x82\x88matroska"
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (MP4, "video/mp4"),
+        (MOV, "video/quicktime"),
+        (WEBM, "video/webm"),
+        (MKV, "video/x-matroska"),
+        (b"OggS\x00\x02" + bytes(20), "video/ogg"),
+        (b"RIFF\x00\x00\x00\x00AVI LIST", "video/x-msvideo"),
+        (b"\x47" + bytes(187) + b"\x47" + bytes(10), "video/mp2t"),
+        (b"not a video at all", None),
+        (b"", None),
+    ],
+)
+def test_sniff_mimetype(header, expected):
+    assert sniff_mimetype(header) == expected
+
+
+def test_detection_prefers_content_over_name(tmp_path):
+    mislabelled = tmp_path / "clip.mp4"
+    mislabelled.write_bytes(WEBM + bytes(1000))
+    assert sources.detect_mimetype(mislabelled) == "video/webm"
+
+    upload = io.BytesIO(WEBM)
+    upload.name = "clip.mp4"
+    upload.seek(3)
+    assert sources.detect_mimetype(upload) == "video/webm"
+    assert upload.tell() == 3
+
+    # Unrecognised content falls back to the name, then to MP4
+    unknown = io.BytesIO(b"?" * 100)
+    unknown.name = "clip.ogv"
+    assert sources.detect_mimetype(unknown) == "video/ogg"
+    assert sources.detect_mimetype(b"?" * 100) == "video/mp4"
+
+
+def test_bytes_headers_are_not_copied():
+    data = bytes(10 * HEADER_SIZE)
+    header = read_header(data)
+    assert header.obj is data
+    assert len(header) == HEADER_SIZE
+
+
+def test_data_url_uses_detected_type():
+    url = sources.resolve_source(WEBM, serving="data")
+    assert url.startswith("data:video/webm;base64,")
+
+
+class _Mirrored:
+    def __init__(self, path):
+        self.path = path
+
+
+def test_registered_source_types(tmp_path):
+    video = tmp_path / "clip.webm"
+    video.write_bytes(WEBM)
+    sources.register_source_type(_Mirrored, lambda obj: obj.path)
+
+    assert sources.source_token(_Mirrored(video)) == sources.source_token(video)
+    assert sources.resolve_source(_Mirrored(video), serving="data").startswith("data:video/webm")
+    with pytest.raises(ValueError, match="register_source_type"):
+        sources.resolve_source(object(), serving="data")
@@ -0,0 +1,91 @@
+"""Tests for identifying and resolving video sources"""
+
+import io
+from types import SimpleNamespace
+
+import pytest
+from streamlit import runtime
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+from helpers import Stream, Upload, make_mp4
+from streamlit_video_coordinates import _InstanceState, _prepare_view, _view_src
+from streamlit_video_coordinates.sources import (
+    register_media,
+    renew_media,
+    source_token,
+)
+
+
+@pytest.fixture
+def media_manager(monkeypatch):
+    # Like a `streamlit run` server, which keeps one manager across runs
+    manager = MediaFileManager(MemoryMediaFileStorage("/media"))
+    monkeypatch.setattr(runtime, "exists", lambda: True)
+    monkeypatch.setattr(runtime, "get_instance", lambda: SimpleNamespace(media_file_mgr=manager))
+    return manager
+
+
+class _CountingUpload(Upload):
+    reads = 0
+
+    def getvalue(self):
+        self.reads += 1
+        return super().getvalue()
+
+
+def test_source_token_is_cheap_and_stable(tmp_path):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"frames")
+    assert source_token(video) == source_token(str(video))
+    assert source_token(b"abc") == source_token(io.BytesIO(b"abc"))
+    assert source_token(b"abc") != source_token(b"abd")
+
+    # Uploads are identified by their ID without reading the content
+    upload = Upload(b"abc", file_id="upload-1")
+    upload.seek(2)
+    assert source_token(upload) == source_token(Upload(b"xyz", file_id="upload-1"))
+    assert upload.tell() == 2
+
+    stream = Stream(b"abc" * 1000)
+    assert source_token(stream) == source_token(Stream(b"abc" * 1000))
+    assert len(source_token("https://example.com/video.mp4")) == 24
+
+
+def test_renewed_media_outlives_the_run(media_manager):
+    url = register_media(b"video", "video/mp4", "coordinates")
+
+    # A new run drops the registrations of the last one
+    media_manager.clear_session_refs()
+    assert renew_media(url, "coordinates")
+    media_manager.remove_orphaned_files()
+    assert media_manager._storage.get_url(url.split("/")[-1].split(".")[0]) == url
+
+    media_manager.clear_session_refs()
+    media_manager.remove_orphaned_files()
+    assert not renew_media(url, "coordinates")
+    assert not renew_media(None, "coordinates")
+
+
+def test_media_reruns_do_not_read_the_video_again(media_manager):
+    upload = _CountingUpload(make_mp4([(50, 24)]), file_id="upload-1")
+    view = _prepare_view(upload, proxy=False)
+    state = _InstanceState()
+
+    url = _view_src(state, 0, view, "media", "coordinates", send_src=True)
+    assert url.startswith("/media/")
+    assert upload.reads == 1
+
+    for _ in range(3):
+        media_manager.clear_session_refs()
+        assert _view_src(state, 0, view, "media", "coordinates", send_src=False) is None
+        media_manager.remove_orphaned_files()
+    assert upload.reads == 1
+    assert renew_media(url, "coordinates")
+
+    # A freed file is registered again under the same URL
+    media_manager.clear_session_refs()
+    media_manager.remove_orphaned_files()
+    _view_src(state, 0, view, "media", "coordinates", send_src=False)
+    assert upload.reads == 2
+    assert state.media_urls[0] == url
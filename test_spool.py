@@ -0,0 +1,103 @@
+"""Tests for spooling file-like sources to disk"""
+
+import io
+import os
+from urllib.parse import urlparse
+
+from helpers import Stream, Upload
+from streamlit_video_coordinates import media_server
+from streamlit_video_coordinates.media_server import MediaServer
+from streamlit_video_coordinates.spool import Spool, iter_chunks
+
+
+def test_iter_chunks_reads_in_bounded_pieces():
+    stream = Stream(b"x" * 10_000)
+    stream.seek(123)
+
+    assert b"".join(iter_chunks(stream, chunk_size=1024)) == b"x" * 10_000
+    assert stream.largest_read == 1024
+    assert stream.tell() == 123
+
+
+def test_uploads_are_spooled_once(tmp_path):
+    spool = Spool(tmp_path, chunk_size=7)
+    upload = Upload(b"video bytes" * 10, file_id="abc")
+
+    first = spool.add_file_like(upload, suffix=".webm")
+    assert first.read_bytes() == b"video bytes" * 10
+    assert first.suffix == ".webm"
+
+    first.write_bytes(b"sentinel")  # an actual re-copy would overwrite this
+    assert spool.add_file_like(upload, suffix=".webm") == first
+    assert first.read_bytes() == b"sentinel"
+
+
+def test_identical_content_shares_a_file(tmp_path):
+    spool = Spool(tmp_path)
+    a = spool.add_file_like(Stream(b"same"), suffix=".mp4")
+    b = spool.add_file_like(io.BytesIO(b"same"), suffix=".mp4")
+
+    assert a == b
+    assert [p.name for p in tmp_path.iterdir()] == [a.name]
+
+
+def test_known_streams_are_not_written_again(tmp_path):
+    spool = Spool(tmp_path)
+    path = spool.add_file_like(Stream(b"video"), suffix=".mp4")
+    path.write_bytes(b"sentinel")  # an actual re-copy would overwrite this
+
+    assert spool.add_file_like(Stream(b"video"), suffix=".mp4") == path
+    assert path.read_bytes() == b"sentinel"
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+
+def test_bytes_and_streams_share_names_and_hash_all_content(tmp_path):
+    spool = Spool(tmp_path, chunk_size=64 * 1024)
+    data = bytes(3 * 1024 * 1024)
+    # Differs only outside the sampled ranges of content_fingerprint()
+    other = bytearray(data)
+    other[len(data) // 4] = 1
+
+    a = spool.add_bytes(data, suffix=".mp4")
+    assert spool.add_file_like(io.BytesIO(data), suffix=".mp4") == a
+    assert spool.add_bytes(bytes(other), suffix=".mp4") != a
+
+
+def test_reuse_keeps_the_served_url(tmp_path):
+    spool = Spool(tmp_path)
+    server = MediaServer()
+    path = spool.add_bytes(b"video", suffix=".mp4")
+    os.utime(path, ns=(0, 0))
+    url = server.register(path, "video/mp4")
+
+    assert spool.add_bytes(b"video", suffix=".mp4") == path
+    assert spool.add_file_like(io.BytesIO(b"video"), suffix=".mp4") == path
+    assert path.stat().st_mtime_ns == 0
+    assert path.stat().st_atime_ns > 0
+    assert server.register(path, "video/mp4") == url
+    server.stop()
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    spool = Spool(tmp_path, max_bytes=10)
+    old = spool.add_bytes(b"123456")
+    new = spool.add_bytes(b"abcdef")
+
+    assert not old.exists()
+    assert new.exists()
+
+
+def test_evicted_files_are_no_longer_served(tmp_path, monkeypatch):
+    server = MediaServer()
+    monkeypatch.setattr(media_server, "_media_server", server)
+    spool = Spool(tmp_path, max_bytes=10)
+    old = spool.add_bytes(b"123456")
+    url = urlparse(server.register(old, "video/mp4"))
+    server.stop()
+
+    spool.add_bytes(b"abcdef")
+    assert server.lookup(url.path) is None
+
+    # Asking for the video again spools it again
+    again = spool.add_bytes(b"123456")
+    assert server.lookup(urlparse(server.register(again, "video/mp4")).path) is not None
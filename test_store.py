@@ -0,0 +1,78 @@
+"""Tests for the persistent annotation store"""
+
+import io
+
+import numpy as np
+import pytest
+
+from streamlit_video_coordinates.cache import content_fingerprint
+from streamlit_video_coordinates.sources import content_id
+from streamlit_video_coordinates.store import AnnotationStore
+
+
+def _click(frame_index, **extra):
+    return {"x": frame_index, "y": 2, "frame_time": frame_index / 25, "frame_index": frame_index, **extra}
+
+
+def test_append_and_query_by_frame_range(tmp_path):
+    path = tmp_path / "annotations.db"
+    with AnnotationStore(path) as store:
+        assert store.append("video", [_click(i) for i in range(100)], annotator="alice") == 100
+        store.append("video", [_click(5)], annotator="bob")
+        store.append("other", [_click(5)])
+
+    # Reopening resumes from disk
+    with AnnotationStore(path) as store:
+        table = store.query("video", frames=(5, 8))
+        assert table["frame_index"].tolist() == [5, 6, 7, 5]
+        assert store.count("video", annotator="alice") == 100
+        assert store.count("video", times=(0.0, 0.1)) == 3
+        assert store.annotators("video") == ["alice", "bob"]
+
+
+@pytest.mark.parametrize("annotator", [None, "alice"])
+@pytest.mark.parametrize(
+    ("ranges", "column"),
+    [({"frames": (5, 8)}, "frame_index"), ({"times": (0.2, 0.3)}, "frame_time")],
+)
+def test_range_queries_scan_an_index(annotator, ranges, column):
+    with AnnotationStore(":memory:") as store:
+        where, params = store._where("video", annotator, ranges.get("frames"), ranges.get("times"))
+        plan = store._conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT * FROM clicks WHERE {where}", params
+        ).fetchall()
+
+    details = " ".join(row[-1] for row in plan)
+    assert f"video_id=? AND {column}>? AND {column}<?" in details
+
+
+def test_missing_fields_round_trip_as_none():
+    with AnnotationStore(":memory:") as store:
+        store.append("video", [_click(3, media_time=0.12, track_id=7), _click(4)])
+        clicks = store.query("video", return_type="list")
+        table = store.query("video")
+
+    assert clicks[0]["media_time"] == pytest.approx(0.12)
+    assert clicks[0]["track_id"] == 7
+    assert clicks[1]["media_time"] is None
+    assert clicks[1]["presented_frames"] is None
+    assert clicks[1]["track_id"] is None
+    assert table["track_id"].tolist() == [7, -1]
+
+
+def test_empty_query():
+    with AnnotationStore(":memory:") as store:
+        table = store.query("nothing")
+    assert len(table) == 0
+    assert table["x"].dtype == np.int32
+
+
+def test_content_id_is_shared_between_source_types(tmp_path):
+    data = bytes(range(256)) * 10_000
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(data)
+
+    expected = content_fingerprint(data)
+    assert content_id(video) == expected
+    assert content_id(data) == expected
+    assert content_id(io.BytesIO(data)) == expected
@@ -0,0 +1,96 @@
+"""Tests for the columnar click table"""
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from helpers import make_mp4
+from streamlit_video_coordinates.clicks import ClickHistory
+from streamlit_video_coordinates.table import ClickTable
+
+CLICK = {
+    "x": 320,
+    "y": 240,
+    "frame_time": 15.5,
+    "frame_index": 465,
+    "width": 1280,
+    "height": 720,
+    "unix_time": 1234567890123,
+    "media_time": 15.48,
+    "presented_frames": None,
+    "track_id": None,
+}
+
+
+def test_table_is_list_compatible():
+    table = ClickTable([CLICK, {**CLICK, "x": 10}])
+
+    assert len(table) == 2
+    assert table == [CLICK, {**CLICK, "x": 10}]
+    assert table[-1]["x"] == 10
+    assert [c["y"] for c in table] == [240, 240]
+    assert table["frame_time"].dtype == np.float64
+
+
+def test_columns_are_zero_copy_views():
+    table = ClickTable([CLICK] * 3)
+    columns = table.to_numpy()
+
+    assert np.shares_memory(columns["x"], table["x"])
+    assert np.shares_memory(table.to_pandas()["frame_index"].to_numpy(), table["frame_index"])
+
+
+def test_growth_and_missing_fields():
+    table = ClickTable()
+    table.extend({"x": i} for i in range(1000))
+
+    assert len(table) == 1000
+    assert table["x"][-1] == 999
+    assert np.isnan(table["frame_time"]).all()
+    assert (table["width"] == -1).all()
+
+
+def test_history_extends_its_table_incrementally():
+    history = ClickHistory()
+    history.apply({"clicks": [{**CLICK, "seq": 1}]})
+    table = history.table()
+    history.apply({"clicks": [{**CLICK, "seq": 2, "x": 1}]})
+
+    assert history.table() is table
+    assert table["x"].tolist() == [320, 1]
+
+
+def test_missing_sentinel_is_per_column():
+    (click,) = ClickTable([{"x": -1, "frame_time": -1.0, "media_time": None}])
+    assert click["x"] is None
+    assert click["frame_time"] == -1.0
+    assert click["media_time"] is None
+
+
+def test_table_equals_the_returned_clicks(tmp_path):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(make_mp4([(50, 24)]))
+    at = AppTest.from_string(
+        "import streamlit as st\n"
+        "from streamlit_video_coordinates import streamlit_video_coordinates\n"
+        f"st.session_state['clicks'] = streamlit_video_coordinates({str(video)!r}, key='video')\n"
+    )
+    at.run()
+    # As the frontend sends them: no track_id without tracks=True
+    at.session_state["video"] = {
+        "clicks": [
+            {"seq": 1, "x": 10, "y": 20, "frame_time": 0.5, "frame_index": 12, "width": 640,
+             "height": 360, "unix_time": 1700000000000, "media_time": 0.5, "presented_frames": None},
+            {"seq": 2, "x": 11, "y": 21, "frame_time": 0.6, "frame_index": 15, "width": 640,
+             "height": 360, "unix_time": 1700000000100, "media_time": None, "presented_frames": 16},
+        ]
+    }
+    at.run()
+    assert not at.exception
+
+    clicks = at.session_state["clicks"]
+    assert len(clicks) == 2
+    assert ClickTable(clicks) == clicks
+    assert ClickTable(clicks) != [*clicks[:1], {**clicks[1], "x": 0}]
+    assert ClickTable(clicks) != [{**click, "track_id": 1} for click in clicks]
+    # Fields the table doesn't store
+    assert ClickTable(clicks) != [{**click, "view": 0} for click in clicks]
@@ -0,0 +1,125 @@
+"""Tests for container frame timestamp parsing"""
+
+import io
+import struct
+
+import numpy as np
+import pytest
+
+from helpers import Stream, make_mp4
+from streamlit_video_coordinates.timestamps import (
+    ContainerError,
+    frame_table_for_source,
+    read_frame_table,
+)
+
+
+def _ebml(element_id, payload):
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    return id_bytes + bytes([0x01]) + len(payload).to_bytes(7, "big") + payload
+
+
+def _uint(element_id, value, width=4):
+    return _ebml(element_id, value.to_bytes(width, "big"))
+
+
+def _simple_block(track, rel, keyframe):
+    return _ebml(0xA3, bytes([0x80 | track]) + struct.pack(">hB", rel, 0x80 if keyframe else 0) + b"data")
+
+
+def make_webm(clusters, unknown_size_clusters=False):
+    header = _ebml(0x1A45DFA3, _ebml(0x4282, b"webm"))
+    info = _ebml(0x1549A966, _uint(0x2AD7B1, 1_000_000))
+    video_entry = _ebml(0xAE, _uint(0xD7, 1, 1) + _uint(0x83, 1, 1) + _ebml(0xE0, _uint(0xB0, 320, 2) + _uint(0xBA, 240, 2)))
+    audio_entry = _ebml(0xAE, _uint(0xD7, 2, 1) + _uint(0x83, 2, 1))
+    body = info + _ebml(0x1654AE6B, video_entry + audio_entry)
+    for timestamp, blocks in clusters:
+        payload = _uint(0xE7, timestamp) + b"".join(_simple_block(*b) for b in blocks)
+        if unknown_size_clusters:
+            body += (0x1F43B675).to_bytes(4, "big") + b"\x01\xff\xff\xff\xff\xff\xff\xff" + payload
+        else:
+            body += _ebml(0x1F43B675, payload)
+    return header + _ebml(0x18538067, body)
+
+
+def test_mp4_constant_frame_rate():
+    frames = read_frame_table(io.BytesIO(make_mp4([(50, 24)], stss=[1, 26])))
+
+    assert len(frames) == 50
+    assert frames.frame_rate == pytest.approx(25.0)
+    assert (frames.width, frames.height) == (640, 360)
+    assert frames.keyframes.tolist() == pytest.approx([0.0, 1.0])
+    assert frames.frame_index([0.0, 0.039, 0.04, 1.99, 99.0]).tolist() == [0, 0, 1, 49, 49]
+
+
+def test_mp4_variable_frame_rate_with_reordering():
+    # Decode order I P B with composition offsets and an edit list removing
+    # the initial offset, as written by encoders using B-frames.
+    data = make_mp4(
+        stts=[(1, 10), (2, 20)],
+        ctts=[(1, 10), (1, 40), (1, 0)],
+        timescale=100,
+        edit_shift=10,
+    )
+    frames = read_frame_table(io.BytesIO(data))
+
+    assert frames.pts.tolist() == pytest.approx([0.0, 0.2, 0.4])
+    assert frames.frame_index([0.25, 0.41]).tolist() == [1, 2]
+
+
+def test_mp4_short_composition_offsets_leave_the_rest_unshifted():
+    data = make_mp4(stts=[(4, 10)], ctts=[(1, 5)], timescale=100)
+    frames = read_frame_table(io.BytesIO(data))
+
+    assert frames.pts.tolist() == pytest.approx([0.05, 0.1, 0.2, 0.3])
+
+
+def test_webm_block_timestamps():
+    data = make_webm(
+        [(0, [(1, 0, True), (2, 5, True), (1, 33, False)]), (1000, [(1, 0, True), (1, 50, False)])]
+    )
+    frames = read_frame_table(io.BytesIO(data))
+
+    assert frames.pts.tolist() == pytest.approx([0.0, 0.033, 1.0, 1.05])
+    assert frames.keyframes.tolist() == pytest.approx([0.0, 1.0])
+    assert (frames.width, frames.height) == (320, 240)
+
+
+def test_webm_unknown_size_clusters():
+    data = make_webm([(0, [(1, 0, True)]), (40, [(1, 0, False)])], unknown_size_clusters=True)
+    frames = read_frame_table(io.BytesIO(data))
+    assert frames.pts.tolist() == pytest.approx([0.0, 0.04])
+
+
+def test_unsupported_content():
+    with pytest.raises(ContainerError):
+        read_frame_table(io.BytesIO(b"not a video at all"))
+    assert frame_table_for_source(b"not a video at all") is None
+    assert frame_table_for_source("https://example.com/video.mp4") is None
+
+
+def test_mp4_leading_empty_edit_delays_frames():
+    # An empty edit of 0.5 s (movie timescale 1000) before the first frame
+    data = make_mp4(stts=[(3, 20)], timescale=100, empty_edit=500)
+    frames = read_frame_table(io.BytesIO(data))
+
+    assert frames.pts.tolist() == pytest.approx([0.5, 0.7, 0.9])
+    assert frames.keyframes[0] == pytest.approx(0.5)
+    assert frames.frame_index([0.69, 0.7]).tolist() == [0, 1]
+
+
+def test_tables_are_cached_per_file(tmp_path):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(make_mp4([(10, 20)]))
+
+    first = frame_table_for_source(video)
+    assert frame_table_for_source(str(video)) is first
+    assert np.diff(first.pts).tolist() == pytest.approx([20 / 600] * 9)
+
+
+def test_tables_of_streams_are_cached_per_content():
+    data = make_mp4([(10, 20)])
+    first = frame_table_for_source(Stream(data))
+    assert first is not None
+    assert frame_table_for_source(Stream(data)) is first
+    assert frame_table_for_source(data) is first
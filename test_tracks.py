@@ -0,0 +1,81 @@
+"""Tests for track interpolation"""
+
+import numpy as np
+import pytest
+
+from streamlit_video_coordinates.table import ClickTable
+from streamlit_video_coordinates.tracks import Tracks
+
+
+def _click(track, frame, x, y=0):
+    return {"x": x, "y": y, "frame_index": frame, "track_id": track}
+
+
+CLICKS = [
+    _click(1, 0, 0),
+    _click(1, 10, 10, 20),
+    _click(1, 20, 0, 40),
+    _click(2, 5, 3, 3),
+    _click(2, 5, 9, 9),  # the later click on a frame wins
+    {"x": 1, "y": 1, "frame_index": 3},  # no track
+    {**_click(2, 8, 0), "frame_index": None},  # no frame
+]
+
+
+def test_grouping():
+    tracks = Tracks(CLICKS)
+    assert tracks.track_ids == [1, 2]
+    assert tracks.span(1) == (0, 21)
+    frames, xy = tracks.keyframes(2)
+    assert frames.tolist() == [5]
+    assert xy.tolist() == [[9, 9]]
+    assert Tracks(CLICKS, untracked=0).track_ids == [0, 1, 2]
+    assert len(Tracks([])) == 0
+    assert Tracks([]).at(0) == {}
+
+
+def test_linear_positions_cover_only_the_requested_range():
+    tracks = Tracks(ClickTable(CLICKS))
+    frames, xy = tracks.positions(1, start=8, stop=13)
+    assert frames.tolist() == [8, 9, 10, 11, 12]
+    assert xy == pytest.approx(np.array([[8, 16], [9, 18], [10, 20], [9, 22], [8, 24]]))
+    # Clipped to the clicked span: no extrapolation
+    frames, _ = tracks.positions(1, start=-5, stop=100)
+    assert (frames[0], frames[-1]) == (0, 20)
+    assert len(tracks.positions(1, start=30)[0]) == 0
+
+
+def test_at_returns_tracks_spanning_the_frame():
+    at = Tracks(CLICKS).at(5)
+    assert set(at) == {1, 2}
+    assert at[1] == pytest.approx([5, 10])
+    assert at[2] == pytest.approx([9, 9])
+    assert set(Tracks(CLICKS).at(15)) == {1}
+
+
+def test_cubic_spline_passes_through_clicks_and_is_smooth():
+    keyframes = np.arange(0, 300, 12)
+    table = ClickTable.from_columns(
+        {
+            "x": np.round(1000 * np.sin(keyframes / 40)),
+            "y": keyframes,
+            "frame_index": keyframes,
+            "track_id": np.full(len(keyframes), 4),
+        }
+    )
+    cubic, linear = Tracks(table, method="cubic"), Tracks(table)
+    frames, xy = cubic.positions(4)
+    assert xy[keyframes] == pytest.approx(np.stack([table["x"], table["y"]], axis=1))
+
+    truth = 1000 * np.sin(frames / 40)
+    cubic_error = np.abs(xy[:, 0] - truth).max()
+    assert cubic_error < np.abs(linear.positions(4)[1][:, 0] - truth).max() / 3
+    # y is linear in the frame, which the spline reproduces exactly
+    assert xy[:, 1] == pytest.approx(frames)
+
+
+def test_unknown_track_and_method():
+    with pytest.raises(KeyError):
+        Tracks(CLICKS).positions(3)
+    with pytest.raises(ValueError, match="Unknown interpolation method"):
+        Tracks(CLICKS, method="quadratic")
@@ -0,0 +1,115 @@
+"""Tests for click coordinate transforms"""
+
+import numpy as np
+import pytest
+
+from streamlit_video_coordinates import transforms
+from streamlit_video_coordinates.table import ClickTable
+
+POINTS = np.array([[0.0, 0.0], [10.0, 5.0], [639.0, 359.0], [320.5, 180.25]])
+
+
+def test_affine_chains_collapse_to_one_matrix():
+    chain = transforms.crop(10, 20).then(transforms.scale(2)).then(transforms.translate(1, 1))
+    assert isinstance(chain, transforms.Affine)
+    assert chain(POINTS) == pytest.approx((POINTS - [10, 20]) * 2 + 1)
+    assert (transforms.translate(1, 1) @ transforms.scale(2))(POINTS) == pytest.approx(POINTS * 2 + 1)
+
+
+def test_mixed_chains_keep_order():
+    lens = transforms.Undistort(np.eye(3), [0.0, 0.0, 0.0, 0.0])
+    chain = transforms.scale(2).then(transforms.translate(1, 0)).then(lens).then(transforms.scale(0.5))
+    assert isinstance(chain, transforms.Chain)
+    assert len(chain.transforms) == 3
+    assert chain(POINTS) == pytest.approx((POINTS * 2 + [1, 0]) * 0.5)
+
+
+def test_inverse_round_trip():
+    transform = transforms.rotate(30, center=(320, 180)).then(transforms.resize((640, 360), (224, 224)))
+    assert transform.inverse()(transform(POINTS)) == pytest.approx(POINTS)
+
+
+def test_rotate_turns_counterclockwise_on_screen():
+    # Right of the center ends up above it (smaller y)
+    assert transforms.rotate(90, center=(5, 5))([[6, 5]]) == pytest.approx(np.array([[5.0, 4.0]]))
+
+
+@pytest.mark.parametrize("k", [1, 2, 3, 4])
+def test_rotate90_matches_numpy(k):
+    frame = np.arange(6 * 4).reshape(4, 6)  # height 4, width 6
+    rotated = np.rot90(frame, k)
+    ys, xs = np.mgrid[0:4, 0:6]
+    pixels = np.stack([xs.ravel(), ys.ravel()], axis=1)
+    mapped = transforms.rotate90(6, 4, k)(pixels).round().astype(int)
+    assert (rotated[mapped[:, 1], mapped[:, 0]] == frame.ravel()).all()
+
+
+def test_homography_from_points():
+    source = [[0, 0], [100, 0], [100, 100], [0, 100]]
+    target = [[10, 10], [90, 20], [80, 120], [5, 90]]
+    homography = transforms.Homography.from_points(source, target)
+    assert homography(source) == pytest.approx(np.array(target, dtype=float), abs=1e-6)
+    assert homography.inverse()(target) == pytest.approx(np.array(source, dtype=float), abs=1e-6)
+    # A homography followed by an affine map is still one matrix
+    assert isinstance(homography.then(transforms.scale(2)), transforms.Homography)
+
+
+def test_undistort_inverts_distort():
+    camera = [[800.0, 0.0, 320.0], [0.0, 800.0, 180.0], [0.0, 0.0, 1.0]]
+    undistort = transforms.Undistort(camera, [-0.1, 0.02, 0.001, -0.0005, 0.0], iterations=20)
+    ideal = POINTS
+    distorted = undistort.inverse()(ideal)
+    assert not np.allclose(distorted, ideal)
+    assert undistort(distorted) == pytest.approx(ideal, abs=1e-6)
+
+
+def test_no_distortion_is_identity():
+    camera = [[800.0, 0.0, 320.0], [0.0, 800.0, 180.0], [0.0, 0.0, 1.0]]
+    assert transforms.Undistort(camera, [0, 0, 0, 0])(POINTS) == pytest.approx(POINTS)
+
+
+def test_apply_to_click_dicts_and_tables():
+    clicks = [{"x": 10, "y": 20, "width": 100, "height": 50}, {"x": 50, "y": 25, "width": 100, "height": 50}]
+    expected = [[0.1, 0.4], [0.5, 0.5]]
+    assert transforms.apply(clicks, transforms.normalize) == pytest.approx(np.array(expected))
+    assert transforms.apply(ClickTable(clicks), transforms.normalize(100, 50)) == pytest.approx(np.array(expected))
+
+
+def test_apply_groups_clicks_by_resolution():
+    table = ClickTable(
+        [
+            {"x": 10, "y": 10, "width": 100, "height": 100},
+            {"x": 10, "y": 10, "width": 20, "height": 40},
+            {"x": 50, "y": 20, "width": 100, "height": 100},
+        ]
+    )
+    assert transforms.apply(table, transforms.normalize) == pytest.approx(np.array([[0.1, 0.1], [0.5, 0.25], [0.5, 0.2]]))
+
+
+def test_invalid_inputs():
+    with pytest.raises(ValueError, match="last row"):
+        transforms.Affine([[1, 0, 0], [0, 1, 0], [1, 0, 1]])
+    with pytest.raises(ValueError, match=r"\(n, 2\) array"):
+        transforms.scale(2)(np.zeros((3, 3)))
+    with pytest.raises(ValueError, match="at least 4 pairs"):
+        transforms.Homography.from_points([[0, 0]] * 3, [[0, 0]] * 3)
+    with pytest.raises(ValueError, match="positive width and height"):
+        transforms.apply([{"x": 5, "y": 5}], transforms.normalize)
+    with pytest.raises(ValueError, match="positive width and height"):
+        transforms.apply(ClickTable([{"x": 5, "y": 5, "width": 0, "height": 10}]), transforms.normalize)
+    with pytest.raises(TypeError):
+        transforms.Transform()
+
+
+def test_apply_with_many_resolutions_and_lens_models():
+    rng = np.random.default_rng(0)
+    sizes = rng.integers(10, 40, size=(500, 2))
+    xy = rng.integers(0, 10, size=(500, 2))
+    table = ClickTable.from_columns({"x": xy[:, 0], "y": xy[:, 1], "width": sizes[:, 0], "height": sizes[:, 1]})
+    assert transforms.apply(table, transforms.normalize) == pytest.approx(xy / sizes)
+
+    def lens(width, height):
+        camera = [[width, 0.0, width / 2], [0.0, width, height / 2], [0.0, 0.0, 1.0]]
+        return transforms.Undistort(camera, [0, 0, 0, 0]).then(transforms.normalize(width, height))
+
+    assert transforms.apply(table, lens) == pytest.approx(xy / sizes)